@@ -0,0 +1,41 @@
+"""reminder slots
+
+Revision ID: 4dff7c2e3caa
+Revises: 6a565e8b5d11
+Create Date: 2026-10-17 10:12:41.518233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4dff7c2e3caa'
+down_revision: Union[str, None] = '6a565e8b5d11'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('reminder_slots',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=True),
+    sa.Column('remind_time', sa.String(length=10), nullable=False),
+    sa.Column('next_fire_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_reminder_slots_user_id'), 'reminder_slots', ['user_id'], unique=False)
+    op.create_index('ix_reminder_slots_next_fire_at', 'reminder_slots', ['next_fire_at'], unique=False)
+    op.create_index('ix_reminder_slots_kind_entity', 'reminder_slots', ['kind', 'entity_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reminder_slots_kind_entity', table_name='reminder_slots')
+    op.drop_index('ix_reminder_slots_next_fire_at', table_name='reminder_slots')
+    op.drop_index(op.f('ix_reminder_slots_user_id'), table_name='reminder_slots')
+    op.drop_table('reminder_slots')
@@ -0,0 +1,28 @@
+"""user activity tier
+
+Revision ID: 4f97a3503396
+Revises: 87c865f0301a
+Create Date: 2026-10-17 13:02:37.804512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f97a3503396'
+down_revision: Union[str, None] = '87c865f0301a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('activity_tier', sa.String(length=10), server_default='active', nullable=False))
+    op.add_column('users', sa.Column('last_active_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'last_active_at')
+    op.drop_column('users', 'activity_tier')
@@ -0,0 +1,26 @@
+"""ai interactions created_at index
+
+Revision ID: 70124fec5282
+Revises: f74acc8a7575
+Create Date: 2026-10-17 19:10:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '70124fec5282'
+down_revision: Union[str, None] = 'f74acc8a7575'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_ai_interactions_created_at', 'ai_interactions', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ai_interactions_created_at', table_name='ai_interactions')
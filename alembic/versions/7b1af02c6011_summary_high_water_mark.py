@@ -0,0 +1,37 @@
+"""summary high water mark
+
+Revision ID: 7b1af02c6011
+Revises: 70124fec5282
+Create Date: 2026-10-17 19:48:12.530864
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b1af02c6011'
+down_revision: Union[str, None] = '70124fec5282'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('ai_memory_summaries', sa.Column('last_interaction_id', sa.Integer(), nullable=True))
+    # Existing summaries cover everything the user said before they were written.
+    op.execute(
+        """
+        UPDATE ai_memory_summaries AS s
+        SET last_interaction_id = (
+            SELECT max(i.id) FROM ai_interactions AS i
+            WHERE i.user_id = s.user_id AND i.created_at <= s.created_at
+        )
+        WHERE s.summary_type = 'weekly_summary'
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('ai_memory_summaries', 'last_interaction_id')
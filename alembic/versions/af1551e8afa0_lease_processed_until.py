@@ -0,0 +1,26 @@
+"""lease processed until
+
+Revision ID: af1551e8afa0
+Revises: ca21743ae303
+Create Date: 2026-10-17 12:20:41.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'af1551e8afa0'
+down_revision: Union[str, None] = 'ca21743ae303'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('scheduler_leases', sa.Column('processed_until', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('scheduler_leases', 'processed_until')
@@ -0,0 +1,37 @@
+"""scheduler leases
+
+Revision ID: ca21743ae303
+Revises: eead6cca42c9
+Create Date: 2026-10-17 11:48:02.641097
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ca21743ae303'
+down_revision: Union[str, None] = 'eead6cca42c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('scheduler_instances',
+    sa.Column('instance_id', sa.String(length=255), nullable=False),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('instance_id')
+    )
+    op.create_table('scheduler_leases',
+    sa.Column('partition', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('owner', sa.String(length=255), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('partition')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('scheduler_leases')
+    op.drop_table('scheduler_instances')
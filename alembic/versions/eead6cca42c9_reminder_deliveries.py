@@ -0,0 +1,36 @@
+"""reminder deliveries
+
+Revision ID: eead6cca42c9
+Revises: 4dff7c2e3caa
+Create Date: 2026-10-17 11:03:19.227410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'eead6cca42c9'
+down_revision: Union[str, None] = '4dff7c2e3caa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('reminder_deliveries',
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('local_date', sa.Date(), nullable=False),
+    sa.Column('local_minute', sa.SmallInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('kind', 'user_id', 'entity_id', 'local_date', 'local_minute')
+    )
+    op.create_index('ix_reminder_deliveries_created_at', 'reminder_deliveries', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reminder_deliveries_created_at', table_name='reminder_deliveries')
+    op.drop_table('reminder_deliveries')
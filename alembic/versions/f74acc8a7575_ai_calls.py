@@ -0,0 +1,45 @@
+"""ai calls
+
+Revision ID: f74acc8a7575
+Revises: 4f97a3503396
+Create Date: 2026-10-17 18:02:44.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f74acc8a7575'
+down_revision: Union[str, None] = '4f97a3503396'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('ai_calls',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('kind', sa.String(length=30), nullable=False),
+    sa.Column('backend', sa.String(length=30), nullable=False),
+    sa.Column('model', sa.String(length=100), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('fallback', sa.Boolean(), nullable=False),
+    sa.Column('prompt_tokens', sa.Integer(), nullable=True),
+    sa.Column('completion_tokens', sa.Integer(), nullable=True),
+    sa.Column('latency_ms', sa.Integer(), nullable=False),
+    sa.Column('first_token_ms', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_ai_calls_user_created', 'ai_calls', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_ai_calls_backend_created', 'ai_calls', ['backend', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ai_calls_backend_created', table_name='ai_calls')
+    op.drop_index('ix_ai_calls_user_created', table_name='ai_calls')
+    op.drop_table('ai_calls')
@@ -0,0 +1,26 @@
+"""ai calls created_at index
+
+Revision ID: fd1c4beb5af4
+Revises: 6148456fb84c
+Create Date: 2026-10-17 22:14:08.917352
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fd1c4beb5af4'
+down_revision: Union[str, None] = '6148456fb84c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_ai_calls_created_at', 'ai_calls', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ai_calls_created_at', table_name='ai_calls')
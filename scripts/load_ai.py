@@ -0,0 +1,163 @@
+"""Load generator for the AI mentor path.
+
+    # in-process, straight through AIService.get_response (needs DATABASE_URL)
+    python -m scripts.load_ai service --users 50 --requests 10
+
+    # over HTTP against a running API
+    python -m scripts.load_ai api --url http://127.0.0.1:8000 --users 50 --requests 10 --stream
+
+Run the API/bot against scripts/mock_llm.py to benchmark without provider quota.
+Synthetic users get telegram ids from --id-base upwards.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+QUESTIONS = (
+    "Как мне лучше распределить время между учёбой и работой?",
+    "Я пропустил привычку два дня подряд, что делать?",
+    "Дай совет, как не выгорать на длинном проекте.",
+    "Что почитать про асинхронный Python?",
+    "Как подготовиться к техническому собеседованию за неделю?",
+)
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.first_tokens: list[float] = []
+        self.errors = 0
+
+    def report(self, title: str, elapsed: float):
+        total = len(self.latencies) + self.errors
+        print(f"\n{title}")
+        print(f"  requests:   {total} ({self.errors} errors)")
+        print(f"  duration:   {elapsed:.2f}s")
+        print(f"  throughput: {len(self.latencies) / elapsed:.2f} req/s")
+        _print_percentiles("latency", self.latencies)
+        if self.first_tokens:
+            _print_percentiles("first token", self.first_tokens)
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _print_percentiles(name: str, values: list[float]):
+    if not values:
+        return
+    p50, p95, p99 = (_percentile(values, q) * 1000 for q in (0.5, 0.95, 0.99))
+    print(f"  {name:<11} p50 {p50:.0f}ms  p95 {p95:.0f}ms  p99 {p99:.0f}ms  max {max(values) * 1000:.0f}ms")
+
+
+def _message(args, user_index: int, n: int) -> str:
+    text = QUESTIONS[(user_index + n) % len(QUESTIONS)]
+    # Unique by default so the response cache doesn't flatter the numbers.
+    return text if args.repeat else f"{text} (#{user_index}-{n})"
+
+
+def _is_error(reply: str) -> bool:
+    return not reply or reply.startswith(("⚠️", "⏳"))
+
+
+async def run_service(args, stats: Stats):
+    from src.core.database import async_session_factory
+    from src.repositories.user_repo import UserRepository
+    from src.services.ai_backends import close_clients
+    from src.services.ai_service import AIService
+
+    async with async_session_factory() as session:
+        repo = UserRepository(session)
+        user_ids = []
+        for i in range(args.users):
+            user = await repo.get_or_create(args.id_base + i, None, f"load{i}")
+            user_ids.append(user.id)
+        await session.commit()
+
+    async def simulate(index: int, user_id: int):
+        for n in range(args.requests):
+            start = time.monotonic()
+            async with async_session_factory() as session:
+                reply, _ = await AIService(session).get_response(user_id, _message(args, index, n))
+                await session.commit()
+            if _is_error(reply):
+                stats.errors += 1
+            else:
+                stats.latencies.append(time.monotonic() - start)
+            await asyncio.sleep(args.think_time)
+
+    try:
+        await asyncio.gather(*(simulate(i, uid) for i, uid in enumerate(user_ids)))
+    finally:
+        await close_clients()
+
+
+async def run_api(args, stats: Stats):
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=args.url, timeout=120, limits=limits) as client:
+        for i in range(args.users):
+            response = await client.post(
+                "/api/v1/bootstrap", json={"telegram_id": args.id_base + i, "first_name": f"load{i}"}
+            )
+            response.raise_for_status()
+
+        async def chat(index: int, n: int):
+            payload = {
+                "telegram_id": args.id_base + index,
+                "message": _message(args, index, n),
+                "stream": args.stream,
+            }
+            start = time.monotonic()
+            if not args.stream:
+                response = await client.post("/api/v1/mentor/chat", json=payload)
+                reply = response.json().get("reply", "") if response.status_code == 200 else ""
+            else:
+                reply = ""
+                async with client.stream("POST", "/api/v1/mentor/chat", json=payload) as response:
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        event = json.loads(line[5:])
+                        if "delta" in event:
+                            if not reply:
+                                stats.first_tokens.append(time.monotonic() - start)
+                            reply += event["delta"]
+            if _is_error(reply):
+                stats.errors += 1
+            else:
+                stats.latencies.append(time.monotonic() - start)
+
+        async def simulate(index: int):
+            for n in range(args.requests):
+                await chat(index, n)
+                await asyncio.sleep(args.think_time)
+
+        await asyncio.gather(*(simulate(i) for i in range(args.users)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI path load generator")
+    parser.add_argument("mode", choices=("service", "api"))
+    parser.add_argument("--users", type=int, default=20, help="concurrent simulated users")
+    parser.add_argument("--requests", type=int, default=5, help="messages per user")
+    parser.add_argument("--think-time", type=float, default=0.0, help="pause between a user's messages")
+    parser.add_argument("--repeat", action="store_true", help="reuse identical messages (exercises the cache)")
+    parser.add_argument("--id-base", type=int, default=9_000_000_000)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--stream", action="store_true", help="api mode: use SSE and measure first token")
+    args = parser.parse_args()
+
+    stats = Stats()
+    runner = run_service if args.mode == "service" else run_api
+    start = time.monotonic()
+    asyncio.run(runner(args, stats))
+    stats.report(f"{args.mode}: {args.users} users x {args.requests} requests", time.monotonic() - start)
+
+
+if __name__ == "__main__":
+    main()
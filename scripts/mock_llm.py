@@ -0,0 +1,170 @@
+"""OpenAI-compatible mock LLM server for offline benchmarking of the AI path.
+
+    python scripts/mock_llm.py --port 9100 --latency-ms 400 --tokens-per-sec 150 \
+        --error-rate 0.01 --rate-limit-rate 0.02
+
+Point the bot at it with (any non-empty API key will do):
+
+    GROQ_API_KEY=mock
+    GROQ_BASE_URL=http://127.0.0.1:9100/v1/chat/completions
+    OPENROUTER_BASE_URL=http://127.0.0.1:9100/v1/chat/completions
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+WORDS = (
+    "Начни с самой важной задачи и доведи её до конца. "
+    "Разбей работу на короткие шаги по 25 минут, отмечай прогресс и не забывай про привычки. "
+    "Сегодня сфокусируйся на практике: напиши код, запусти тесты, зафиксируй результат."
+).split()
+
+
+def build_app(args) -> FastAPI:
+    app = FastAPI(title="mock-llm")
+    state = {"inflight": 0, "served": 0}
+
+    def latency() -> float:
+        # Log-normal around the median, like real provider queueing + prefill time.
+        return random.lognormvariate(0, args.jitter) * args.latency_ms / 1000
+
+    def reply_tokens() -> list[str]:
+        count = max(1, int(random.gauss(args.reply_tokens, args.reply_tokens * 0.2)))
+        return [random.choice(WORDS) + " " for _ in range(count)]
+
+    def injected_error() -> JSONResponse | None:
+        if args.max_concurrency and state["inflight"] >= args.max_concurrency:
+            return _rate_limited(args.retry_after)
+        roll = random.random()
+        if roll < args.rate_limit_rate:
+            return _rate_limited(args.retry_after)
+        if roll < args.rate_limit_rate + args.error_rate:
+            return JSONResponse({"error": {"message": "mock upstream failure"}}, status_code=500)
+        return None
+
+    @app.post("/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        error = injected_error()
+        if error is not None:
+            return error
+
+        prompt_tokens = sum(len(m.get("content", "")) // 3 for m in body.get("messages", []))
+        tokens = reply_tokens()[: body.get("max_tokens") or None]
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = body.get("model", "mock")
+
+        if body.get("stream"):
+            # Like the real providers, the usage chunk is only sent when asked for.
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            return StreamingResponse(
+                _stream(
+                    state, completion_id, model, tokens, prompt_tokens, latency(), args.tokens_per_sec, include_usage
+                ),
+                media_type="text/event-stream",
+            )
+
+        state["inflight"] += 1
+        try:
+            await asyncio.sleep(latency() + len(tokens) / args.tokens_per_sec)
+        finally:
+            state["inflight"] -= 1
+            state["served"] += 1
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens).strip()},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(tokens),
+                "total_tokens": prompt_tokens + len(tokens),
+            },
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return state
+
+    return app
+
+
+async def _stream(
+    state: dict,
+    completion_id: str,
+    model: str,
+    tokens: list[str],
+    prompt_tokens: int,
+    delay: float,
+    rate: float,
+    include_usage: bool,
+):
+    state["inflight"] += 1
+    try:
+        await asyncio.sleep(delay)
+        for token in tokens:
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+            await asyncio.sleep(1 / rate)
+        if include_usage:
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(tokens),
+                "total_tokens": prompt_tokens + len(tokens),
+            }
+            yield f"data: {json.dumps({'id': completion_id, 'model': model, 'choices': [], 'usage': usage})}\n\n"
+        yield "data: [DONE]\n\n"
+    finally:
+        state["inflight"] -= 1
+        state["served"] += 1
+
+
+def _rate_limited(retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        {"error": {"message": "mock rate limit", "type": "rate_limit_exceeded"}},
+        status_code=429,
+        headers={"retry-after": f"{retry_after:g}"},
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=400, help="median time to first token")
+    parser.add_argument("--jitter", type=float, default=0.5, help="log-normal sigma of the latency")
+    parser.add_argument("--tokens-per-sec", type=float, default=150)
+    parser.add_argument("--reply-tokens", type=int, default=120, help="mean reply length in tokens")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=2.0)
+    parser.add_argument("--max-concurrency", type=int, default=0, help="429 above this many in-flight requests")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    uvicorn.run(build_app(args), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,29 @@
+import hmac
 import json
-import re
-from datetime import date
+from datetime import date, datetime, timedelta
 from pathlib import Path
 from uuid import uuid4
 import logging
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 from sqlalchemy.exc import SQLAlchemyError
 
+from src.config import settings
 from src.core.database import async_session_factory
+from src.core.metrics import registry
 from src.repositories.user_repo import UserRepository
-from src.repositories.task_repo import TaskRepository
-from src.repositories.habit_repo import HabitRepository
+from src.repositories.ai_call_repo import AICallRepository
+from src.repositories.snapshot_repo import SnapshotRepository
 from src.repositories.playlist_repo import PlaylistRepository
 from src.services.task_service import TaskService
 from src.services.habit_service import HabitService
 from src.services.ai_service import AIService
+from src.services.intent_service import IntentService
+from src.services.ai_backends import close_clients
 from src.services.achievement_service import AchievementService
 from src.services.learning_service import LearningService
 from src.services.playlist_service import PlaylistService
@@ -79,6 +83,7 @@ class HabitCreatePayload(BaseModel):
 class MentorChatPayload(BaseModel):
     telegram_id: int
     message: str
+    stream: bool = False
 
 
 class ProfileUpdatePayload(BaseModel):
@@ -216,13 +221,6 @@ def _serialize_user(user) -> dict:
     }
 
 
-def _parse_time_from_text(text: str) -> str | None:
-    match = re.search(r"\b([01]\d|2[0-3]):([0-5]\d)\b", text or "")
-    if not match:
-        return None
-    return f"{match.group(1)}:{match.group(2)}"
-
-
 @app.on_event("startup")
 async def startup():
     try:
@@ -233,6 +231,11 @@ async def startup():
         logger.warning("Startup DB init skipped: %s", e)
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    await close_clients()
+
+
 def _is_db_connectivity_error(exc: Exception) -> bool:
     text = str(exc).lower()
     patterns = (
@@ -305,6 +308,11 @@ async def health():
     return {"ok": True}
 
 
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(registry.render())
+
+
 @app.get("/")
 async def webapp_index():
     return await open_webapp()
@@ -322,15 +330,15 @@ async def open_webapp():
 async def bootstrap(payload: BootstrapRequest):
     async with async_session_factory() as session:
         user = await _get_user(session, payload)
-        task_repo = TaskRepository(session)
-        habit_repo = HabitRepository(session)
         achievement_service = AchievementService(session)
         learning_service = LearningService(session)
         playlist_service = PlaylistService(session)
 
         await achievement_service.evaluate(user.id)
-        tasks = await task_repo.get_user_tasks(user.id, limit=100)
-        habits = await habit_repo.get_active_habits(user.id)
+        snapshot = await SnapshotRepository(session).get_mentor_snapshot(
+            user.id, task_limit=100, active_limit=0, interaction_limit=0
+        )
+        tasks, habits = snapshot.tasks, snapshot.habits
         achievements = await achievement_service.get_user_achievements(user.id)
         resources = await learning_service.get_user_resources(user.id)
         playlists = await playlist_service.get_user_playlists(user.id)
@@ -569,25 +577,19 @@ async def mentor_chat(payload: MentorChatPayload):
             raise HTTPException(status_code=404, detail="User not found")
 
         text = payload.message.strip()
-        settings_data = user.get_settings()
-        ai_perms = settings_data.get("ai_permissions", {})
-
-        if text.lower().startswith("добавь задачу") and ai_perms.get("create_tasks", True):
-            title = text[len("добавь задачу"):].strip(" :.-")
-            if not title:
-                return {"reply": "Напиши так: `добавь задачу <название> [HH:MM]`"}
-            remind_time = _parse_time_from_text(title)
-            title_clean = re.sub(r"\b([01]\d|2[0-3]):([0-5]\d)\b", "", title).strip()
-            task_result = await TaskService(session).create_task(
-                user_id=user.id,
-                title=title_clean,
-                priority="medium",
-                remind_enabled=bool(remind_time),
-                remind_time=remind_time,
-                remind_text=f"🔔 Пора выполнять: {title_clean}",
-            )
+        reply = await IntentService(session).respond(user, text)
+        if reply is not None:
             await session.commit()
-            return {"reply": f"✅ Задача создана: {task_result['title']}"}
+            return {"reply": reply}
+
+        if payload.stream:
+            # The stream opens its own session; settle this one before handing off.
+            await session.commit()
+            return StreamingResponse(
+                _mentor_chat_events(user.id, text),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
 
         ai = AIService(session)
         response, ms = await ai.get_response(user.id, text)
@@ -595,6 +597,18 @@ async def mentor_chat(payload: MentorChatPayload):
         return {"reply": response, "response_time_ms": ms}
 
 
+async def _mentor_chat_events(user_id: int, text: str):
+    def event(data: dict) -> str:
+        return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    async with async_session_factory() as session:
+        ai = AIService(session)
+        async for chunk in ai.stream_response(user_id, text):
+            yield event({"delta": chunk})
+        await session.commit()
+        yield event({"done": True, "response_time_ms": ai.last_response_time_ms})
+
+
 @app.get("/api/v1/mentor/today-plan")
 async def mentor_today_plan(telegram_id: int):
     async with async_session_factory() as session:
@@ -771,3 +785,19 @@ async def cleanup_profile(payload: CompleteTaskPayload):
         result = await DataCleanupService(session).delete_profile(user.id)
         await session.commit()
         return result
+
+
+@app.get("/api/v1/admin/ai-usage")
+async def admin_ai_usage(days: int = 7, user_id: int | None = None, x_admin_token: str = Header(default="")):
+    # A header secret rather than a query parameter, so it stays out of access logs.
+    token = settings.ADMIN_API_TOKEN
+    if not token or not hmac.compare_digest(x_admin_token.encode(), token.encode()):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    since = datetime.utcnow() - timedelta(days=max(1, min(days, 90)))
+    async with async_session_factory() as session:
+        repo = AICallRepository(session)
+        return {
+            "since": since.isoformat(),
+            "tokens_per_user_day": await repo.tokens_per_user_day(since, user_id=user_id),
+            "latency_by_backend": await repo.latency_by_backend(since),
+        }
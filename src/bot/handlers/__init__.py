@@ -6,3 +6,4 @@ from src.bot.handlers.ai_chat import router as ai_chat_router
 from src.bot.handlers.profile import router as profile_router
 from src.bot.handlers.learning import router as learning_router
 from src.bot.handlers.playlists import router as playlists_router
+from src.bot.handlers.reminders import router as reminders_router
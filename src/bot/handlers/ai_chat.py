@@ -1,20 +1,23 @@
-import re
+import time
 from aiogram import Router, F
 from aiogram.filters import Command
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.exceptions import TelegramBadRequest
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config import settings
 from src.models.user import User
 from src.services.ai_service import AIService
 from src.services.gamification_service import GamificationService
-from src.services.task_service import TaskService
+from src.services.intent_service import IntentService
 from src.bot.keyboards.inline import back_keyboard
 
 router = Router()
 
+STREAM_PREVIEW_LIMIT = 3900
+
 
 class AIStates(StatesGroup):
     chatting = State()
@@ -46,33 +49,16 @@ async def st_chat(message: Message, session: AsyncSession, db_user: User, state:
 
 
 async def _ai(message, session, db_user, text):
-    lowered = (text or "").lower()
-    settings_data = db_user.get_settings()
-    ai_perms = settings_data.get("ai_permissions", {})
-
-    if lowered.startswith("добавь задачу") and ai_perms.get("create_tasks", True):
-        raw = text[len("добавь задачу"):].strip(" :.-")
-        if not raw:
-            await message.answer("Формат: `добавь задачу <название> [HH:MM]`", reply_markup=back_keyboard("menu:main"))
-            return
-        time_match = re.search(r"\b([01]\d|2[0-3]):([0-5]\d)\b", raw)
-        remind_time = time_match.group(0) if time_match else None
-        title = re.sub(r"\b([01]\d|2[0-3]):([0-5]\d)\b", "", raw).strip()
-        task = await TaskService(session).create_task(
-            user_id=db_user.id,
-            title=title,
-            remind_enabled=bool(remind_time),
-            remind_time=remind_time,
-            remind_text=f"🔔 Пора выполнять: {title}",
-        )
-        await message.answer(f"✅ Задача создана: *{task['title']}*", reply_markup=back_keyboard("menu:main"))
+    reply = await IntentService(session).respond(db_user, text)
+    if reply is not None:
+        await message.answer(reply, reply_markup=back_keyboard("menu:main"))
         return
 
     t = await message.answer("🤔 Думаю...")
     svc = AIService(session)
-    resp, ms = await svc.get_response(db_user.id, text)
+    resp = await _stream_to_message(t, svc.stream_response(db_user.id, text), db_user.ai_mode)
     await GamificationService(session).award_xp(db_user.id, "ai_session")
-    s = ms / 1000
+    s = svc.last_response_time_ms / 1000
     try:
         await t.edit_text(f"🤖 ({db_user.ai_mode})\n\n{resp}\n\n_⏱{s:.1f}s +5XP_", reply_markup=back_keyboard("menu:main"))
     except TelegramBadRequest:
@@ -82,6 +68,27 @@ async def _ai(message, session, db_user, text):
             pass
 
 
+async def _stream_to_message(t: Message, stream, mode: str) -> str:
+    # Partial markdown is often unbalanced, so progress edits go out as plain text.
+    text = ""
+    shown = ""
+    next_edit_at = 0.0
+    async for chunk in stream:
+        text += chunk
+        now = time.monotonic()
+        if now < next_edit_at or not text.strip() or text == shown:
+            continue
+        shown = text
+        next_edit_at = now + settings.AI_STREAM_EDIT_INTERVAL
+        try:
+            await t.edit_text(f"🤖 ({mode})\n\n{text[:STREAM_PREVIEW_LIMIT]} ▌", parse_mode=None)
+        except TelegramRetryAfter as e:
+            next_edit_at = time.monotonic() + e.retry_after
+        except TelegramBadRequest:
+            pass
+    return text.strip()
+
+
 @router.message(F.text == "🤖 AI")
 async def reply(message: Message, session: AsyncSession, db_user: User, state: FSMContext):
     await state.set_state(AIStates.chatting)
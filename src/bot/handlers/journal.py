@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.models.user import User
 from src.services.journal_service import JournalService
 from src.services.ai_service import AIService
+from src.services.ai_backends.errors import AIBackendError
 from src.repositories.journal_repo import JournalRepository
 from src.bot.keyboards.inline import journal_menu_keyboard, journal_entry_keyboard, journal_list_keyboard, back_keyboard
 
@@ -127,7 +128,11 @@ async def cb_ai_check(callback: CallbackQuery, session: AsyncSession, db_user: U
         return
     await callback.answer("Проверяю...")
     ai = AIService(session)
-    rewritten = await ai.rewrite_journal_entry(entry.content)
+    try:
+        rewritten = await ai.rewrite_journal_entry(entry.content, user_id=db_user.id)
+    except AIBackendError as e:
+        await callback.message.answer(e.user_message)
+        return
     await repo.update(eid, content=rewritten)
     tags = " ".join(f"#{t}" for t in (entry.tags or []))
     text = f"📝 *{entry.title}*\n_{entry.created_at.strftime('%d.%m.%Y %H:%M')}_\n{tags}\n\n{rewritten[:3500]}"
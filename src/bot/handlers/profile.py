@@ -45,6 +45,7 @@ DEFAULT_NOTIF = {
     "streak": True, "weekly": True,
     "morning_time": "08:00", "evening_time": "21:00",
     "task_remind_default": True, "habit_remind_default": True,
+    "digest": False,
     "remind_text_template": "🔔 Пора: {name}",
 }
 
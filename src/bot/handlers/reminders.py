@@ -0,0 +1,54 @@
+from aiogram import Router, F
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup
+from aiogram.exceptions import TelegramBadRequest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.user import User
+from src.services.task_service import TaskService
+from src.services.habit_service import HabitService
+
+router = Router()
+
+
+async def _drop_button(callback: CallbackQuery):
+    markup = callback.message.reply_markup
+    if not markup:
+        return
+    rows = [
+        row for row in markup.inline_keyboard
+        if not any(b.callback_data == callback.data for b in row)
+    ]
+    try:
+        await callback.message.edit_reply_markup(reply_markup=InlineKeyboardMarkup(inline_keyboard=rows))
+    except TelegramBadRequest:
+        pass
+
+
+@router.callback_query(F.data.startswith("digest:task:"))
+async def cb_digest_task(callback: CallbackQuery, session: AsyncSession, db_user: User):
+    tid = int(callback.data.split(":")[2])
+    r = await TaskService(session).complete_task(db_user.id, tid)
+    if r.get("error"):
+        await callback.answer(r["error"])
+        await _drop_button(callback)
+        return
+    lm = f" 🎉 LEVEL UP! {r['new_level']}" if r.get("leveled_up") else ""
+    await callback.answer(f"✅ {r['title']} +{r['xp_earned']}XP{lm}")
+    await _drop_button(callback)
+
+
+@router.callback_query(F.data.startswith("digest:habit:"))
+async def cb_digest_habit(callback: CallbackQuery, session: AsyncSession, db_user: User):
+    hid = int(callback.data.split(":")[2])
+    r = await HabitService(session).log_completion(db_user.id, hid)
+    if r.get("error"):
+        await callback.answer(r["error"])
+        await _drop_button(callback)
+        return
+    if r.get("already_logged"):
+        await callback.answer(f"Уже! 🔥{r['streak']}d")
+        await _drop_button(callback)
+        return
+    ms = f" 🏆{r['streak_milestone']}d!" if r.get("streak_milestone") else ""
+    await callback.answer(f"✅ 🔥{r['streak']}d +{r['xp_earned']}XP{ms}")
+    await _drop_button(callback)
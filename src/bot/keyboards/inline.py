@@ -393,11 +393,20 @@ def notification_settings_keyboard(settings_dict: dict) -> InlineKeyboardMarkup:
         [InlineKeyboardButton(text=f"{icon('weekly')} 📊 Недельный обзор", callback_data="notif:toggle:weekly")],
         [InlineKeyboardButton(text=f"{icon('task_remind_default')} 📋 Напоминания задач", callback_data="notif:toggle:task_remind_default")],
         [InlineKeyboardButton(text=f"{icon('habit_remind_default')} 🔄 Напоминания привычек", callback_data="notif:toggle:habit_remind_default")],
+        [InlineKeyboardButton(text=f"{icon('digest')} 📨 Объединять в сводку", callback_data="notif:toggle:digest")],
         [InlineKeyboardButton(text="🕐 Время уведомлений", callback_data="notif:time")],
         [InlineKeyboardButton(text="◀️ Настройки", callback_data="menu:settings")],
     ])
 
 
+def reminder_digest_keyboard(items: list[tuple[str, int, str]]) -> InlineKeyboardMarkup:
+    buttons = []
+    for kind, entity_id, label in items:
+        buttons.append([InlineKeyboardButton(text=f"✅ {label[:40]}", callback_data=f"digest:{kind}:{entity_id}")])
+    buttons.append([InlineKeyboardButton(text="🏠 Меню", callback_data="menu:main")])
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
+
+
 def notif_time_period_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text="🌅 Утреннее время", callback_data="notif_time:morning")],
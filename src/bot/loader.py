@@ -23,6 +23,7 @@ def setup_routers():
     from src.bot.handlers.profile import router as profile_router
     from src.bot.handlers.learning import router as learning_router
     from src.bot.handlers.playlists import router as playlists_router
+    from src.bot.handlers.reminders import router as reminders_router
 
     dp.include_router(start_router)
     dp.include_router(tasks_router)
@@ -32,3 +33,4 @@ def setup_routers():
     dp.include_router(profile_router)
     dp.include_router(learning_router)
     dp.include_router(playlists_router)
+    dp.include_router(reminders_router)
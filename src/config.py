@@ -9,14 +9,90 @@ class Settings(BaseSettings):
     OPENROUTER_API_KEY: str = ""
 
     AI_BACKEND: str = "groq"
+    # Overridable so the backends can be pointed at scripts/mock_llm.py.
+    GROQ_BASE_URL: str = "https://api.groq.com/openai/v1/chat/completions"
+    OPENROUTER_BASE_URL: str = "https://openrouter.ai/api/v1/chat/completions"
+
+    AI_HTTP2: bool = False
+    AI_POOL_MAX_CONNECTIONS: int = 20
+    AI_POOL_MAX_KEEPALIVE: int = 10
+    AI_POOL_KEEPALIVE_EXPIRY: float = 60.0
+    AI_STREAM_EDIT_INTERVAL: float = 1.0
+
+    AI_HEDGING: bool = True
+    AI_HEDGE_DEFAULT_DELAY: float = 4.0
+    AI_HEDGE_MIN_DELAY: float = 0.5
+    AI_HEDGE_MAX_DELAY: float = 10.0
+    AI_HEDGE_MIN_SAMPLES: int = 20
+
+    AI_BREAKER_FAILURE_THRESHOLD: int = 5
+    AI_BREAKER_COOLDOWN_SECONDS: float = 30.0
+    AI_BREAKER_MAX_COOLDOWN_SECONDS: float = 300.0
+
+    AI_MAX_CONCURRENCY: int = 8
+    AI_MAX_QUEUED: int = 200
+    AI_USER_MAX_QUEUED: int = 1
+    AI_DISPATCH_BACKOFF_SECONDS: float = 10.0
+
+    AI_RESPONSE_CACHE: bool = True
+    AI_CACHE_MAX_ENTRIES: int = 2000
+    AI_CACHE_TTL_SECONDS: int = 1800
+    AI_CONTEXT_CACHE_MAX_USERS: int = 5000
+    AI_CONTEXT_CACHE_TTL_SECONDS: int = 600
+    AI_RETRIEVAL: bool = True
+    AI_RETRIEVAL_TOP_K: int = 4
+    AI_RETRIEVAL_MAX_DOCUMENTS: int = 300
+    AI_RETRIEVAL_MAX_USERS: int = 2000
+    AI_RETRIEVAL_TTL_SECONDS: int = 1800
+    AI_CALL_RETENTION_DAYS: int = 30
 
     ALLOWED_TELEGRAM_IDS: str = ""
     ADMIN_TELEGRAM_ID: int = 0
+    # Sent as X-Admin-Token to the admin API; empty disables those endpoints.
+    ADMIN_API_TOKEN: str = ""
 
     LOG_LEVEL: str = "INFO"
     TIMEZONE: str = "Europe/Moscow"
     WEBAPP_URL: str = "http://127.0.0.1:8000/webapp"
 
+    DELIVERY_CONCURRENCY: int = 8
+    DELIVERY_GLOBAL_RATE: float = 30.0
+    DELIVERY_CHAT_INTERVAL: float = 1.0
+    DELIVERY_MAX_ATTEMPTS: int = 5
+    OUTBOX_BATCH_SIZE: int = 200
+    OUTBOX_POLL_SECONDS: float = 1.0
+    OUTBOX_LEASE_SECONDS: int = 120
+    OUTBOX_RETENTION_HOURS: int = 48
+
+    REMINDER_DEDUP_BACKEND: str = "postgres"
+    REMINDER_DEDUP_TTL_HOURS: int = 48
+    REMINDER_DEDUP_FRONT_TTL_SECONDS: int = 600
+    REMINDER_DEDUP_FRONT_MAX_SIZE: int = 50000
+
+    SCHEDULER_PARTITIONS: int = 16
+    SCHEDULER_LEASE_SECONDS: int = 60
+    SCHEDULER_LEASE_RENEW_SECONDS: int = 15
+    SCHEDULER_INSTANCE_ID: str = ""
+    REMINDER_CATCHUP_MINUTES: int = 60
+
+    ACTIVITY_IDLE_DAYS: int = 7
+    ACTIVITY_DORMANT_DAYS: int = 30
+    ACTIVITY_REFRESH_HOURS: int = 6
+    ACTIVITY_REENGAGE_WEEKDAY: int = 0
+
+    MEMORY_COMPRESSION_HOUR: int = 3
+    MEMORY_COMPRESSION_MIN_INTERACTIONS: int = 5
+    MEMORY_COMPRESSION_CONCURRENCY: int = 4
+    MEMORY_COMPRESSION_BATCH_SIZE: int = 100
+
+    DAILY_BRIEF_HOUR: int = 5
+    DAILY_BRIEF_INTERVAL_MINUTES: int = 15
+    DAILY_BRIEF_BATCH_SIZE: int = 200
+    DAILY_BRIEF_TASK_LIMIT: int = 100
+
+    METRICS_HOST: str = "127.0.0.1"
+    METRICS_PORT: int = 0
+
     @property
     def allowed_ids(self) -> set[int]:
         if not self.ALLOWED_TELEGRAM_IDS:
@@ -0,0 +1,81 @@
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from src.config import settings
+from src.core.metrics import registry
+
+LOOKUPS = registry.counter("ai_context_cache_lookups_total", "Mentor context block lookups, by block and result")
+
+
+# Rendered context blocks per user, kept until a commit touches their source rows.
+class ContextCache:
+    def __init__(
+        self,
+        max_users: int = settings.AI_CONTEXT_CACHE_MAX_USERS,
+        ttl_seconds: int = settings.AI_CONTEXT_CACHE_TTL_SECONDS,
+    ):
+        self.max_users = max_users
+        self.ttl = ttl_seconds
+        # user_id -> (expires_at, {block: items})
+        self.users: OrderedDict[int, tuple[float, dict[str, list[str]]]] = OrderedDict()
+        # Bumped on every invalidation so a read that raced a commit can't be stored.
+        self.versions: dict[int, int] = {}
+        # Versions come from one counter; users pruned from `versions` fall back to the
+        # counter value at the last prune, which is newer than any version handed out before.
+        self.clock = 0
+        self.floor = 0
+
+    def version(self, user_id: int) -> int:
+        return self.versions.get(user_id, self.floor)
+
+    def get(self, user_id: int, block: str) -> list[str] | None:
+        entry = self.users.get(user_id)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self.users[user_id]
+            entry = None
+        items = entry[1].get(block) if entry else None
+        LOOKUPS.inc(block=block, result="miss" if items is None else "hit")
+        if items is not None:
+            self.users.move_to_end(user_id)
+        return items
+
+    def put(self, user_id: int, block: str, items: list[str], version: int):
+        if self.max_users <= 0 or version != self.version(user_id):
+            return
+        entry = self.users.get(user_id)
+        if entry is None or entry[0] <= time.monotonic():
+            entry = (time.monotonic() + self.ttl, {})
+            self.users[user_id] = entry
+        entry[1][block] = items
+        self.users.move_to_end(user_id)
+        while len(self.users) > self.max_users:
+            self.users.popitem(last=False)
+
+    def drop(self, user_id: int, *blocks: str):
+        self._bump(user_id)
+        entry = self.users.get(user_id)
+        if entry is None:
+            return
+        if not blocks:
+            del self.users[user_id]
+            return
+        for block in blocks:
+            entry[1].pop(block, None)
+
+    def patch(self, user_id: int, block: str, update: Callable[[list[str]], list[str]]):
+        self._bump(user_id)
+        entry = self.users.get(user_id)
+        if entry is not None and block in entry[1]:
+            entry[1][block] = update(entry[1][block])
+
+    def _bump(self, user_id: int):
+        self.clock += 1
+        self.versions[user_id] = self.clock
+        # Keep only users with a cached entry once the map outgrows the LRU.
+        if len(self.versions) > 2 * max(1, self.max_users):
+            self.versions = {uid: v for uid, v in self.versions.items() if uid in self.users}
+            self.floor = self.clock
+
+
+context_cache = ContextCache()
@@ -0,0 +1,67 @@
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.repositories.reminder_repo import ReminderRepository
+
+logger = logging.getLogger(__name__)
+
+
+def dedup_key(kind: str, user_id: int, entity_id: int | None, local_fire: datetime) -> tuple:
+    return (
+        kind,
+        user_id,
+        entity_id or 0,
+        local_fire.date(),
+        local_fire.hour * 60 + local_fire.minute,
+    )
+
+
+class ReminderDedupStore:
+    def __init__(
+        self,
+        backend: str = settings.REMINDER_DEDUP_BACKEND,
+        ttl_hours: int = settings.REMINDER_DEDUP_TTL_HOURS,
+        front_ttl_seconds: int = settings.REMINDER_DEDUP_FRONT_TTL_SECONDS,
+        front_max_size: int = settings.REMINDER_DEDUP_FRONT_MAX_SIZE,
+    ):
+        self.durable = backend == "postgres"
+        self.ttl = timedelta(hours=ttl_hours)
+        self.front_ttl = front_ttl_seconds if self.durable else ttl_hours * 3600
+        self.front_max_size = front_max_size
+        self.front: OrderedDict[tuple, float] = OrderedDict()
+
+    async def claim(self, session: AsyncSession, keys: list[tuple]) -> set[tuple]:
+        now = time.monotonic()
+        self._expire(now)
+        fresh = [k for k in dict.fromkeys(keys) if k not in self.front]
+        if not self.durable:
+            return set(fresh)
+        return await ReminderRepository(session).claim_deliveries(fresh)
+
+    def remember(self, keys: list[tuple]):
+        expires_at = time.monotonic() + self.front_ttl
+        for key in keys:
+            self.front[key] = expires_at
+            self.front.move_to_end(key)
+        while len(self.front) > self.front_max_size:
+            self.front.popitem(last=False)
+
+    async def purge(self, session: AsyncSession) -> int:
+        self._expire(time.monotonic())
+        if not self.durable:
+            return 0
+        return await ReminderRepository(session).purge_deliveries(
+            datetime.utcnow() - self.ttl
+        )
+
+    def _expire(self, now: float):
+        while self.front:
+            key, expires_at = next(iter(self.front.items()))
+            if expires_at > now:
+                break
+            self.front.popitem(last=False)
@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramNotFound,
+    TelegramRetryAfter,
+)
+from aiogram.types import InlineKeyboardMarkup
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.core.database import async_session_factory
+from src.core.metrics import registry
+from src.models.reminder import NotificationOutbox
+from src.repositories.outbox_repo import OutboxRepository
+
+logger = logging.getLogger(__name__)
+
+MESSAGES = registry.counter("reminder_messages_total", "Reminder messages by outcome")
+SEND_LATENCY = registry.histogram(
+    "reminder_send_latency_seconds", "Delay from the scheduled minute to the actual send"
+)
+INFLIGHT = registry.gauge(
+    "reminder_outbox_inflight", "Outbox rows claimed by this process and not yet settled"
+)
+
+PERMANENT_ERRORS = (TelegramForbiddenError, TelegramBadRequest, TelegramNotFound)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated_at) * self.rate
+                )
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def set_rate(self, rate: float):
+        self.rate = rate
+        self.capacity = rate
+        self.tokens = min(self.tokens, self.capacity)
+
+
+class OutboundMessage:
+    __slots__ = ("id", "chat_id", "text", "reply_markup", "scheduled_at", "attempts")
+
+    def __init__(self, row: NotificationOutbox):
+        self.id = row.id
+        self.chat_id = row.chat_id
+        self.text = row.text
+        self.reply_markup = (
+            InlineKeyboardMarkup.model_validate_json(row.reply_markup)
+            if row.reply_markup
+            else None
+        )
+        self.scheduled_at = row.scheduled_at or row.created_at
+        self.attempts = row.attempts
+
+
+class DeliveryQueue:
+    def __init__(
+        self,
+        owner: str,
+        concurrency: int = settings.DELIVERY_CONCURRENCY,
+        global_rate: float = settings.DELIVERY_GLOBAL_RATE,
+        chat_interval: float = settings.DELIVERY_CHAT_INTERVAL,
+        max_attempts: int = settings.DELIVERY_MAX_ATTEMPTS,
+        batch_size: int = settings.OUTBOX_BATCH_SIZE,
+        poll_seconds: float = settings.OUTBOX_POLL_SECONDS,
+        lease_seconds: int = settings.OUTBOX_LEASE_SECONDS,
+    ):
+        self.owner = owner
+        self.concurrency = concurrency
+        self.chat_interval = chat_interval
+        self.max_attempts = max_attempts
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.lease_ttl = timedelta(seconds=lease_seconds)
+        self.global_rate = global_rate
+        self.bucket = TokenBucket(global_rate)
+        self.queue: asyncio.Queue[OutboundMessage] = asyncio.Queue()
+        self.chat_ready_at: dict[int, float] = {}
+        self.updates: list[dict] = []
+        self.inflight = 0
+        self.wakeup = asyncio.Event()
+        self.workers: list[asyncio.Task] = []
+        self.poller: asyncio.Task | None = None
+        self.bot = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self.workers)
+
+    def start(self, bot):
+        if self.running:
+            return
+        self.bot = bot
+        self.workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.concurrency)
+        ]
+        self.poller = asyncio.create_task(self._poll())
+
+    async def stop(self):
+        tasks = self.workers + ([self.poller] if self.poller else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.workers = []
+        self.poller = None
+        await self._flush()
+        try:
+            async with async_session_factory() as session:
+                await OutboxRepository(session).release(self.owner)
+                await session.commit()
+        except Exception as e:
+            logger.warning("Outbox release skipped (db/network): %s", e)
+
+    def wake(self):
+        self.wakeup.set()
+
+    def set_instances(self, count: int):
+        # DELIVERY_GLOBAL_RATE is the bot-wide limit; every live replica drains the outbox.
+        rate = self.global_rate / max(1, count)
+        if rate != self.bucket.rate:
+            logger.info("Delivery rate %.2f msg/s across %s instances", rate, count)
+            self.bucket.set_rate(rate)
+
+    @staticmethod
+    async def enqueue(session: AsyncSession, label: str, messages: list[tuple]) -> int:
+        now = datetime.utcnow()
+        rows = [
+            {
+                "chat_id": chat_id,
+                "text": text,
+                "reply_markup": (
+                    reply_markup.model_dump_json(exclude_none=True) if reply_markup else None
+                ),
+                "label": label,
+                "status": "pending",
+                "attempts": 0,
+                "scheduled_at": scheduled_at,
+                "available_at": now,
+            }
+            for chat_id, text, reply_markup, scheduled_at in messages
+        ]
+        return await OutboxRepository(session).enqueue(rows)
+
+    async def _poll(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            await self._flush()
+            await self._fill()
+
+    async def _fill(self):
+        limit = self.batch_size - self.inflight
+        if limit <= 0:
+            return
+        now = datetime.utcnow()
+        try:
+            async with async_session_factory() as session:
+                rows = await OutboxRepository(session).claim(
+                    self.owner, limit, now, now + self.lease_ttl
+                )
+                await session.commit()
+        except Exception as e:
+            logger.warning("Outbox claim skipped (db/network): %s", e)
+            return
+        for row in rows:
+            self.queue.put_nowait(OutboundMessage(row))
+        self.inflight += len(rows)
+        INFLIGHT.set(self.inflight)
+
+    async def _flush(self):
+        if not self.updates:
+            return
+        updates, self.updates = self.updates, []
+        try:
+            async with async_session_factory() as session:
+                await OutboxRepository(session).record(updates)
+                await session.commit()
+        except Exception as e:
+            logger.warning("Outbox status flush skipped (db/network): %s", e)
+            self.updates = updates + self.updates
+            return
+        counts: dict[str, int] = {}
+        for update in updates:
+            counts[update["status"]] = counts.get(update["status"], 0) + 1
+        logger.info("Outbox flush: %s", counts)
+
+    async def _worker(self):
+        while True:
+            message = await self.queue.get()
+            try:
+                await self._deliver(message)
+            except Exception as e:
+                logger.error("Delivery worker error: %s", e)
+                self._retry(message, 2 ** message.attempts, str(e))
+            finally:
+                self.queue.task_done()
+
+    async def _deliver(self, message: OutboundMessage):
+        now = time.monotonic()
+        ready_at = self.chat_ready_at.get(message.chat_id, 0.0)
+        if ready_at > now:
+            self._requeue(message, ready_at - now)
+            return
+        self.chat_ready_at[message.chat_id] = now + self.chat_interval
+        self._prune_chats(now)
+
+        await self.bucket.acquire()
+        try:
+            await self.bot.send_message(
+                message.chat_id, message.text, reply_markup=message.reply_markup
+            )
+        except TelegramRetryAfter as e:
+            self.chat_ready_at[message.chat_id] = time.monotonic() + e.retry_after
+            self._retry(message, e.retry_after, str(e))
+            return
+        except PERMANENT_ERRORS as e:
+            logger.info("Delivery to %s dropped: %s", message.chat_id, e)
+            self._fail(message, str(e))
+            return
+        except Exception as e:
+            logger.warning("Delivery to %s failed: %s", message.chat_id, e)
+            self._retry(message, 2 ** message.attempts, str(e))
+            return
+
+        sent_at = datetime.utcnow()
+        latency = (sent_at - message.scheduled_at).total_seconds()
+        MESSAGES.inc(outcome="sent")
+        SEND_LATENCY.observe(latency)
+        self._done(
+            message,
+            status="sent",
+            sent_at=sent_at,
+            latency_ms=int(latency * 1000),
+        )
+
+    def _retry(self, message: OutboundMessage, delay: float, error: str):
+        if message.attempts >= self.max_attempts:
+            self._fail(message, error)
+            return
+        MESSAGES.inc(outcome="retried")
+        self._done(
+            message,
+            status="pending",
+            available_at=datetime.utcnow() + timedelta(seconds=delay),
+            last_error=error[:500],
+        )
+
+    def _fail(self, message: OutboundMessage, error: str):
+        MESSAGES.inc(outcome="failed")
+        self._done(message, status="failed", last_error=error[:500])
+
+    def _done(self, message: OutboundMessage, **values):
+        self.updates.append(
+            {"id": message.id, "claimed_by": None, "claimed_until": None, **values}
+        )
+        self.inflight -= 1
+        INFLIGHT.set(self.inflight)
+
+    def _requeue(self, message: OutboundMessage, delay: float):
+        asyncio.get_running_loop().call_later(delay, self.queue.put_nowait, message)
+
+    def _prune_chats(self, now: float):
+        if len(self.chat_ready_at) < 10000:
+            return
+        self.chat_ready_at = {
+            chat_id: ready_at
+            for chat_id, ready_at in self.chat_ready_at.items()
+            if ready_at > now
+        }
@@ -0,0 +1,49 @@
+import logging
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# (state, obj, user_id) with state in "new" / "dirty" / "deleted"
+Change = tuple[str, object, int]
+
+_subscribers: list[Callable[[list[Change]], None]] = []
+
+
+def on_commit(callback: Callable[[list[Change]], None]):
+    # Subscribers see the per-user ORM changes of a transaction once it has committed,
+    # so rolled-back writes never evict anything. Bulk UPDATE/DELETE statements bypass
+    # the unit of work and are not reported.
+    _subscribers.append(callback)
+    return callback
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    changes = session.info.setdefault("user_changes", [])
+    for state, objs in (("new", session.new), ("dirty", session.dirty), ("deleted", session.deleted)):
+        for obj in objs:
+            user_id = obj.id if isinstance(obj, User) else getattr(obj, "user_id", None)
+            if user_id is not None:
+                changes.append((state, obj, user_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changes(session):
+    changes = session.info.pop("user_changes", None)
+    if not changes:
+        return
+    for callback in _subscribers:
+        try:
+            callback(changes)
+        except Exception:
+            logger.exception("Commit subscriber %s failed", callback.__name__)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("user_changes", None)
@@ -0,0 +1,88 @@
+import logging
+import math
+import os
+import socket
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from src.config import settings
+from src.core.database import async_session_factory
+from src.repositories.lease_repo import LeaseRepository
+
+logger = logging.getLogger(__name__)
+
+
+class PartitionLeaseManager:
+    def __init__(
+        self,
+        total: int = settings.SCHEDULER_PARTITIONS,
+        lease_seconds: int = settings.SCHEDULER_LEASE_SECONDS,
+        instance_id: str = settings.SCHEDULER_INSTANCE_ID,
+    ):
+        self.total = max(1, total)
+        self.lease_ttl = timedelta(seconds=lease_seconds)
+        self.instance_id = instance_id or (
+            f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:6]}"
+        )
+        self.owned: set[int] = set()
+        self.valid_until = datetime.min
+        self.live = 1
+
+    @property
+    def active_partitions(self) -> set[int]:
+        if datetime.utcnow() >= self.valid_until:
+            return set()
+        return self.owned
+
+    async def rebalance(self) -> set[int]:
+        now = datetime.utcnow()
+        until = now + self.lease_ttl
+        try:
+            async with async_session_factory() as session:
+                repo = LeaseRepository(session)
+                await repo.heartbeat(self.instance_id, now)
+                await repo.delete_stale_instances(now - self.lease_ttl)
+                await repo.ensure_partitions(self.total)
+
+                owned = await repo.renew(self.instance_id, self.total, until)
+                live = max(1, await repo.count_live_instances(now - self.lease_ttl))
+                share = math.ceil(self.total / live)
+
+                if len(owned) > share:
+                    extra = set(sorted(owned)[share:])
+                    await repo.release(self.instance_id, extra)
+                    owned -= extra
+                elif len(owned) < share:
+                    owned |= await repo.claim(
+                        self.instance_id, self.total, share - len(owned), now, until
+                    )
+                await session.commit()
+        except Exception as e:
+            logger.warning("Partition rebalance skipped (db/network): %s", e)
+            # Keep serving only while the previous leases are still valid.
+            if datetime.utcnow() >= self.valid_until:
+                self.owned = set()
+            return self.owned
+
+        if owned != self.owned:
+            logger.info(
+                "Scheduler %s owns partitions %s/%s",
+                self.instance_id,
+                sorted(owned),
+                self.total,
+            )
+        self.owned = owned
+        self.valid_until = until
+        self.live = live
+        return owned
+
+    async def release_all(self):
+        self.owned = set()
+        try:
+            async with async_session_factory() as session:
+                repo = LeaseRepository(session)
+                await repo.release(self.instance_id)
+                await repo.remove_instance(self.instance_id)
+                await session.commit()
+        except Exception as e:
+            logger.warning("Partition release skipped (db/network): %s", e)
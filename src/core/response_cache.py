@@ -0,0 +1,107 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+
+from src.config import settings
+from src.core.invalidation import Change, on_commit
+from src.core.metrics import registry
+from src.models.ai_memory import AIMemorySummary
+from src.models.habit import Habit, HabitLog
+from src.models.task import Task
+
+logger = logging.getLogger(__name__)
+
+LOOKUPS = registry.counter("ai_response_cache_lookups_total", "AI response cache lookups, by kind and result")
+HIT_RATIO = registry.gauge("ai_response_cache_hit_ratio", "Share of AI response cache lookups served from cache")
+SAVED_SECONDS = registry.counter("ai_response_cache_saved_seconds_total", "LLM latency avoided by cache hits")
+ENTRIES = registry.gauge("ai_response_cache_entries", "Entries held in the AI response cache")
+
+# Changes to these rows alter what the mentor knows about the user.
+INVALIDATING_MODELS = (Task, Habit, HabitLog, AIMemorySummary)
+
+
+def normalize_message(text: str) -> str:
+    return " ".join((text or "").casefold().split())
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        max_entries: int = settings.AI_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = settings.AI_CACHE_TTL_SECONDS,
+    ):
+        self.enabled = settings.AI_RESPONSE_CACHE and max_entries > 0
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        # key -> (expires_at, user_id, response, cost_seconds)
+        self.entries: OrderedDict[str, tuple[float, int | None, str, float]] = OrderedDict()
+        self.by_user: dict[int, set[str]] = {}
+        self.hits = 0
+        self.lookups = 0
+
+    @staticmethod
+    def key(kind: str, model: str, system_prompt: str, context: str, message: str) -> str:
+        digest = hashlib.sha256()
+        for part in (kind, model, system_prompt, context, message):
+            digest.update(part.encode())
+            digest.update(b"\x1f")
+        return digest.hexdigest()
+
+    def get(self, key: str, kind: str) -> str | None:
+        if not self.enabled:
+            return None
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            self._drop(key)
+            entry = None
+        self.lookups += 1
+        if entry is None:
+            LOOKUPS.inc(kind=kind, result="miss")
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            LOOKUPS.inc(kind=kind, result="hit")
+            SAVED_SECONDS.inc(entry[3], kind=kind)
+        HIT_RATIO.set(round(self.hits / self.lookups, 4))
+        return entry[2] if entry else None
+
+    def put(self, key: str, user_id: int | None, response: str, cost_seconds: float = 0.0):
+        if not self.enabled or not response:
+            return
+        self._drop(key)
+        self.entries[key] = (time.monotonic() + self.ttl, user_id, response, cost_seconds)
+        if user_id is not None:
+            self.by_user.setdefault(user_id, set()).add(key)
+        while len(self.entries) > self.max_entries:
+            self._drop(next(iter(self.entries)))
+        ENTRIES.set(len(self.entries))
+
+    def invalidate_user(self, user_id: int):
+        keys = self.by_user.pop(user_id, ())
+        for key in keys:
+            self.entries.pop(key, None)
+        if keys:
+            ENTRIES.set(len(self.entries))
+
+    def _drop(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry is None or entry[1] is None:
+            return
+        keys = self.by_user.get(entry[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.by_user[entry[1]]
+
+
+response_cache = ResponseCache()
+
+
+# The cache is per process: the bot and the API each drop their own entries on
+# commit, and the TTL bounds staleness across them.
+@on_commit
+def _invalidate_changed_users(changes: list[Change]):
+    for _, obj, user_id in changes:
+        if isinstance(obj, INVALIDATING_MODELS):
+            response_cache.invalidate_user(user_id)
@@ -0,0 +1,111 @@
+import time
+from collections import OrderedDict
+
+from src.config import settings
+from src.core.invalidation import Change, on_commit
+from src.core.metrics import registry
+from src.models.ai_memory import AIInteraction
+from src.models.journal import JournalEntry
+from src.models.user import User
+from src.utils.bm25 import BM25Index
+
+LOOKUPS = registry.counter("ai_retrieval_index_lookups_total", "Per-user retrieval index lookups, by result")
+USERS = registry.gauge("ai_retrieval_index_users", "Users with a loaded retrieval index")
+
+
+def journal_text(title: str, content: str) -> str:
+    title = (title or "").strip()
+    content = (content or "").strip()
+    return content if not title or content.startswith(title) else f"{title}\n{content}"
+
+
+def interaction_text(user_message: str, ai_response: str) -> str:
+    return f"User: {user_message}\nAI: {ai_response}"
+
+
+# Per-user BM25 indexes over journal entries and past conversations. Loaded lazily on
+# the first query and kept current from committed inserts; the TTL bounds staleness
+# from writes made by other processes.
+class RetrievalIndex:
+    def __init__(
+        self,
+        max_users: int = settings.AI_RETRIEVAL_MAX_USERS,
+        ttl_seconds: int = settings.AI_RETRIEVAL_TTL_SECONDS,
+    ):
+        self.max_users = max_users
+        self.ttl = ttl_seconds
+        self.users: OrderedDict[int, tuple[float, BM25Index]] = OrderedDict()
+        # Bumped on every change so an index built from a read that raced a commit isn't kept.
+        self.versions: dict[int, int] = {}
+        # Same scheme as ContextCache: one counter, and a floor for users pruned from `versions`.
+        self.clock = 0
+        self.floor = 0
+
+    def version(self, user_id: int) -> int:
+        return self.versions.get(user_id, self.floor)
+
+    def get(self, user_id: int) -> BM25Index | None:
+        entry = self.users.get(user_id)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self.users[user_id]
+            entry = None
+        LOOKUPS.inc(result="miss" if entry is None else "hit")
+        if entry is None:
+            return None
+        self.users.move_to_end(user_id)
+        return entry[1]
+
+    def build(self, user_id: int, documents: list[tuple[tuple[str, int], str]], version: int) -> BM25Index:
+        index = BM25Index()
+        for key, text in documents:
+            index.add(key, text)
+        if self.max_users > 0 and version == self.version(user_id):
+            self.users[user_id] = (time.monotonic() + self.ttl, index)
+            self.users.move_to_end(user_id)
+            while len(self.users) > self.max_users:
+                self.users.popitem(last=False)
+            USERS.set(len(self.users))
+        return index
+
+    def add(self, user_id: int, key: tuple[str, int], text: str):
+        self._bump(user_id)
+        entry = self.users.get(user_id)
+        if entry is not None:
+            entry[1].add(key, text)
+
+    def remove(self, user_id: int, key: tuple[str, int]):
+        self._bump(user_id)
+        entry = self.users.get(user_id)
+        if entry is not None:
+            entry[1].remove(key)
+
+    def drop(self, user_id: int):
+        self._bump(user_id)
+        self.users.pop(user_id, None)
+        USERS.set(len(self.users))
+
+    def _bump(self, user_id: int):
+        self.clock += 1
+        self.versions[user_id] = self.clock
+        # Forget users without a loaded index once the map outgrows max_users.
+        if len(self.versions) > 2 * max(1, self.max_users):
+            self.versions = {uid: v for uid, v in self.versions.items() if uid in self.users}
+            self.floor = self.clock
+
+
+retrieval_index = RetrievalIndex()
+
+
+@on_commit
+def _index_committed(changes: list[Change]):
+    for state, obj, user_id in changes:
+        if isinstance(obj, User) and state == "deleted":
+            retrieval_index.drop(user_id)
+        elif isinstance(obj, (JournalEntry, AIInteraction)):
+            key = ("journal" if isinstance(obj, JournalEntry) else "chat", obj.id)
+            if state == "deleted":
+                retrieval_index.remove(user_id, key)
+            elif isinstance(obj, JournalEntry):
+                retrieval_index.add(user_id, key, journal_text(obj.title, obj.content))
+            else:
+                retrieval_index.add(user_id, key, interaction_text(obj.user_message, obj.ai_response))
@@ -1,119 +1,487 @@
-from datetime import datetime, date
-from zoneinfo import ZoneInfo
+import time
+from datetime import datetime, timedelta, timezone
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from sqlalchemy import select
 import logging
 
+from src.bot.keyboards.inline import reminder_digest_keyboard
+from src.config import settings
 from src.core.database import async_session_factory
-from src.models.user import User
-from src.repositories.task_repo import TaskRepository
-from src.repositories.habit_repo import HabitRepository
+from src.core.dedup import ReminderDedupStore, dedup_key
+from src.core.delivery import DeliveryQueue
+from src.core.leases import PartitionLeaseManager
+from src.core.metrics import registry
+from src.repositories.ai_call_repo import AICallRepository
+from src.repositories.daily_brief_repo import DailyBriefRepository
+from src.repositories.lease_repo import LeaseRepository
+from src.repositories.memory_repo import MemoryRepository
+from src.repositories.outbox_repo import OutboxRepository
+from src.repositories.reminder_repo import ReminderRepository
+from src.repositories.user_repo import UserRepository
+from src.services.memory_service import MemoryService
+from src.utils.datetime_utils import get_zoneinfo, to_local
 
 logger = logging.getLogger(__name__)
 
+TICK_LAG = registry.histogram(
+    "reminder_tick_lag_seconds", "Delay between the scheduled minute and tick start"
+)
+TICK_DURATION = registry.histogram(
+    "reminder_tick_duration_seconds", "Total reminder tick duration"
+)
+TICK_USERS = registry.gauge(
+    "reminder_tick_users_scanned", "Users with due reminders in the last tick"
+)
+MATCHED = registry.counter("reminder_matched_total", "Due reminders matched by kind")
+MESSAGES = registry.counter("reminder_messages_total", "Reminder messages by outcome")
+TIER_CHANGES = registry.counter(
+    "reminder_activity_tier_changes_total", "Users moved into an activity tier"
+)
+COMPRESSED = registry.counter(
+    "memory_compression_users_total", "Users processed by memory compression, by outcome"
+)
+COMPRESSION_DURATION = registry.gauge(
+    "memory_compression_last_run_seconds", "Duration of the last memory compression run"
+)
+BRIEFS_BUILT = registry.counter("daily_brief_builds_total", "Daily briefs built by the morning job, by outcome")
+BRIEF_DURATION = registry.gauge(
+    "daily_brief_last_run_seconds", "Duration of the last daily brief run that built anything"
+)
+
 
 class ReminderScheduler:
     def __init__(self):
         self.scheduler = AsyncIOScheduler(timezone="UTC")
-        self.sent_cache: set[str] = set()
+        self.dedup = ReminderDedupStore()
+        self.leases = PartitionLeaseManager()
+        self.delivery = DeliveryQueue(self.leases.instance_id)
+        self.indexed_partitions: set[int] = set()
 
     def start(self):
+        from src.bot.loader import bot
+
         if self.scheduler.running:
             return
+        self.delivery.start(bot)
         self.scheduler.add_job(
-            self.dispatch_tick,
+            self.rebalance_partitions,
             "interval",
-            minutes=1,
+            seconds=settings.SCHEDULER_LEASE_RENEW_SECONDS,
+            id="rebalance_partitions",
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1,
+            next_run_time=datetime.now(timezone.utc),
+        )
+        self.scheduler.add_job(
+            self.dispatch_tick,
+            "cron",
+            second=0,
             id="dispatch_notifications",
             replace_existing=True,
             coalesce=True,
             max_instances=1,
+            misfire_grace_time=50,
+        )
+        self.scheduler.add_job(
+            self.purge_dedup,
+            "interval",
+            hours=1,
+            id="purge_reminder_dedup",
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1,
+        )
+        self.scheduler.add_job(
+            self.refresh_activity,
+            "interval",
+            hours=settings.ACTIVITY_REFRESH_HOURS,
+            id="refresh_activity_tiers",
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1,
+            next_run_time=datetime.now(timezone.utc) + timedelta(minutes=1),
+        )
+        self.scheduler.add_job(
+            self.compress_memories,
+            "cron",
+            hour=settings.MEMORY_COMPRESSION_HOUR,
+            minute=0,
+            id="compress_ai_memory",
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1,
+            misfire_grace_time=3600,
+        )
+        self.scheduler.add_job(
+            self.build_daily_briefs,
+            "interval",
+            minutes=settings.DAILY_BRIEF_INTERVAL_MINUTES,
+            id="build_daily_briefs",
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1,
+            next_run_time=datetime.now(timezone.utc) + timedelta(minutes=2),
+        )
+        self.scheduler.add_job(
+            self.purge_outbox,
+            "interval",
+            hours=1,
+            id="purge_notification_outbox",
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1,
+        )
+        self.scheduler.add_job(
+            self.purge_ai_calls,
+            "interval",
+            hours=1,
+            id="purge_ai_calls",
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1,
         )
         self.scheduler.start()
 
-    async def dispatch_tick(self):
-        from src.bot.loader import bot
+    async def shutdown(self):
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+        await self.delivery.stop()
+        await self.leases.release_all()
+
+    async def rebalance_partitions(self):
+        owned = await self.leases.rebalance()
+        self.delivery.set_instances(self.leases.live)
+        await self.rebuild_index(owned - self.indexed_partitions)
+
+    async def rebuild_index(self, partitions: set[int]):
+        # Each process reindexes a partition the first time it owns it.
+        if not partitions:
+            return
+        try:
+            async with async_session_factory() as session:
+                processed_until = await LeaseRepository(session).get_processed_until(partitions)
+                # Slots missed while nobody owned the partition stay inside the catch-up window.
+                after = self._catchup_start(processed_until, datetime.utcnow())
+                users = await ReminderRepository(session).rebuild_partitions(
+                    partitions, self.leases.total, after - timedelta(microseconds=1)
+                )
+                await session.commit()
+            self.indexed_partitions |= partitions
+            logger.info(
+                "Reminder index rebuilt for %s users in partitions %s",
+                users,
+                sorted(partitions),
+            )
+        except Exception as e:
+            logger.warning("Reminder index rebuild skipped (db/network): %s", e)
+
+    async def purge_dedup(self):
+        try:
+            async with async_session_factory() as session:
+                purged = await self.dedup.purge(session)
+                await session.commit()
+            if purged:
+                logger.info("Purged %s expired reminder dedup entries", purged)
+        except Exception as e:
+            logger.warning("Reminder dedup purge skipped (db/network): %s", e)
+
+    async def refresh_activity(self):
+        partitions = set(self.leases.active_partitions)
+        if not partitions:
+            return
+        now = datetime.utcnow()
+        try:
+            async with async_session_factory() as session:
+                changed = await UserRepository(session).refresh_activity_tiers(
+                    partitions,
+                    self.leases.total,
+                    idle_before=now - timedelta(days=settings.ACTIVITY_IDLE_DAYS),
+                    dormant_before=now - timedelta(days=settings.ACTIVITY_DORMANT_DAYS),
+                )
+                await ReminderRepository(session).sync_users(changed)
+                await session.commit()
+        except Exception as e:
+            logger.warning("Activity tier refresh skipped (db/network): %s", e)
+            return
 
-        if len(self.sent_cache) > 20000:
-            self.sent_cache.clear()
+        tiers: dict[str, int] = {}
+        for user in changed:
+            tiers[user.activity_tier] = tiers.get(user.activity_tier, 0) + 1
+        for tier, count in tiers.items():
+            TIER_CHANGES.inc(count, tier=tier)
+        if tiers:
+            logger.info("Activity tiers updated in partitions %s: %s", sorted(partitions), tiers)
 
+    async def purge_outbox(self):
+        before = datetime.utcnow() - timedelta(hours=settings.OUTBOX_RETENTION_HOURS)
         try:
             async with async_session_factory() as session:
-                users = (
-                    await session.execute(select(User).where(User.is_active == True))
-                ).scalars().all()
-                task_repo = TaskRepository(session)
-                habit_repo = HabitRepository(session)
-
-                for user in users:
-                    timezone = user.timezone or "Europe/Moscow"
-                    try:
-                        tz = ZoneInfo(timezone)
-                    except Exception:
-                        tz = ZoneInfo("Europe/Moscow")
-                    local_now = datetime.now(tz)
-                    hhmm = local_now.strftime("%H:%M")
-                    today = local_now.date()
-                    weekday = local_now.weekday()
-                    settings_data = user.get_settings()
-                    notif = settings_data.get("notifications", {})
-
-                    if notif.get("task_remind_default", True):
-                        tasks = await task_repo.get_reminder_tasks(hhmm, today)
-                        for task in tasks:
-                            if task.user_id != user.id:
-                                continue
-                            cache_key = f"task:{user.id}:{task.id}:{today.isoformat()}:{hhmm}"
-                            if cache_key in self.sent_cache:
-                                continue
-                            self.sent_cache.add(cache_key)
-                            text = task.remind_text or notif.get("remind_text_template", "🔔 Пора: {name}").format(name=task.title)
-                            try:
-                                await bot.send_message(user.telegram_id, text)
-                            except Exception:
-                                continue
-
-                    if notif.get("habit_remind_default", True):
-                        habits = await habit_repo.get_reminder_habits(hhmm, weekday)
-                        for habit in habits:
-                            if habit.user_id != user.id:
-                                continue
-                            cache_key = f"habit:{user.id}:{habit.id}:{today.isoformat()}:{hhmm}"
-                            if cache_key in self.sent_cache:
-                                continue
-                            self.sent_cache.add(cache_key)
-                            text = habit.remind_text or f"🔄 Пора выполнить привычку: {habit.emoji} {habit.name}"
-                            try:
-                                await bot.send_message(user.telegram_id, text)
-                            except Exception:
-                                continue
-
-                    if notif.get("morning", True) and notif.get("morning_time") == hhmm:
-                        cache_key = f"morning:{user.id}:{today.isoformat()}:{hhmm}"
-                        if cache_key not in self.sent_cache:
-                            self.sent_cache.add(cache_key)
-                            try:
-                                await bot.send_message(
-                                    user.telegram_id,
-                                    "🌅 Доброе утро! Проверь задачи и начни с самой важной.",
-                                )
-                            except Exception:
-                                continue
-
-                    if notif.get("evening", True) and notif.get("evening_time") == hhmm:
-                        cache_key = f"evening:{user.id}:{today.isoformat()}:{hhmm}"
-                        if cache_key not in self.sent_cache:
-                            self.sent_cache.add(cache_key)
-                            try:
-                                await bot.send_message(
-                                    user.telegram_id,
-                                    "🌙 Вечерний чек-ин: закрой минимум 1 задачу и отметь привычки.",
-                                )
-                            except Exception:
-                                continue
+                purged = await OutboxRepository(session).purge(before)
+                await session.commit()
+            if purged:
+                logger.info("Purged %s settled outbox rows", purged)
+        except Exception as e:
+            logger.warning("Outbox purge skipped (db/network): %s", e)
+
+    async def purge_ai_calls(self):
+        before = datetime.utcnow() - timedelta(days=settings.AI_CALL_RETENTION_DAYS)
+        try:
+            async with async_session_factory() as session:
+                purged = await AICallRepository(session).purge(before)
+                await session.commit()
+            if purged:
+                logger.info("Purged %s AI call log rows", purged)
+        except Exception as e:
+            logger.warning("AI call purge skipped (db/network): %s", e)
+
+    async def compress_memories(self):
+        partitions = set(self.leases.active_partitions)
+        if not partitions:
+            return
+        started = time.monotonic()
+        try:
+            async with async_session_factory() as session:
+                user_ids = await MemoryRepository(session).get_compression_candidates(
+                    datetime.utcnow() - timedelta(days=7),
+                    settings.MEMORY_COMPRESSION_MIN_INTERACTIONS,
+                    partitions,
+                    self.leases.total,
+                )
+        except Exception as e:
+            logger.warning("Memory compression skipped (db/network): %s", e)
+            return
+        if not user_ids:
+            return
+
+        compressed = failed = 0
+        size = max(1, settings.MEMORY_COMPRESSION_BATCH_SIZE)
+        # One transaction per batch: a failure loses at most one batch of work.
+        for offset in range(0, len(user_ids), size):
+            batch = user_ids[offset:offset + size]
+            try:
+                async with async_session_factory() as session:
+                    done, skipped = await MemoryService(session).compress_users(
+                        batch, settings.MEMORY_COMPRESSION_CONCURRENCY
+                    )
+                    await session.commit()
+            except Exception as e:
+                logger.warning("Memory compression batch failed (db/network): %s", e)
+                done, skipped = 0, len(batch)
+            compressed += done
+            failed += skipped
+            if done:
+                COMPRESSED.inc(done, outcome="compressed")
+            if skipped:
+                COMPRESSED.inc(skipped, outcome="failed")
+            elapsed = time.monotonic() - started
+            logger.info(
+                "Memory compression: %s/%s users (%s failed), %.1f users/s",
+                compressed + failed,
+                len(user_ids),
+                failed,
+                (compressed + failed) / elapsed if elapsed else 0.0,
+            )
+
+        duration = time.monotonic() - started
+        COMPRESSION_DURATION.set(duration)
+        logger.info(
+            "Memory compression done in partitions %s: compressed=%s failed=%s duration=%.1fs",
+            sorted(partitions),
+            compressed,
+            failed,
+            duration,
+        )
+
+    async def build_daily_briefs(self):
+        # Runs through the day so every timezone gets its brief shortly after its own morning hour.
+        partitions = set(self.leases.active_partitions)
+        if not partitions:
+            return
+        started = time.monotonic()
+        try:
+            async with async_session_factory() as session:
+                users = await DailyBriefRepository(session).get_due_users(
+                    partitions, self.leases.total, settings.DAILY_BRIEF_HOUR
+                )
+        except Exception as e:
+            logger.warning("Daily briefs skipped (db/network): %s", e)
+            return
+        if not users:
+            return
+
+        built = failed = 0
+        size = max(1, settings.DAILY_BRIEF_BATCH_SIZE)
+        for offset in range(0, len(users), size):
+            batch = users[offset:offset + size]
+            try:
+                async with async_session_factory() as session:
+                    await DailyBriefRepository(session).build(batch)
+                    await session.commit()
+                built += len(batch)
+                BRIEFS_BUILT.inc(len(batch), outcome="built")
+            except Exception as e:
+                logger.warning("Daily brief batch failed (db/network): %s", e)
+                failed += len(batch)
+                BRIEFS_BUILT.inc(len(batch), outcome="failed")
+
+        duration = time.monotonic() - started
+        BRIEF_DURATION.set(duration)
+        logger.info(
+            "Daily briefs done in partitions %s: built=%s failed=%s duration=%.1fs",
+            sorted(partitions),
+            built,
+            failed,
+            duration,
+        )
+
+    @staticmethod
+    def _catchup_start(processed_until: datetime | None, now: datetime) -> datetime:
+        minute_start = now.replace(second=0, microsecond=0)
+        if processed_until is None:
+            return minute_start
+        oldest = minute_start - timedelta(minutes=settings.REMINDER_CATCHUP_MINUTES)
+        return max(oldest, min(processed_until, minute_start))
+
+    async def dispatch_tick(self):
+        started = time.monotonic()
+        now = datetime.utcnow()
+        minute_start = now.replace(second=0, microsecond=0)
+        minute_end = minute_start + timedelta(minutes=1)
+        lag = (now - minute_start).total_seconds()
+        TICK_LAG.observe(lag)
+        candidates: list[tuple] = []
+        fresh: list[tuple] = []
+        outgoing: list[tuple] = []
+        matched: dict[str, int] = {}
+        partitions = set(self.leases.active_partitions)
+
+        try:
+            async with async_session_factory() as session:
+                repo = ReminderRepository(session)
+                lease_repo = LeaseRepository(session)
+                window_start = self._catchup_start(
+                    await lease_repo.get_processed_until(partitions), now
+                )
+                due = await repo.get_due(minute_end, partitions, self.leases.total)
+
+                for slot, user, task, habit in due:
+                    entity = task if slot.kind == "task" else habit
+                    expected = repo.next_fire_at(
+                        slot.kind, user, entity, slot.next_fire_at - timedelta(microseconds=1)
+                    )
+                    if slot.next_fire_at >= window_start and expected == slot.next_fire_at:
+                        matched[slot.kind] = matched.get(slot.kind, 0) + 1
+                        text = self._render(slot, user, entity)
+                        if text:
+                            local_fire = to_local(slot.next_fire_at, get_zoneinfo(user.timezone))
+                            key = dedup_key(slot.kind, user.id, slot.entity_id, local_fire)
+                            candidates.append((key, slot, user, entity, text, local_fire))
+                    await repo.advance(slot, user, entity, minute_start)
+
+                keys = [key for key, *_ in candidates]
+                claimed = await self.dedup.claim(session, keys)
+                fresh = [c for c in candidates if c[0] in claimed]
+                outgoing = self._compose(fresh)
+                # Messages are committed together with the dedup claims and the
+                # processed mark; delivery workers pick them up from the outbox.
+                await self.delivery.enqueue(
+                    session, minute_start.strftime("%Y-%m-%d %H:%M"), outgoing
+                )
+                await lease_repo.mark_processed(self.leases.instance_id, partitions, minute_end)
+                await session.commit()
+                self.dedup.remember(keys)
         except Exception as e:
             logger.warning("Reminder tick skipped (db/network): %s", e)
+            TICK_DURATION.observe(time.monotonic() - started)
+            return
+
+        users = len({slot.user_id for slot, *_ in due})
+        deduplicated = len(candidates) - len(fresh)
+        coalesced = len(fresh) - len(outgoing)
+        TICK_USERS.set(users)
+        for kind, count in matched.items():
+            MATCHED.inc(count, kind=kind)
+        if deduplicated:
+            MESSAGES.inc(deduplicated, outcome="deduplicated")
+        if coalesced:
+            MESSAGES.inc(coalesced, outcome="coalesced")
+
+        if outgoing:
+            self.delivery.wake()
+
+        duration = time.monotonic() - started
+        TICK_DURATION.observe(duration)
+        logger.info(
+            "Reminder tick %s (since %s): lag=%.2fs duration=%.2fs users=%s matched=%s "
+            "queued=%s deduplicated=%s coalesced=%s",
+            minute_start.strftime("%H:%M"),
+            window_start.strftime("%H:%M"),
+            lag,
+            duration,
+            users,
+            matched,
+            len(outgoing),
+            deduplicated,
+            coalesced,
+        )
+
+    @classmethod
+    def _compose(cls, candidates: list[tuple]) -> list[tuple]:
+        outgoing = []
+        digest_users: dict[int, bool] = {}
+        groups: dict[tuple, list] = {}
+        for _, slot, user, entity, text, local_fire in candidates:
+            if user.id not in digest_users:
+                notif = user.get_settings().get("notifications", {})
+                digest_users[user.id] = bool(notif.get("digest"))
+            if digest_users[user.id]:
+                group_key = (user.telegram_id, slot.next_fire_at)
+                groups.setdefault(group_key, []).append((slot, entity, text, local_fire))
+            else:
+                outgoing.append((user.telegram_id, text, None, slot.next_fire_at))
+
+        for (chat_id, fire_at), items in groups.items():
+            if len(items) == 1:
+                outgoing.append((chat_id, items[0][2], None, fire_at))
+                continue
+            text, reply_markup = cls._render_digest(items)
+            outgoing.append((chat_id, text, reply_markup, fire_at))
+        return outgoing
+
+    @staticmethod
+    def _render_digest(items: list[tuple]):
+        local_fire = items[0][3]
+        lines = [f"🔔 *Напоминания на {local_fire.strftime('%H:%M')}*", ""]
+        actions = []
+        for slot, entity, text, _ in items:
+            lines.append(f"• {text}")
+            if slot.kind == "task":
+                actions.append(("task", entity.id, entity.title))
+            elif slot.kind == "habit":
+                actions.append(("habit", entity.id, f"{entity.emoji} {entity.name}"))
+        return "\n".join(lines), reminder_digest_keyboard(actions) if actions else None
+
+    @staticmethod
+    def _render(slot, user, entity) -> str | None:
+        if slot.kind == "task":
+            if entity is None:
+                return None
+            notif = user.get_settings().get("notifications", {})
+            return entity.remind_text or notif.get(
+                "remind_text_template", "🔔 Пора: {name}"
+            ).format(name=entity.title)
+        if slot.kind == "habit":
+            if entity is None:
+                return None
+            return entity.remind_text or f"🔄 Пора выполнить привычку: {entity.emoji} {entity.name}"
+        if slot.kind == "morning":
+            return "🌅 Доброе утро! Проверь задачи и начни с самой важной."
+        if slot.kind == "evening":
+            return "🌙 Вечерний чек-ин: закрой минимум 1 задачу и отметь привычки."
+        if slot.kind == "reengage":
+            return "👋 Давно не виделись! Загляни в бота: одна маленькая задача сегодня — уже прогресс."
+        return None
 
 
 reminder_scheduler = ReminderScheduler()
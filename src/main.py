@@ -9,6 +9,8 @@ from src.bot.middlewares.db_session import DbSessionMiddleware
 from src.bot.middlewares.auth import AuthMiddleware
 from src.bot.middlewares.throttling import ThrottlingMiddleware
 from src.core.scheduler import reminder_scheduler
+from src.core.metrics import start_metrics_server
+from src.services.ai_backends import close_clients
 
 logging.basicConfig(
     level=getattr(logging, settings.LOG_LEVEL),
@@ -29,6 +31,11 @@ async def main():
     setup_routers()
     reminder_scheduler.start()
 
+    metrics_runner = None
+    if settings.METRICS_PORT:
+        metrics_runner = await start_metrics_server(settings.METRICS_HOST, settings.METRICS_PORT)
+        logger.info("Metrics exposed on %s:%s/metrics", settings.METRICS_HOST, settings.METRICS_PORT)
+
     retry_delay = 8
     try:
         while True:
@@ -49,9 +56,12 @@ async def main():
                 await asyncio.sleep(retry_delay)
     finally:
         try:
-            reminder_scheduler.scheduler.shutdown(wait=False)
+            await reminder_scheduler.shutdown()
         except Exception:
             pass
+        if metrics_runner:
+            await metrics_runner.cleanup()
+        await close_clients()
         await bot.session.close()
 
 
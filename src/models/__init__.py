@@ -4,6 +4,10 @@ from src.models.task import Task, TaskLog
 from src.models.habit import Habit, HabitLog
 from src.models.journal import JournalEntry, MediaFile
 from src.models.gamification import XPEvent, Achievement, UserAchievement
-from src.models.ai_memory import AIMemorySummary, AIInteraction, WeeklyReport
+from src.models.ai_memory import AIMemorySummary, AIInteraction, WeeklyReport, AICall, DailyBrief
 from src.models.playlist import Playlist, PlaylistTrack
 from src.models.learning import LearningResource
+from src.models.reminder import (
+    ReminderSlot, ReminderDelivery, SchedulerInstance, SchedulerLease,
+    NotificationOutbox,
+)
@@ -1,5 +1,5 @@
 from datetime import datetime, date
-from sqlalchemy import Integer, String, Text, ForeignKey, Date, Float, Boolean
+from sqlalchemy import BigInteger, Integer, String, Text, ForeignKey, Date, Float, Boolean, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import func
 
@@ -23,6 +23,8 @@ class AIMemorySummary(Base):
 
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     version: Mapped[int] = mapped_column(Integer, default=1)
+    # High-water mark for rolling summaries: the newest interaction folded in.
+    last_interaction_id: Mapped[int | None] = mapped_column(Integer)
 
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
 
@@ -31,6 +33,7 @@ class AIMemorySummary(Base):
 
 class AIInteraction(Base):
     __tablename__ = "ai_interactions"
+    __table_args__ = (Index("ix_ai_interactions_created_at", "created_at"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(
@@ -81,4 +84,44 @@ class WeeklyReport(Base):
 
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
 
-    user = relationship("User", back_populates="weekly_reports")
\ No newline at end of file
+    user = relationship("User", back_populates="weekly_reports")
+
+
+class AICall(Base):
+    __tablename__ = "ai_calls"
+    __table_args__ = (
+        Index("ix_ai_calls_user_created", "user_id", "created_at"),
+        Index("ix_ai_calls_backend_created", "backend", "created_at"),
+        Index("ix_ai_calls_created_at", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"))
+
+    kind: Mapped[str] = mapped_column(String(30))
+    backend: Mapped[str] = mapped_column(String(30))
+    model: Mapped[str] = mapped_column(String(100))
+    status: Mapped[str] = mapped_column(String(20))
+    fallback: Mapped[bool] = mapped_column(Boolean, default=False)
+
+    prompt_tokens: Mapped[int | None] = mapped_column(Integer)
+    completion_tokens: Mapped[int | None] = mapped_column(Integer)
+    latency_ms: Mapped[int] = mapped_column(Integer)
+    first_token_ms: Mapped[int | None] = mapped_column(Integer)
+
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
+
+
+class DailyBrief(Base):
+    # The materialised today-plan: built each local morning, patched as tasks and habits change.
+    __tablename__ = "daily_briefs"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, autoincrement=False
+    )
+    brief_date: Mapped[date] = mapped_column(Date)
+    version: Mapped[int] = mapped_column(Integer, default=1)
+    payload: Mapped[str] = mapped_column(Text)
+
+    built_at: Mapped[datetime] = mapped_column()
+    updated_at: Mapped[datetime] = mapped_column()
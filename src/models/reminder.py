@@ -0,0 +1,82 @@
+from datetime import date, datetime
+from sqlalchemy import BigInteger, Integer, SmallInteger, String, Text, Date, ForeignKey, Index
+from sqlalchemy import func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.models.base import Base
+
+
+class ReminderSlot(Base):
+    __tablename__ = "reminder_slots"
+    __table_args__ = (
+        Index("ix_reminder_slots_next_fire_at", "next_fire_at"),
+        Index("ix_reminder_slots_kind_entity", "kind", "entity_id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), index=True
+    )
+
+    kind: Mapped[str] = mapped_column(String(20))
+    entity_id: Mapped[int | None] = mapped_column(Integer)
+
+    remind_time: Mapped[str] = mapped_column(String(10))
+    next_fire_at: Mapped[datetime] = mapped_column()
+
+
+class ReminderDelivery(Base):
+    __tablename__ = "reminder_deliveries"
+    __table_args__ = (
+        Index("ix_reminder_deliveries_created_at", "created_at"),
+    )
+
+    kind: Mapped[str] = mapped_column(String(20), primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    entity_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    local_date: Mapped[date] = mapped_column(Date, primary_key=True)
+    local_minute: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
+
+
+class SchedulerInstance(Base):
+    __tablename__ = "scheduler_instances"
+
+    instance_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    heartbeat_at: Mapped[datetime] = mapped_column()
+
+
+class SchedulerLease(Base):
+    __tablename__ = "scheduler_leases"
+
+    partition: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    owner: Mapped[str | None] = mapped_column(String(255))
+    expires_at: Mapped[datetime | None] = mapped_column()
+    processed_until: Mapped[datetime | None] = mapped_column()
+
+
+class NotificationOutbox(Base):
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        Index("ix_notification_outbox_status_available", "status", "available_at"),
+        Index("ix_notification_outbox_created_at", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    chat_id: Mapped[int] = mapped_column(BigInteger)
+    text: Mapped[str] = mapped_column(Text)
+    reply_markup: Mapped[str | None] = mapped_column(Text)
+    label: Mapped[str] = mapped_column(String(40), default="")
+
+    status: Mapped[str] = mapped_column(String(20), default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    scheduled_at: Mapped[datetime | None] = mapped_column()
+    available_at: Mapped[datetime] = mapped_column()
+    claimed_by: Mapped[str | None] = mapped_column(String(255))
+    claimed_until: Mapped[datetime | None] = mapped_column()
+    sent_at: Mapped[datetime | None] = mapped_column()
+    latency_ms: Mapped[int | None] = mapped_column(Integer)
+    last_error: Mapped[str | None] = mapped_column(Text)
+
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
@@ -1,4 +1,5 @@
 import json
+from datetime import datetime
 from sqlalchemy import BigInteger, String, Integer, Boolean, Float, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -30,6 +31,8 @@ class User(Base, TimestampMixin):
     growth_score: Mapped[float] = mapped_column(Float, default=50.0)
 
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    activity_tier: Mapped[str] = mapped_column(String(10), default="active", server_default="active")
+    last_active_at: Mapped[datetime | None] = mapped_column()
 
     tasks = relationship("Task", back_populates="user", lazy="selectin")
     habits = relationship("Habit", back_populates="user", lazy="selectin")
@@ -51,6 +54,7 @@ class User(Base, TimestampMixin):
                 "streak": True, "weekly": True,
                 "morning_time": "08:00", "evening_time": "21:00",
                 "task_remind_default": True, "habit_remind_default": True,
+                "digest": False,
                 "remind_text_template": "🔔 Пора: {name}",
             },
             "ai_permissions": {
@@ -8,3 +8,6 @@ from src.repositories.memory_repo import MemoryRepository
 from src.repositories.playlist_repo import PlaylistRepository
 from src.repositories.learning_repo import LearningRepository
 from src.repositories.achievement_repo import AchievementRepository
+from src.repositories.snapshot_repo import SnapshotRepository
+from src.repositories.ai_call_repo import AICallRepository
+from src.repositories.daily_brief_repo import DailyBriefRepository
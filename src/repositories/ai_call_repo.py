@@ -0,0 +1,63 @@
+from datetime import datetime
+from sqlalchemy import select, delete, func, cast, Date
+
+from src.models.ai_memory import AICall
+from src.repositories.base import BaseRepository
+
+
+class AICallRepository(BaseRepository):
+    model = AICall
+
+    def log_call(self, **fields) -> AICall:
+        # No flush: calls are logged from hedged tasks and cancellation paths,
+        # and are written together with the caller's transaction.
+        call = AICall(**fields)
+        self.session.add(call)
+        return call
+
+    async def purge(self, before: datetime) -> int:
+        result = await self.session.execute(delete(AICall).where(AICall.created_at < before))
+        return result.rowcount or 0
+
+    async def tokens_per_user_day(self, since: datetime, user_id: int | None = None) -> list[dict]:
+        day = cast(AICall.created_at, Date).label("day")
+        stmt = (
+            select(
+                AICall.user_id,
+                day,
+                func.count().label("calls"),
+                func.coalesce(func.sum(AICall.prompt_tokens), 0).label("prompt_tokens"),
+                func.coalesce(func.sum(AICall.completion_tokens), 0).label("completion_tokens"),
+                func.sum(AICall.latency_ms).label("latency_ms"),
+            )
+            .where(AICall.created_at >= since)
+            .group_by(AICall.user_id, day)
+            .order_by(day.desc(), AICall.user_id)
+        )
+        if user_id is not None:
+            stmt = stmt.where(AICall.user_id == user_id)
+        result = await self.session.execute(stmt)
+        return [dict(row._mapping) for row in result.all()]
+
+    async def latency_by_backend(self, since: datetime) -> list[dict]:
+        def percentile(q: float):
+            return func.percentile_cont(q).within_group(AICall.latency_ms.asc())
+
+        stmt = (
+            select(
+                AICall.backend,
+                AICall.kind,
+                func.count().label("calls"),
+                func.count().filter(AICall.status != "ok").label("failed"),
+                func.count().filter(AICall.fallback == True).label("fallback_calls"),
+                percentile(0.5).label("p50_ms"),
+                percentile(0.95).label("p95_ms"),
+                percentile(0.99).label("p99_ms"),
+                func.percentile_cont(0.5).within_group(AICall.first_token_ms.asc()).label("p50_first_token_ms"),
+            )
+            .where(AICall.created_at >= since)
+            .group_by(AICall.backend, AICall.kind)
+            .order_by(AICall.backend, AICall.kind)
+        )
+        result = await self.session.execute(stmt)
+        return [dict(row._mapping) for row in result.all()]
@@ -0,0 +1,229 @@
+import json
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Date, and_, case, cast, column, extract, func, literal, select, table
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import aliased
+
+from src.config import settings
+from src.models.ai_memory import DailyBrief
+from src.models.habit import Habit
+from src.models.task import Task
+from src.models.user import User
+from src.repositories.base import BaseRepository
+from src.utils.datetime_utils import get_zoneinfo, to_local
+
+ACTIVE_TASK_STATUSES = ("todo", "in_progress")
+TASK_FIELDS = {"title", "priority", "deadline", "status", "completed_at"}
+HABIT_FIELDS = {"name", "emoji", "current_streak", "schedule_mask", "is_active"}
+DEFAULT_TIMEZONE = "Europe/Moscow"
+PG_TIMEZONES = table("pg_timezone_names", column("name"))
+
+
+def _task_item(task: Task) -> dict:
+    return {
+        "id": task.id,
+        "title": task.title,
+        "priority": task.priority,
+        "deadline": task.deadline.isoformat() if task.deadline else None,
+    }
+
+
+def _habit_item(habit: Habit) -> dict:
+    return {"id": habit.id, "emoji": habit.emoji, "name": habit.name, "streak": habit.current_streak}
+
+
+def _done_on(task: Task, day: date, tz: ZoneInfo) -> bool:
+    return task.status == "done" and task.completed_at is not None and to_local(task.completed_at, tz).date() == day
+
+
+def _due_on(habit: Habit, day: date) -> bool:
+    return habit.is_active and bool(habit.schedule_mask & (1 << day.weekday()))
+
+
+def _brief_enabled(settings_json: str | None) -> bool:
+    return User(settings_json=settings_json).get_settings().get("ai_daily_brief", True)
+
+
+class DailyBriefRepository(BaseRepository):
+    model = DailyBrief
+
+    async def get(self, user_id: int) -> DailyBrief | None:
+        return await self.session.get(DailyBrief, user_id)
+
+    async def get_due_users(
+        self, partitions: set[int], total: int, hour: int
+    ) -> list[tuple[int, str | None]]:
+        # Users past their local morning hour whose brief is missing or from an earlier day.
+        if not partitions:
+            return []
+        # Unknown zone names fall back to the same default as get_zoneinfo instead of failing the query.
+        zone = case(
+            (User.timezone.in_(select(PG_TIMEZONES.c.name)), User.timezone),
+            else_=literal(DEFAULT_TIMEZONE),
+        )
+        local_now = func.timezone(zone, func.now())
+        fresh = select(DailyBrief.user_id).where(
+            and_(
+                DailyBrief.user_id == User.id,
+                DailyBrief.brief_date >= cast(local_now, Date),
+            )
+        )
+        stmt = (
+            select(User.id, User.timezone, User.settings_json)
+            .where(
+                and_(
+                    User.is_active == True,
+                    User.activity_tier != "dormant",
+                    (User.id % total).in_(partitions),
+                    extract("hour", local_now) >= hour,
+                    ~fresh.exists(),
+                )
+            )
+            .order_by(User.id)
+        )
+        return [
+            (user_id, timezone_name)
+            for user_id, timezone_name, settings_json in (await self.session.execute(stmt)).all()
+            if _brief_enabled(settings_json)
+        ]
+
+    async def build(self, users: list[tuple[int, str | None]]) -> dict[int, DailyBrief]:
+        # One set of queries for the whole batch; the upsert bumps the version of existing rows.
+        if not users:
+            return {}
+        user_ids = [user_id for user_id, _ in users]
+        ranked = (
+            select(
+                Task,
+                func.row_number().over(partition_by=Task.user_id, order_by=Task.id.desc()).label("rank"),
+            )
+            .where(
+                and_(
+                    Task.user_id.in_(user_ids),
+                    Task.status.in_(ACTIVE_TASK_STATUSES),
+                )
+            )
+            .subquery()
+        )
+        active = aliased(Task, ranked)
+        active_tasks = (
+            await self.session.execute(
+                select(active).where(ranked.c.rank <= settings.DAILY_BRIEF_TASK_LIMIT).order_by(ranked.c.id.desc())
+            )
+        ).scalars().all()
+        # Two days back covers "today" in every timezone; the exact local day is checked below.
+        done_tasks = (
+            await self.session.execute(
+                select(Task)
+                .where(
+                    and_(
+                        Task.user_id.in_(user_ids),
+                        Task.status == "done",
+                        Task.completed_at >= datetime.utcnow() - timedelta(days=2),
+                    )
+                )
+                .order_by(Task.id.desc())
+            )
+        ).scalars().all()
+        habits = (
+            await self.session.execute(
+                select(Habit)
+                .where(
+                    and_(
+                        Habit.user_id.in_(user_ids),
+                        Habit.is_active == True,
+                    )
+                )
+                .order_by(Habit.id)
+            )
+        ).scalars().all()
+
+        payloads = {user_id: {"tasks": [], "done": [], "habits": []} for user_id in user_ids}
+        zones = {user_id: get_zoneinfo(timezone_name) for user_id, timezone_name in users}
+        now = datetime.utcnow()
+        days = {user_id: to_local(now, tz).date() for user_id, tz in zones.items()}
+        for task in active_tasks:
+            payloads[task.user_id]["tasks"].append(_task_item(task))
+        for task in done_tasks:
+            if _done_on(task, days[task.user_id], zones[task.user_id]):
+                payloads[task.user_id]["done"].append(_task_item(task))
+        for habit in habits:
+            if _due_on(habit, days[habit.user_id]):
+                payloads[habit.user_id]["habits"].append(_habit_item(habit))
+
+        stmt = insert(DailyBrief).values(
+            [
+                {
+                    "user_id": user_id,
+                    "brief_date": days[user_id],
+                    "version": 1,
+                    "payload": json.dumps(payload, ensure_ascii=False),
+                    "built_at": now,
+                    "updated_at": now,
+                }
+                for user_id, payload in payloads.items()
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailyBrief.user_id],
+            set_={
+                "brief_date": stmt.excluded.brief_date,
+                "version": DailyBrief.version + 1,
+                "payload": stmt.excluded.payload,
+                "built_at": stmt.excluded.built_at,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        result = await self.session.scalars(
+            stmt.returning(DailyBrief), execution_options={"populate_existing": True}
+        )
+        return {brief.user_id: brief for brief in result.all()}
+
+    async def patch_task(self, task: Task, removed: bool = False):
+        def apply(payload: dict, day: date, tz: ZoneInfo):
+            payload["tasks"] = [t for t in payload["tasks"] if t["id"] != task.id]
+            payload["done"] = [t for t in payload["done"] if t["id"] != task.id]
+            if removed:
+                return
+            if task.status in ACTIVE_TASK_STATUSES:
+                payload["tasks"].append(_task_item(task))
+                payload["tasks"].sort(key=lambda t: t["id"], reverse=True)
+                del payload["tasks"][settings.DAILY_BRIEF_TASK_LIMIT:]
+            elif _done_on(task, day, tz):
+                payload["done"].insert(0, _task_item(task))
+
+        await self._patch(task.user_id, apply)
+
+    async def patch_habit(self, habit: Habit, removed: bool = False):
+        def apply(payload: dict, day: date, tz: ZoneInfo):
+            payload["habits"] = [h for h in payload["habits"] if h["id"] != habit.id]
+            if not removed and _due_on(habit, day):
+                payload["habits"].append(_habit_item(habit))
+                payload["habits"].sort(key=lambda h: h["id"])
+
+        await self._patch(habit.user_id, apply)
+
+    async def _patch(self, user_id: int, apply):
+        stmt = (
+            select(DailyBrief, User.timezone)
+            .join(User, User.id == DailyBrief.user_id)
+            .where(DailyBrief.user_id == user_id)
+            .with_for_update(of=DailyBrief)
+            .execution_options(populate_existing=True)
+        )
+        row = (await self.session.execute(stmt)).first()
+        if row is None:
+            return
+        brief, timezone_name = row
+        tz = get_zoneinfo(timezone_name)
+        # A brief from an earlier day is rebuilt on the next read or morning run instead.
+        if brief.brief_date != to_local(datetime.utcnow(), tz).date():
+            return
+        payload = json.loads(brief.payload)
+        apply(payload, brief.brief_date, tz)
+        brief.payload = json.dumps(payload, ensure_ascii=False)
+        brief.version += 1
+        brief.updated_at = datetime.utcnow()
+        await self.session.flush()
@@ -4,11 +4,37 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.habit import Habit, HabitLog
 from src.repositories.base import BaseRepository
+from src.repositories.daily_brief_repo import HABIT_FIELDS as BRIEF_FIELDS, DailyBriefRepository
+from src.repositories.reminder_repo import ReminderRepository
+
+REMINDER_FIELDS = {"is_active", "schedule_mask", "remind_enabled", "remind_time"}
 
 
 class HabitRepository(BaseRepository):
     model = Habit
 
+    async def create(self, **kwargs) -> Habit:
+        habit = await super().create(**kwargs)
+        await ReminderRepository(self.session).sync_habit(habit)
+        await DailyBriefRepository(self.session).patch_habit(habit)
+        return habit
+
+    async def update(self, record_id: int, **kwargs) -> Habit | None:
+        habit = await super().update(record_id, **kwargs)
+        if habit and REMINDER_FIELDS & kwargs.keys():
+            await ReminderRepository(self.session).sync_habit(habit)
+        if habit and BRIEF_FIELDS & kwargs.keys():
+            await DailyBriefRepository(self.session).patch_habit(habit)
+        return habit
+
+    async def delete(self, record_id: int) -> bool:
+        habit = await self.get_by_id(record_id)
+        deleted = await super().delete(record_id)
+        if deleted:
+            await ReminderRepository(self.session).remove_entity("habit", record_id)
+            await DailyBriefRepository(self.session).patch_habit(habit, removed=True)
+        return deleted
+
     async def get_active_habits(self, user_id: int) -> list[Habit]:
         stmt = (
             select(Habit)
@@ -54,6 +80,17 @@ class HabitRepository(BaseRepository):
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_logged_habit_ids(self, user_id: int, log_date: date) -> set[int]:
+        stmt = select(HabitLog.habit_id).where(
+            and_(
+                HabitLog.user_id == user_id,
+                HabitLog.log_date == log_date,
+                HabitLog.completed == True,
+            )
+        )
+        result = await self.session.execute(stmt)
+        return set(result.scalars().all())
+
     async def create_log(
         self,
         habit_id: int,
@@ -0,0 +1,127 @@
+from datetime import datetime
+from sqlalchemy import select, update, delete, func, and_, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.reminder import SchedulerInstance, SchedulerLease
+from src.repositories.base import BaseRepository
+
+
+class LeaseRepository(BaseRepository):
+    model = SchedulerLease
+
+    async def heartbeat(self, instance_id: str, now: datetime):
+        stmt = (
+            insert(SchedulerInstance)
+            .values(instance_id=instance_id, heartbeat_at=now)
+            .on_conflict_do_update(
+                index_elements=[SchedulerInstance.instance_id],
+                set_={"heartbeat_at": now},
+            )
+        )
+        await self.session.execute(stmt)
+
+    async def count_live_instances(self, since: datetime) -> int:
+        stmt = select(func.count()).where(SchedulerInstance.heartbeat_at >= since)
+        result = await self.session.execute(stmt)
+        return int(result.scalar() or 0)
+
+    async def delete_stale_instances(self, before: datetime):
+        await self.session.execute(
+            delete(SchedulerInstance).where(SchedulerInstance.heartbeat_at < before)
+        )
+
+    async def remove_instance(self, instance_id: str):
+        await self.session.execute(
+            delete(SchedulerInstance).where(SchedulerInstance.instance_id == instance_id)
+        )
+
+    async def ensure_partitions(self, total: int):
+        stmt = (
+            insert(SchedulerLease)
+            .values([{"partition": p} for p in range(total)])
+            .on_conflict_do_nothing()
+        )
+        await self.session.execute(stmt)
+
+    async def renew(self, owner: str, total: int, until: datetime) -> set[int]:
+        stmt = (
+            update(SchedulerLease)
+            .where(
+                and_(
+                    SchedulerLease.owner == owner,
+                    SchedulerLease.partition < total,
+                )
+            )
+            .values(expires_at=until)
+            .returning(SchedulerLease.partition)
+        )
+        result = await self.session.execute(stmt)
+        return set(result.scalars().all())
+
+    async def claim(
+        self, owner: str, total: int, limit: int, now: datetime, until: datetime
+    ) -> set[int]:
+        if limit <= 0:
+            return set()
+        free = (
+            select(SchedulerLease.partition)
+            .where(
+                and_(
+                    SchedulerLease.partition < total,
+                    or_(
+                        SchedulerLease.owner.is_(None),
+                        SchedulerLease.expires_at < now,
+                    ),
+                )
+            )
+            .order_by(SchedulerLease.partition)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(SchedulerLease)
+            .where(SchedulerLease.partition.in_(free))
+            .values(owner=owner, expires_at=until)
+            .returning(SchedulerLease.partition)
+        )
+        result = await self.session.execute(stmt)
+        return set(result.scalars().all())
+
+    async def release(self, owner: str, partitions: set[int] | None = None):
+        filters = [SchedulerLease.owner == owner]
+        if partitions is not None:
+            if not partitions:
+                return
+            filters.append(SchedulerLease.partition.in_(partitions))
+        stmt = (
+            update(SchedulerLease)
+            .where(and_(*filters))
+            .values(owner=None, expires_at=None)
+        )
+        await self.session.execute(stmt)
+
+    async def get_processed_until(self, partitions: set[int]) -> datetime | None:
+        if not partitions:
+            return None
+        stmt = select(func.min(SchedulerLease.processed_until)).where(
+            SchedulerLease.partition.in_(partitions)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar()
+
+    async def mark_processed(self, owner: str, partitions: set[int], until: datetime):
+        if not partitions:
+            return
+        stmt = (
+            update(SchedulerLease)
+            .where(
+                and_(
+                    SchedulerLease.owner == owner,
+                    SchedulerLease.partition.in_(partitions),
+                )
+            )
+            .values(processed_until=until)
+        )
+        await self.session.execute(stmt)
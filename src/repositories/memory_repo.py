@@ -1,9 +1,11 @@
 from datetime import datetime, date
-from sqlalchemy import select, func, and_, update
+from sqlalchemy import select, func, and_, update, delete, literal_column, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.ai_memory import AIMemorySummary, AIInteraction
+from src.models.journal import JournalEntry
 from src.repositories.base import BaseRepository
+from src.utils.tokens import count_tokens
 
 
 class MemoryRepository(BaseRepository):
@@ -39,7 +41,7 @@ class MemoryRepository(BaseRepository):
             user_id=user_id,
             summary_type=summary_type,
             content=content,
-            token_count=len(content) // 4,
+            token_count=count_tokens(content),
             period_start=period_start,
             period_end=period_end,
         )
@@ -47,31 +49,47 @@ class MemoryRepository(BaseRepository):
         await self.session.flush()
         return summary
 
+    async def create_summaries(self, summary_type: str, rows: list[dict]) -> list[AIMemorySummary]:
+        # Added through the unit of work (one batched INSERT) so the context cache sees them.
+        summaries = [
+            AIMemorySummary(
+                summary_type=summary_type,
+                token_count=count_tokens(row["content"]),
+                **row,
+            )
+            for row in rows
+        ]
+        self.session.add_all(summaries)
+        await self.session.flush()
+        return summaries
+
     async def deactivate_old_summaries(
-        self, user_id: int, summary_type: str, keep_last: int = 4
-    ):
-        active_stmt = (
-            select(AIMemorySummary.id)
+        self, user_ids: list[int], summary_type: str, keep_last: int = 4
+    ) -> int:
+        rank = (
+            func.row_number()
+            .over(partition_by=AIMemorySummary.user_id, order_by=AIMemorySummary.created_at.desc())
+            .label("rank")
+        )
+        ranked = (
+            select(AIMemorySummary.id, rank)
             .where(
                 and_(
-                    AIMemorySummary.user_id == user_id,
+                    AIMemorySummary.user_id.in_(user_ids),
                     AIMemorySummary.summary_type == summary_type,
                     AIMemorySummary.is_active == True,
                 )
             )
-            .order_by(AIMemorySummary.created_at.desc())
-            .offset(keep_last)
+            .subquery()
         )
-        result = await self.session.execute(active_stmt)
-        old_ids = [row[0] for row in result.all()]
-
-        if old_ids:
-            stmt = (
-                update(AIMemorySummary)
-                .where(AIMemorySummary.id.in_(old_ids))
-                .values(is_active=False)
-            )
-            await self.session.execute(stmt)
+        stmt = (
+            update(AIMemorySummary)
+            .where(AIMemorySummary.id.in_(select(ranked.c.id).where(ranked.c.rank > keep_last)))
+            .values(is_active=False)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return result.rowcount
 
     async def create_interaction(
         self,
@@ -80,6 +98,8 @@ class MemoryRepository(BaseRepository):
         ai_response: str,
         ai_mode: str,
         response_time_ms: int | None = None,
+        token_count_prompt: int | None = None,
+        token_count_response: int | None = None,
     ) -> AIInteraction:
         interaction = AIInteraction(
             user_id=user_id,
@@ -87,6 +107,8 @@ class MemoryRepository(BaseRepository):
             ai_response=ai_response,
             ai_mode=ai_mode,
             response_time_ms=response_time_ms,
+            token_count_prompt=token_count_prompt,
+            token_count_response=token_count_response,
         )
         self.session.add(interaction)
         await self.session.flush()
@@ -120,19 +142,146 @@ class MemoryRepository(BaseRepository):
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
 
+    def _latest_summaries(self, summary_type: str, user_ids: list[int] | None = None, *columns):
+        stmt = (
+            select(*(columns or (AIMemorySummary,)))
+            .where(
+                and_(
+                    AIMemorySummary.summary_type == summary_type,
+                    AIMemorySummary.is_active == True,
+                )
+            )
+            .distinct(AIMemorySummary.user_id)
+            .order_by(AIMemorySummary.user_id, AIMemorySummary.created_at.desc(), AIMemorySummary.id.desc())
+        )
+        if user_ids is not None:
+            stmt = stmt.where(AIMemorySummary.user_id.in_(user_ids))
+        return stmt
+
+    async def get_latest_summaries(
+        self, user_ids: list[int], summary_type: str
+    ) -> dict[int, AIMemorySummary]:
+        result = await self.session.execute(self._latest_summaries(summary_type, user_ids))
+        return {summary.user_id: summary for summary in result.scalars().all()}
+
+    def _unsummarized(self, summary_type: str, user_ids: list[int] | None = None):
+        # Interactions above the high-water mark of the user's latest summary.
+        latest = self._latest_summaries(
+            summary_type, user_ids, AIMemorySummary.user_id, AIMemorySummary.last_interaction_id
+        ).subquery()
+        return (
+            latest,
+            AIInteraction.id > func.coalesce(latest.c.last_interaction_id, 0),
+        )
+
+    async def get_compression_candidates(
+        self, since: datetime, min_interactions: int, partitions: set[int], total: int
+    ) -> list[int]:
+        # Users with enough interactions since `since` that no weekly summary covers yet.
+        if not partitions:
+            return []
+        latest, unsummarized = self._unsummarized("weekly_summary")
+        stmt = (
+            select(AIInteraction.user_id)
+            .outerjoin(latest, latest.c.user_id == AIInteraction.user_id)
+            .where(
+                and_(
+                    AIInteraction.created_at >= since,
+                    (AIInteraction.user_id % total).in_(partitions),
+                    unsummarized,
+                )
+            )
+            .group_by(AIInteraction.user_id)
+            .having(func.count() >= min_interactions)
+            .order_by(AIInteraction.user_id)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_transcripts(
+        self,
+        user_ids: list[int],
+        since: datetime,
+        summary_type: str = "weekly_summary",
+        per_user: int = 20,
+        chars: int = 100,
+    ) -> dict[int, list[tuple[int, str, str]]]:
+        # Up to `per_user` newest unsummarized exchanges of each user in one query,
+        # trimmed on the database side.
+        latest, unsummarized = self._unsummarized(summary_type, user_ids)
+        rank = (
+            func.row_number()
+            .over(partition_by=AIInteraction.user_id, order_by=AIInteraction.id.desc())
+            .label("rank")
+        )
+        ranked = (
+            select(
+                AIInteraction.id,
+                AIInteraction.user_id,
+                func.substr(AIInteraction.user_message, 1, chars).label("user_message"),
+                func.substr(AIInteraction.ai_response, 1, chars).label("ai_response"),
+                rank,
+            )
+            .outerjoin(latest, latest.c.user_id == AIInteraction.user_id)
+            .where(
+                and_(
+                    AIInteraction.user_id.in_(user_ids),
+                    AIInteraction.created_at >= since,
+                    unsummarized,
+                )
+            )
+            .subquery()
+        )
+        stmt = (
+            select(ranked.c.id, ranked.c.user_id, ranked.c.user_message, ranked.c.ai_response)
+            .where(ranked.c.rank <= per_user)
+            .order_by(ranked.c.user_id, ranked.c.id)
+        )
+        result = await self.session.execute(stmt)
+        transcripts: dict[int, list[tuple[int, str, str]]] = {}
+        for interaction_id, user_id, user_message, ai_response in result.all():
+            transcripts.setdefault(user_id, []).append((interaction_id, user_message, ai_response))
+        return transcripts
+
+    async def get_search_documents(self, user_id: int, limit: int) -> list[tuple[str, int, str, str]]:
+        # (kind, id, first text, second text) for the newest `limit` journal entries and exchanges.
+        journal = (
+            select(
+                literal_column("'journal'").label("kind"),
+                JournalEntry.id,
+                JournalEntry.title.label("first"),
+                JournalEntry.content.label("second"),
+            )
+            .where(JournalEntry.user_id == user_id)
+            .order_by(JournalEntry.created_at.desc())
+            .limit(limit)
+        )
+        chat = (
+            select(
+                literal_column("'chat'").label("kind"),
+                AIInteraction.id,
+                AIInteraction.user_message.label("first"),
+                AIInteraction.ai_response.label("second"),
+            )
+            .where(AIInteraction.user_id == user_id)
+            .order_by(AIInteraction.created_at.desc())
+            .limit(limit)
+        )
+        result = await self.session.execute(union_all(journal.subquery().select(), chat.subquery().select()))
+        return [tuple(row) for row in result.all()]
+
     async def delete_interactions_before(
-        self, user_id: int, before: datetime
-    ):
+        self, user_ids: list[int], before: datetime
+    ) -> int:
         stmt = (
-            select(AIInteraction)
+            delete(AIInteraction)
             .where(
                 and_(
-                    AIInteraction.user_id == user_id,
+                    AIInteraction.user_id.in_(user_ids),
                     AIInteraction.created_at < before,
                 )
             )
+            .execution_options(synchronize_session=False)
         )
         result = await self.session.execute(stmt)
-        for interaction in result.scalars().all():
-            await self.session.delete(interaction)
-        await self.session.flush()
\ No newline at end of file
+        return result.rowcount
\ No newline at end of file
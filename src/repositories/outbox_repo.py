@@ -0,0 +1,88 @@
+from datetime import datetime
+from sqlalchemy import select, update, delete, and_, or_
+from sqlalchemy.dialects.postgresql import insert
+
+from src.models.reminder import NotificationOutbox
+from src.repositories.base import BaseRepository
+
+
+class OutboxRepository(BaseRepository):
+    model = NotificationOutbox
+
+    async def enqueue(self, rows: list[dict], chunk_size: int = 1000) -> int:
+        for start in range(0, len(rows), chunk_size):
+            await self.session.execute(
+                insert(NotificationOutbox).values(rows[start:start + chunk_size])
+            )
+        return len(rows)
+
+    async def claim(
+        self, owner: str, limit: int, now: datetime, until: datetime
+    ) -> list[NotificationOutbox]:
+        if limit <= 0:
+            return []
+        ready = (
+            select(NotificationOutbox.id)
+            .where(
+                or_(
+                    and_(
+                        NotificationOutbox.status == "pending",
+                        NotificationOutbox.available_at <= now,
+                    ),
+                    and_(
+                        NotificationOutbox.status == "sending",
+                        NotificationOutbox.claimed_until < now,
+                    ),
+                )
+            )
+            .order_by(NotificationOutbox.available_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(ready))
+            .values(
+                status="sending",
+                claimed_by=owner,
+                claimed_until=until,
+                attempts=NotificationOutbox.attempts + 1,
+            )
+            .returning(NotificationOutbox)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def record(self, updates: list[dict]):
+        # Bulk UPDATE by primary key; each dict carries "id" plus the new values.
+        if updates:
+            await self.session.execute(update(NotificationOutbox), updates)
+
+    async def release(self, owner: str):
+        await self.session.execute(
+            update(NotificationOutbox)
+            .where(
+                and_(
+                    NotificationOutbox.claimed_by == owner,
+                    NotificationOutbox.status == "sending",
+                )
+            )
+            .values(
+                status="pending",
+                attempts=NotificationOutbox.attempts - 1,
+                claimed_by=None,
+                claimed_until=None,
+            )
+        )
+
+    async def purge(self, before: datetime) -> int:
+        result = await self.session.execute(
+            delete(NotificationOutbox).where(
+                and_(
+                    NotificationOutbox.status.in_(("sent", "failed")),
+                    NotificationOutbox.created_at < before,
+                )
+            )
+        )
+        return result.rowcount or 0
@@ -0,0 +1,306 @@
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete, and_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import noload
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.models.reminder import ReminderSlot, ReminderDelivery
+from src.models.task import Task
+from src.models.habit import Habit
+from src.models.user import User
+from src.repositories.base import BaseRepository
+from src.utils.datetime_utils import get_zoneinfo, next_occurrence_utc
+
+ACTIVE_TASK_STATUSES = ("todo", "in_progress")
+NOTIFICATION_KINDS = ("morning", "evening")
+REENGAGE_KIND = "reengage"
+
+
+class ReminderRepository(BaseRepository):
+    model = ReminderSlot
+
+    async def get_due(
+        self, until: datetime, partitions: set[int], total: int
+    ) -> list[tuple]:
+        if not partitions:
+            return []
+        stmt = (
+            select(ReminderSlot, User, Task, Habit)
+            .join(User, User.id == ReminderSlot.user_id)
+            .outerjoin(
+                Task,
+                and_(ReminderSlot.kind == "task", Task.id == ReminderSlot.entity_id),
+            )
+            .outerjoin(
+                Habit,
+                and_(ReminderSlot.kind == "habit", Habit.id == ReminderSlot.entity_id),
+            )
+            .where(
+                and_(
+                    ReminderSlot.next_fire_at < until,
+                    (ReminderSlot.user_id % total).in_(partitions),
+                )
+            )
+            .options(noload(User.tasks), noload(User.habits))
+            .order_by(ReminderSlot.next_fire_at)
+        )
+        result = await self.session.execute(stmt)
+        return [tuple(row) for row in result.all()]
+
+    async def advance(self, slot: ReminderSlot, user: User, entity, after: datetime):
+        next_fire_at = self.next_fire_at(slot.kind, user, entity, after)
+        if next_fire_at is None:
+            await self.session.delete(slot)
+        else:
+            slot.next_fire_at = next_fire_at
+
+    async def sync_task(self, task: Task, user: User | None = None):
+        user = user or await self.session.get(User, task.user_id)
+        await self._remove("task", task.id)
+        self._add_slot(user, "task", task, task.remind_time)
+        await self.session.flush()
+
+    async def sync_habit(self, habit: Habit, user: User | None = None):
+        user = user or await self.session.get(User, habit.user_id)
+        await self._remove("habit", habit.id)
+        self._add_slot(user, "habit", habit, habit.remind_time)
+        await self.session.flush()
+
+    async def remove_entity(self, kind: str, entity_id: int):
+        await self._remove(kind, entity_id)
+        await self.session.flush()
+
+    async def sync_user(self, user: User):
+        await self.session.execute(
+            delete(ReminderSlot).where(ReminderSlot.user_id == user.id)
+        )
+        tasks = await self._reminder_tasks([user.id])
+        habits = await self._reminder_habits([user.id])
+        self._add_user_slots(user, tasks, habits)
+        await self.session.flush()
+
+    async def rebuild_partitions(
+        self, partitions: set[int], total: int, after: datetime | None = None
+    ) -> int:
+        if not partitions:
+            return 0
+        await self.session.execute(
+            delete(ReminderSlot).where((ReminderSlot.user_id % total).in_(partitions))
+        )
+        users = (
+            await self.session.execute(
+                select(User)
+                .where(
+                    and_(
+                        User.is_active == True,
+                        (User.id % total).in_(partitions),
+                    )
+                )
+                .options(noload(User.tasks), noload(User.habits))
+            )
+        ).scalars().all()
+        await self._add_users_slots(users, after)
+        await self.session.flush()
+        return len(users)
+
+    async def sync_users(self, users: list[User]):
+        if not users:
+            return
+        await self.session.execute(
+            delete(ReminderSlot).where(ReminderSlot.user_id.in_([u.id for u in users]))
+        )
+        await self._add_users_slots(users)
+        await self.session.flush()
+
+    async def _add_users_slots(self, users: list[User], after: datetime | None = None):
+        # Dormant users only keep the re-engagement slot, so skip loading their entities.
+        user_ids = [u.id for u in users if u.activity_tier != "dormant"]
+        tasks = await self._reminder_tasks(user_ids)
+        habits = await self._reminder_habits(user_ids)
+
+        tasks_by_user: dict[int, list[Task]] = {}
+        for task in tasks:
+            tasks_by_user.setdefault(task.user_id, []).append(task)
+        habits_by_user: dict[int, list[Habit]] = {}
+        for habit in habits:
+            habits_by_user.setdefault(habit.user_id, []).append(habit)
+
+        for user in users:
+            self._add_user_slots(
+                user,
+                tasks_by_user.get(user.id, []),
+                habits_by_user.get(user.id, []),
+                after=after,
+            )
+
+    async def claim_deliveries(self, keys: list[tuple], chunk_size: int = 1000) -> set[tuple]:
+        claimed: set[tuple] = set()
+        for start in range(0, len(keys), chunk_size):
+            stmt = (
+                insert(ReminderDelivery)
+                .values(
+                    [
+                        {
+                            "kind": kind,
+                            "user_id": user_id,
+                            "entity_id": entity_id,
+                            "local_date": local_date,
+                            "local_minute": local_minute,
+                        }
+                        for kind, user_id, entity_id, local_date, local_minute
+                        in keys[start:start + chunk_size]
+                    ]
+                )
+                .on_conflict_do_nothing()
+                .returning(
+                    ReminderDelivery.kind,
+                    ReminderDelivery.user_id,
+                    ReminderDelivery.entity_id,
+                    ReminderDelivery.local_date,
+                    ReminderDelivery.local_minute,
+                )
+            )
+            result = await self.session.execute(stmt)
+            claimed.update(tuple(row) for row in result.all())
+        return claimed
+
+    async def purge_deliveries(self, before: datetime) -> int:
+        result = await self.session.execute(
+            delete(ReminderDelivery).where(ReminderDelivery.created_at < before)
+        )
+        return result.rowcount or 0
+
+    def next_fire_at(
+        self, kind: str, user: User, entity, after: datetime
+    ) -> datetime | None:
+        if user is None or not user.is_active:
+            return None
+        tz = get_zoneinfo(user.timezone)
+        notif = user.get_settings().get("notifications", {})
+        tier = user.activity_tier or "active"
+
+        if kind == REENGAGE_KIND:
+            if tier != "dormant":
+                return None
+            return next_occurrence_utc(
+                notif.get("morning_time"),
+                tz,
+                after,
+                weekday_mask=1 << settings.ACTIVITY_REENGAGE_WEEKDAY,
+            )
+        if tier == "dormant":
+            return None
+
+        if kind == "task":
+            if (
+                entity is None
+                or not notif.get("task_remind_default", True)
+                or not entity.remind_enabled
+                or entity.status not in ACTIVE_TASK_STATUSES
+            ):
+                return None
+            return next_occurrence_utc(
+                entity.remind_time, tz, after, not_before=entity.deadline
+            )
+
+        if kind == "habit":
+            if (
+                entity is None
+                or not notif.get("habit_remind_default", True)
+                or not entity.is_active
+                or not entity.remind_enabled
+            ):
+                return None
+            return next_occurrence_utc(
+                entity.remind_time, tz, after, weekday_mask=entity.schedule_mask
+            )
+
+        if kind in NOTIFICATION_KINDS:
+            # Idle users keep their own task/habit reminders but not the daily check-ins.
+            if tier == "idle" or not notif.get(kind, True):
+                return None
+            return next_occurrence_utc(notif.get(f"{kind}_time"), tz, after)
+
+        return None
+
+    def _add_user_slots(
+        self,
+        user: User,
+        tasks: list[Task],
+        habits: list[Habit],
+        after: datetime | None = None,
+    ):
+        notif = user.get_settings().get("notifications", {})
+        for kind in NOTIFICATION_KINDS:
+            self._add_slot(user, kind, None, notif.get(f"{kind}_time"), after)
+        self._add_slot(user, REENGAGE_KIND, None, notif.get("morning_time"), after)
+        for task in tasks:
+            self._add_slot(user, "task", task, task.remind_time, after)
+        for habit in habits:
+            self._add_slot(user, "habit", habit, habit.remind_time, after)
+
+    def _add_slot(
+        self,
+        user: User,
+        kind: str,
+        entity,
+        remind_time: str | None,
+        after: datetime | None = None,
+    ):
+        next_fire_at = self.next_fire_at(kind, user, entity, after or self._sync_point())
+        if next_fire_at is None:
+            return
+        self.session.add(
+            ReminderSlot(
+                user_id=user.id,
+                kind=kind,
+                entity_id=entity.id if entity is not None else None,
+                remind_time=remind_time,
+                next_fire_at=next_fire_at,
+            )
+        )
+
+    @staticmethod
+    def _sync_point() -> datetime:
+        # Slots synced during a minute may still fire in that minute's tick.
+        minute = datetime.utcnow().replace(second=0, microsecond=0)
+        return minute - timedelta(microseconds=1)
+
+    async def _remove(self, kind: str, entity_id: int):
+        await self.session.execute(
+            delete(ReminderSlot).where(
+                and_(
+                    ReminderSlot.kind == kind,
+                    ReminderSlot.entity_id == entity_id,
+                )
+            )
+        )
+
+    async def _reminder_tasks(self, user_ids: list[int]) -> list[Task]:
+        if not user_ids:
+            return []
+        stmt = select(Task).where(
+            and_(
+                Task.user_id.in_(user_ids),
+                Task.remind_enabled == True,
+                Task.remind_time.is_not(None),
+                Task.status.in_(ACTIVE_TASK_STATUSES),
+            )
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def _reminder_habits(self, user_ids: list[int]) -> list[Habit]:
+        if not user_ids:
+            return []
+        stmt = select(Habit).where(
+            and_(
+                Habit.user_id.in_(user_ids),
+                Habit.is_active == True,
+                Habit.remind_enabled == True,
+                Habit.remind_time.is_not(None),
+            )
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
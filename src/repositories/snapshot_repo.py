@@ -0,0 +1,140 @@
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, and_, func, inspect, null, select
+from sqlalchemy.dialects.postgresql import JSON, aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.ai_memory import AIInteraction, AIMemorySummary
+from src.models.habit import Habit
+from src.models.task import Task
+
+SUMMARY_TYPES = ("profile_summary", "weekly_summary")
+
+
+class MentorSnapshot:
+    def __init__(
+        self,
+        tasks: list[Task],
+        active_tasks: list[Task],
+        habits: list[Habit],
+        summaries: dict[str, AIMemorySummary],
+        interactions: list[AIInteraction],
+    ):
+        self.tasks = tasks
+        self.active_tasks = active_tasks
+        self.habits = habits
+        self.summaries = summaries
+        self.interactions = interactions
+
+
+class SnapshotRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_mentor_snapshot(
+        self,
+        user_id: int,
+        task_limit: int = 100,
+        active_limit: int = 5,
+        interaction_limit: int = 3,
+    ) -> MentorSnapshot:
+        # Every part is a json_agg scalar subquery of one SELECT: a single round trip
+        # instead of one await per repository call.
+        recent_tasks = (
+            select(Task)
+            .where(Task.user_id == user_id)
+            .order_by(Task.created_at.desc())
+            .limit(task_limit)
+            .subquery()
+        )
+        active_tasks = (
+            select(Task, func.array_position(["critical", "high", "medium", "low"], Task.priority).label("rank"))
+            .where(
+                and_(
+                    Task.user_id == user_id,
+                    Task.status.in_(["todo", "in_progress"]),
+                )
+            )
+            .order_by("rank")
+            .limit(active_limit)
+            .subquery()
+        )
+        habits = (
+            select(Habit)
+            .where(
+                and_(
+                    Habit.user_id == user_id,
+                    Habit.is_active == True,
+                )
+            )
+            .subquery()
+        )
+        summaries = (
+            select(AIMemorySummary)
+            .where(
+                and_(
+                    AIMemorySummary.user_id == user_id,
+                    AIMemorySummary.summary_type.in_(SUMMARY_TYPES),
+                    AIMemorySummary.is_active == True,
+                )
+            )
+            .distinct(AIMemorySummary.summary_type)
+            .order_by(AIMemorySummary.summary_type, AIMemorySummary.created_at.desc())
+            .subquery()
+        )
+        interactions = (
+            select(AIInteraction)
+            .where(AIInteraction.user_id == user_id)
+            .order_by(AIInteraction.created_at.desc())
+            .limit(interaction_limit)
+            .subquery()
+        )
+
+        stmt = select(
+            _json_rows(recent_tasks, recent_tasks.c.created_at.desc(), task_limit),
+            _json_rows(active_tasks, active_tasks.c.rank, active_limit),
+            _json_rows(habits, habits.c.created_at),
+            _json_rows(summaries, summaries.c.summary_type),
+            _json_rows(interactions, interactions.c.created_at, interaction_limit),
+        )
+        row = (await self.session.execute(stmt)).one()
+
+        return MentorSnapshot(
+            tasks=_hydrate(Task, row[0]),
+            active_tasks=_hydrate(Task, row[1]),
+            habits=_hydrate(Habit, row[2]),
+            summaries={s.summary_type: s for s in _hydrate(AIMemorySummary, row[3])},
+            interactions=_hydrate(AIInteraction, row[4]),
+        )
+
+
+def _json_rows(subquery, order_by, limit: int | None = None):
+    # A zero limit means the caller doesn't need that part at all.
+    if limit == 0:
+        return null()
+    return (
+        select(func.json_agg(aggregate_order_by(subquery.table_valued(), order_by), type_=JSON))
+        .select_from(subquery)
+        .scalar_subquery()
+    )
+
+
+def _hydrate(model, rows: list[dict] | None) -> list:
+    # Rows come back as JSON, so dates arrive as ISO strings. The objects are transient
+    # (never added to the session) and meant for read-only use.
+    if not rows:
+        return []
+    columns = [(attr.key, attr.columns[0]) for attr in inspect(model).column_attrs]
+    items = []
+    for data in rows:
+        values = {}
+        for key, column in columns:
+            value = data.get(column.name)
+            if isinstance(value, str):
+                if isinstance(column.type, DateTime):
+                    value = datetime.fromisoformat(value)
+                elif isinstance(column.type, Date):
+                    value = date.fromisoformat(value)
+            values[key] = value
+        items.append(model(**values))
+    return items
@@ -4,11 +4,37 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.task import Task, TaskLog
 from src.repositories.base import BaseRepository
+from src.repositories.daily_brief_repo import TASK_FIELDS as BRIEF_FIELDS, DailyBriefRepository
+from src.repositories.reminder_repo import ReminderRepository
+
+REMINDER_FIELDS = {"status", "deadline", "remind_enabled", "remind_time"}
 
 
 class TaskRepository(BaseRepository):
     model = Task
 
+    async def create(self, **kwargs) -> Task:
+        task = await super().create(**kwargs)
+        await ReminderRepository(self.session).sync_task(task)
+        await DailyBriefRepository(self.session).patch_task(task)
+        return task
+
+    async def update(self, record_id: int, **kwargs) -> Task | None:
+        task = await super().update(record_id, **kwargs)
+        if task and REMINDER_FIELDS & kwargs.keys():
+            await ReminderRepository(self.session).sync_task(task)
+        if task and BRIEF_FIELDS & kwargs.keys():
+            await DailyBriefRepository(self.session).patch_task(task)
+        return task
+
+    async def delete(self, record_id: int) -> bool:
+        task = await self.get_by_id(record_id)
+        deleted = await super().delete(record_id)
+        if deleted:
+            await ReminderRepository(self.session).remove_entity("task", record_id)
+            await DailyBriefRepository(self.session).patch_task(task, removed=True)
+        return deleted
+
     async def get_user_tasks(
         self,
         user_id: int,
@@ -94,6 +120,8 @@ class TaskRepository(BaseRepository):
         )
         self.session.add(log)
         await self.session.flush()
+        await ReminderRepository(self.session).remove_entity("task", task_id)
+        await DailyBriefRepository(self.session).patch_task(task)
         return task
 
     async def count_created(self, user_id: int, since: datetime) -> int:
@@ -117,6 +145,22 @@ class TaskRepository(BaseRepository):
         result = await self.session.execute(stmt)
         return result.scalar()
 
+    async def get_overdue_tasks(self, user_id: int, limit: int = 10) -> list[Task]:
+        stmt = (
+            select(Task)
+            .where(
+                and_(
+                    Task.user_id == user_id,
+                    Task.status.in_(["todo", "in_progress"]),
+                    Task.deadline < date.today(),
+                )
+            )
+            .order_by(Task.deadline)
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
     async def count_overdue(self, user_id: int) -> int:
         stmt = select(func.count()).where(
             and_(
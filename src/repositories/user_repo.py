@@ -1,8 +1,17 @@
-from sqlalchemy import select
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, union_all, case, func, and_
+from sqlalchemy.orm import noload
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.models.ai_memory import AIInteraction
+from src.models.gamification import XPEvent
+from src.models.habit import HabitLog
 from src.models.user import User
 from src.repositories.base import BaseRepository
+from src.repositories.reminder_repo import ReminderRepository
+
+REMINDER_FIELDS = {"timezone", "settings_json", "is_active"}
+ACTIVITY_TOUCH_INTERVAL = timedelta(hours=12)
 
 
 class UserRepository(BaseRepository):
@@ -27,6 +36,7 @@ class UserRepository(BaseRepository):
             # Keep user-defined display name stable between sessions.
             if not user.display_name:
                 user.first_name = first_name
+            await self.touch_activity(user)
             await self.session.flush()
             return user
 
@@ -35,10 +45,18 @@ class UserRepository(BaseRepository):
             username=username,
             first_name=first_name,
             last_name=last_name,
+            last_active_at=datetime.utcnow(),
         )
         self.session.add(user)
         await self.session.flush()
         await self.session.refresh(user)
+        await ReminderRepository(self.session).sync_user(user)
+        return user
+
+    async def update(self, record_id: int, **kwargs) -> User | None:
+        user = await super().update(record_id, **kwargs)
+        if user and REMINDER_FIELDS & kwargs.keys():
+            await ReminderRepository(self.session).sync_user(user)
         return user
 
     async def update_xp(self, user_id: int, xp_delta: int) -> User:
@@ -48,3 +66,73 @@ class UserRepository(BaseRepository):
             user.total_xp_earned += xp_delta
         await self.session.flush()
         return user
+
+    async def touch_activity(self, user: User):
+        now = datetime.utcnow()
+        if user.last_active_at is None or now - user.last_active_at > ACTIVITY_TOUCH_INTERVAL:
+            user.last_active_at = now
+        if user.activity_tier != "active":
+            user.activity_tier = "active"
+            await ReminderRepository(self.session).sync_user(user)
+
+    async def refresh_activity_tiers(
+        self,
+        partitions: set[int],
+        total: int,
+        idle_before: datetime,
+        dormant_before: datetime,
+    ) -> list[User]:
+        if not partitions:
+            return []
+        in_partitions = (User.id % total).in_(partitions)
+
+        # Only events newer than the dormancy cutoff can change a tier.
+        events = union_all(
+            select(AIInteraction.user_id, AIInteraction.created_at.label("at"))
+            .where(AIInteraction.created_at >= dormant_before),
+            select(XPEvent.user_id, XPEvent.created_at.label("at"))
+            .where(XPEvent.created_at >= dormant_before),
+            select(HabitLog.user_id, HabitLog.logged_at.label("at"))
+            .where(HabitLog.logged_at >= dormant_before),
+        ).subquery()
+        latest = (
+            select(events.c.user_id, func.max(events.c.at).label("at"))
+            .group_by(events.c.user_id)
+            .subquery()
+        )
+        await self.session.execute(
+            update(User)
+            .where(
+                and_(
+                    User.id == latest.c.user_id,
+                    in_partitions,
+                    func.coalesce(User.last_active_at, User.created_at) < latest.c.at,
+                )
+            )
+            .values(last_active_at=latest.c.at)
+            .execution_options(synchronize_session=False)
+        )
+
+        seen_at = func.coalesce(User.last_active_at, User.created_at)
+        tier = case(
+            (seen_at >= idle_before, "active"),
+            (seen_at >= dormant_before, "idle"),
+            else_="dormant",
+        )
+        result = await self.session.execute(
+            update(User)
+            .where(and_(in_partitions, User.is_active == True, User.activity_tier != tier))
+            .values(activity_tier=tier)
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        changed = list(result.scalars().all())
+        if not changed:
+            return []
+        users = await self.session.execute(
+            select(User)
+            .where(User.id.in_(changed))
+            .options(noload(User.tasks), noload(User.habits))
+            .execution_options(populate_existing=True)
+        )
+        return list(users.scalars().all())
@@ -1,3 +1,7 @@
 from src.services.ai_backends.base import BaseAIBackend
+from src.services.ai_backends.openai_compat import OpenAICompatibleBackend
 from src.services.ai_backends.groq_backend import GroqBackend
-from src.services.ai_backends.openrouter_backend import OpenRouterBackend
\ No newline at end of file
+from src.services.ai_backends.openrouter_backend import OpenRouterBackend
+from src.services.ai_backends.http_client import close_clients
+from src.services.ai_backends.errors import AIBackendError
+from src.services.ai_backends.circuit import get_breaker
@@ -1,7 +1,10 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterator
 
 
 class BaseAIBackend(ABC):
+    name = "ai"
+
     @abstractmethod
     async def generate(
         self,
@@ -9,9 +12,20 @@ class BaseAIBackend(ABC):
         context: str,
         user_message: str,
         max_tokens: int = 1000,
+        usage: dict | None = None,
     ) -> str:
         pass
 
+    async def generate_stream(
+        self,
+        system_prompt: str,
+        context: str,
+        user_message: str,
+        max_tokens: int = 1000,
+        usage: dict | None = None,
+    ) -> AsyncIterator[str]:
+        yield await self.generate(system_prompt, context, user_message, max_tokens, usage=usage)
+
     @abstractmethod
-    async def generate_summary(self, text: str) -> str:
-        pass
\ No newline at end of file
+    async def generate_summary(self, text: str, usage: dict | None = None) -> str:
+        pass
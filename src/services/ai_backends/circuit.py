@@ -0,0 +1,97 @@
+import time
+import logging
+
+from src.config import settings
+from src.core.metrics import registry
+from src.services.ai_backends.errors import AIBackendError
+
+logger = logging.getLogger(__name__)
+
+HEALTH = registry.gauge("ai_backend_health", "EWMA success ratio of AI backend calls")
+CIRCUIT_OPEN = registry.gauge("ai_backend_circuit_open", "1 while the backend circuit is open")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = settings.AI_BREAKER_FAILURE_THRESHOLD,
+        cooldown: float = settings.AI_BREAKER_COOLDOWN_SECONDS,
+        max_cooldown: float = settings.AI_BREAKER_MAX_COOLDOWN_SECONDS,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.open_until = 0.0
+        self.probing = False
+        self.health = 1.0
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() < self.open_until:
+                return False
+            self.state = HALF_OPEN
+            self.probing = False
+        if self.probing:
+            return False
+        self.probing = True
+        return True
+
+    def record_success(self):
+        self._score(1.0)
+        if self.state != CLOSED:
+            logger.info("AI backend %s recovered, closing circuit", self.name)
+        self.state = CLOSED
+        self.failures = 0
+        self.probing = False
+        self.cooldown = self.base_cooldown
+        CIRCUIT_OPEN.set(0, backend=self.name)
+
+    def record_failure(self, error: AIBackendError):
+        self.probing = False
+        if not error.counts_against_backend:
+            return
+        self._score(0.0)
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self._open(self.cooldown)
+        elif error.kind == "rate_limited" and error.retry_after:
+            self._open(min(error.retry_after, self.max_cooldown))
+        elif self.failures >= self.failure_threshold:
+            self._open(self.cooldown)
+
+    def release(self):
+        # A cancelled probe (e.g. a hedge loser) proves nothing either way.
+        self.probing = False
+
+    def _open(self, seconds: float):
+        self.state = OPEN
+        self.open_until = time.monotonic() + seconds
+        CIRCUIT_OPEN.set(1, backend=self.name)
+        logger.warning("AI backend %s circuit open for %.0fs", self.name, seconds)
+
+    def _score(self, value: float):
+        self.health = 0.9 * self.health + 0.1 * value
+        HEALTH.set(round(self.health, 3), backend=self.name)
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = CircuitBreaker(name)
+        _breakers[name] = breaker
+    return breaker
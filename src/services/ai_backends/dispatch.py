@@ -0,0 +1,129 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Callable
+
+from src.config import settings
+from src.core.metrics import registry
+from src.services.ai_backends.errors import AIBackendError
+
+logger = logging.getLogger(__name__)
+
+INFLIGHT = registry.gauge("ai_dispatch_inflight", "AI backend calls currently running")
+QUEUED = registry.gauge("ai_dispatch_queued", "AI backend calls waiting for a slot")
+LIMIT = registry.gauge("ai_dispatch_concurrency_limit", "Current adaptive AI concurrency limit")
+REJECTED = registry.counter("ai_dispatch_rejected_total", "AI requests refused by backpressure, by reason")
+
+INTERACTIVE = 0
+BATCH = 1
+
+
+class AIDispatcher:
+    def __init__(
+        self,
+        max_concurrency: int = settings.AI_MAX_CONCURRENCY,
+        max_queued: int = settings.AI_MAX_QUEUED,
+        user_max_queued: int = settings.AI_USER_MAX_QUEUED,
+    ):
+        self.max_limit = max(1, max_concurrency)
+        self.limit = float(self.max_limit)
+        self.max_queued = max_queued
+        self.user_max_queued = user_max_queued
+        self.active = 0
+        self.waiters: list[tuple[int, int, asyncio.Future]] = []
+        self.seq = itertools.count()
+        self.hold_until = 0.0
+        # user_id -> [lock, requests in flight or waiting]
+        self.users: dict[int, list] = {}
+
+    async def acquire(self, priority: int = INTERACTIVE) -> Callable[[], None]:
+        # Returns an idempotent release callback; lower priority values are served first.
+        if self.active < int(self.limit) and not self.waiters:
+            self.active += 1
+        else:
+            if len(self.waiters) >= self.max_queued:
+                REJECTED.inc(reason="queue_full")
+                raise AIBackendError("overloaded", "dispatch")
+            entry = (priority, next(self.seq), asyncio.get_running_loop().create_future())
+            heapq.heappush(self.waiters, entry)
+            self._publish()
+            try:
+                await entry[2]
+            except asyncio.CancelledError:
+                if entry[2].done() and not entry[2].cancelled():
+                    self._release()
+                elif entry in self.waiters:
+                    self.waiters.remove(entry)
+                    heapq.heapify(self.waiters)
+                    self._publish()
+                raise
+        self._publish()
+
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self._release()
+
+        return release
+
+    def on_success(self):
+        # Additive increase: roughly +1 slot per window of successful calls.
+        if self.limit < self.max_limit and time.monotonic() >= self.hold_until:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._wake()
+
+    def on_rate_limited(self, retry_after: float | None = None):
+        # Multiplicative decrease, once per back-off window so a burst of 429s
+        # from calls already in flight doesn't collapse the limit to 1.
+        now = time.monotonic()
+        if now < self.hold_until:
+            return
+        self.limit = max(1.0, self.limit / 2)
+        self.hold_until = now + (retry_after or settings.AI_DISPATCH_BACKOFF_SECONDS)
+        logger.warning("AI provider rate limited, concurrency limit now %d", int(self.limit))
+        self._publish()
+
+    @asynccontextmanager
+    async def user_turn(self, user_id: int):
+        # Per-user single flight: one request runs, a few may queue behind it.
+        entry = self.users.get(user_id)
+        if entry is None:
+            entry = self.users[user_id] = [asyncio.Lock(), 0]
+        if entry[1] > self.user_max_queued:
+            REJECTED.inc(reason="user_busy")
+            raise AIBackendError("busy", "dispatch")
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                self.users.pop(user_id, None)
+
+    def _release(self):
+        self.active -= 1
+        self._wake()
+
+    def _wake(self):
+        while self.waiters and self.active < int(self.limit):
+            _, _, future = heapq.heappop(self.waiters)
+            if future.done():
+                continue
+            self.active += 1
+            future.set_result(None)
+        self._publish()
+
+    def _publish(self):
+        INFLIGHT.set(self.active)
+        QUEUED.set(len(self.waiters))
+        LIMIT.set(int(self.limit))
+
+
+ai_dispatcher = AIDispatcher()
@@ -0,0 +1,77 @@
+import httpx
+
+TIMEOUT_TEXT = "⏳ AI наставник думает слишком долго. Попробуй позже."
+RATE_LIMIT_TEXT = "⚠️ Слишком много запросов к AI. Подожди минуту."
+UNAVAILABLE_TEXT = "⚠️ AI наставник временно недоступен."
+ERROR_TEXT = "⚠️ Ошибка AI. Попробуй позже."
+BUSY_TEXT = "⏳ Ещё отвечаю на предыдущие сообщения. Подожди ответа."
+OVERLOADED_TEXT = "⏳ AI наставник сейчас перегружен. Попробуй через минуту."
+
+USER_MESSAGES = {
+    "timeout": TIMEOUT_TEXT,
+    "rate_limited": RATE_LIMIT_TEXT,
+    "server": UNAVAILABLE_TEXT,
+    "circuit_open": UNAVAILABLE_TEXT,
+    "busy": BUSY_TEXT,
+    "overloaded": OVERLOADED_TEXT,
+}
+
+# Raised by the dispatcher before any provider is contacted.
+DISPATCH_KINDS = ("busy", "overloaded")
+
+# Request-specific rejections say nothing about the provider's health.
+CLIENT_STATUSES = (400, 404, 413, 422)
+
+
+class AIBackendError(Exception):
+    def __init__(
+        self,
+        kind: str,
+        backend: str,
+        status: int | None = None,
+        retry_after: float | None = None,
+        detail: str = "",
+    ):
+        self.kind = kind
+        self.backend = backend
+        self.status = status
+        self.retry_after = retry_after
+        self.detail = detail
+        super().__init__(f"{backend}: {kind}" + (f" ({status})" if status else "") + (f" {detail}" if detail else ""))
+
+    @property
+    def user_message(self) -> str:
+        return USER_MESSAGES.get(self.kind, ERROR_TEXT)
+
+    @property
+    def counts_against_backend(self) -> bool:
+        if self.kind in DISPATCH_KINDS:
+            return False
+        return not (self.kind == "client" and self.status in CLIENT_STATUSES)
+
+    @classmethod
+    def from_exception(cls, backend: str, e: Exception) -> "AIBackendError":
+        if isinstance(e, cls):
+            return e
+        if isinstance(e, httpx.TimeoutException):
+            return cls("timeout", backend)
+        if isinstance(e, httpx.HTTPStatusError):
+            status = e.response.status_code
+            if status == 429:
+                return cls("rate_limited", backend, status, _retry_after(e.response))
+            if status >= 500:
+                return cls("server", backend, status)
+            return cls("client", backend, status)
+        if isinstance(e, httpx.TransportError):
+            return cls("network", backend, detail=str(e))
+        return cls("unknown", backend, detail=str(e))
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
@@ -0,0 +1,45 @@
+import logging
+import httpx
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def _http2_available() -> bool:
+    if not settings.AI_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("AI_HTTP2 is enabled but the h2 package is missing; using HTTP/1.1")
+        return False
+    return True
+
+
+def get_client(name: str, timeout: float) -> httpx.AsyncClient:
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=timeout,
+            http2=_http2_available(),
+            limits=httpx.Limits(
+                max_connections=settings.AI_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.AI_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=settings.AI_POOL_KEEPALIVE_EXPIRY,
+            ),
+        )
+        _clients[name] = client
+    return client
+
+
+async def close_clients():
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning("AI HTTP client close failed: %s", e)
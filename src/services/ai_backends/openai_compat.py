@@ -0,0 +1,178 @@
+import json
+import time
+import logging
+from typing import AsyncIterator
+
+from src.core.metrics import registry
+from src.services.ai_backends.base import BaseAIBackend
+from src.services.ai_backends.errors import AIBackendError
+from src.services.ai_backends.http_client import get_client
+from src.utils.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+BACKEND_LATENCY = registry.histogram(
+    "ai_backend_latency_seconds",
+    "Successful AI backend latency (mode=complete: full reply, mode=first_token: stream TTFT)",
+)
+
+INTERRUPTED_TEXT = "\n\n⚠️ Ответ прерван."
+
+
+class OpenAICompatibleBackend(BaseAIBackend):
+    name = "openai"
+    base_url = ""
+    model = ""
+    timeout = 30.0
+    extra_headers: dict = {}
+    extra_params: dict = {}
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self.client = get_client(self.name, timeout=self.timeout)
+
+    def _messages(self, system_prompt: str, context: str, user_message: str) -> list[dict]:
+        messages = [
+            {"role": "system", "content": system_prompt},
+        ]
+
+        if context:
+            messages.append(
+                {"role": "user", "content": f"Context:\n{context}"}
+            )
+            messages.append(
+                {"role": "assistant", "content": "Understood. I have the context."}
+            )
+
+        messages.append({"role": "user", "content": user_message})
+        return messages
+
+    def _request(self, messages: list[dict], max_tokens: int, stream: bool = False) -> dict:
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": 0.45,
+            **self.extra_params,
+        }
+        if stream:
+            payload["stream"] = True
+            # Without this, providers leave token counts out of the stream.
+            payload["stream_options"] = {"include_usage": True}
+        return {
+            "headers": {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+                **self.extra_headers,
+            },
+            "json": payload,
+        }
+
+    def _error(self, e: Exception) -> AIBackendError:
+        error = AIBackendError.from_exception(self.name, e)
+        logger.error(f"{self.name} API error: {error}")
+        return error
+
+    async def generate(
+        self,
+        system_prompt: str,
+        context: str,
+        user_message: str,
+        max_tokens: int = 1000,
+        usage: dict | None = None,
+    ) -> str:
+        messages = self._messages(system_prompt, context, user_message)
+        start_time = time.monotonic()
+
+        try:
+            response = await self.client.post(
+                self.base_url, **self._request(messages, max_tokens)
+            )
+            response.raise_for_status()
+            data = response.json()
+
+            elapsed = int((time.monotonic() - start_time) * 1000)
+            logger.info(f"{self.name} response in {elapsed}ms")
+            BACKEND_LATENCY.observe(elapsed / 1000, backend=self.name, mode="complete")
+
+            text = data["choices"][0]["message"]["content"].strip()
+            self._fill_usage(usage, data, messages, text)
+            return text
+
+        except Exception as e:
+            raise self._error(e) from e
+
+    async def generate_stream(
+        self,
+        system_prompt: str,
+        context: str,
+        user_message: str,
+        max_tokens: int = 1000,
+        usage: dict | None = None,
+    ) -> AsyncIterator[str]:
+        messages = self._messages(system_prompt, context, user_message)
+        start_time = time.monotonic()
+        first_token_ms = None
+        parts = []
+        last = {}
+
+        try:
+            async with self.client.stream(
+                "POST", self.base_url, **self._request(messages, max_tokens, stream=True)
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    event = json.loads(data)
+                    # Usage arrives on the final chunk (top level, or under x_groq for Groq).
+                    if event.get("usage") or (event.get("x_groq") or {}).get("usage"):
+                        last = event
+                    choices = event.get("choices") or []
+                    delta = (choices[0].get("delta") or {}).get("content") if choices else None
+                    if not delta:
+                        continue
+                    if first_token_ms is None:
+                        first_token_ms = int((time.monotonic() - start_time) * 1000)
+                        BACKEND_LATENCY.observe(
+                            first_token_ms / 1000, backend=self.name, mode="first_token"
+                        )
+                    parts.append(delta)
+                    yield delta
+
+        except Exception as e:
+            if first_token_ms is None:
+                raise self._error(e) from e
+            logger.error(f"{self.name} stream interrupted: {e}")
+            self._fill_usage(usage, last, messages, "".join(parts))
+            if usage is not None:
+                usage["status"] = "interrupted"
+            yield INTERRUPTED_TEXT
+            return
+
+        elapsed = int((time.monotonic() - start_time) * 1000)
+        logger.info(f"{self.name} stream: first token {first_token_ms}ms, total {elapsed}ms")
+        self._fill_usage(usage, last, messages, "".join(parts))
+
+    def _fill_usage(self, usage: dict | None, data: dict, messages: list[dict], text: str):
+        # Falls back to a local estimate when the provider omits the usage block.
+        if usage is None:
+            return
+        reported = data.get("usage") or (data.get("x_groq") or {}).get("usage") or {}
+        usage["model"] = data.get("model") or self.model
+        usage["prompt_tokens"] = reported.get("prompt_tokens") or sum(
+            count_tokens(m["content"]) for m in messages
+        )
+        usage["completion_tokens"] = reported.get("completion_tokens") or count_tokens(text)
+
+    async def generate_summary(self, text: str, usage: dict | None = None) -> str:
+        return await self.generate(
+            system_prompt="You are a concise summarizer. Respond in Russian. Use bullet points.",
+            context="",
+            user_message=f"Summarize this in 3-5 bullet points:\n{text}",
+            max_tokens=300,
+            usage=usage,
+        )
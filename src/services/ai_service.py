@@ -1,20 +1,35 @@
+import asyncio
+import json
 import time
 import logging
 from datetime import datetime, date
+from typing import AsyncIterator
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.config import settings
+from src.core.metrics import registry
+from src.core.response_cache import normalize_message, response_cache
 from src.services.ai_backends.base import BaseAIBackend
+from src.services.ai_backends.circuit import get_breaker
+from src.services.ai_backends.dispatch import BATCH, INTERACTIVE, ai_dispatcher
+from src.services.ai_backends.errors import AIBackendError
 from src.services.ai_backends.groq_backend import GroqBackend
+from src.services.ai_backends.openai_compat import BACKEND_LATENCY, INTERRUPTED_TEXT
 from src.services.ai_backends.openrouter_backend import OpenRouterBackend
+from src.services.intent_service import intent_matcher
 from src.services.memory_service import MemoryService
+from src.repositories.ai_call_repo import AICallRepository
+from src.repositories.daily_brief_repo import DailyBriefRepository
 from src.repositories.memory_repo import MemoryRepository
 from src.repositories.user_repo import UserRepository
-from src.repositories.task_repo import TaskRepository
-from src.repositories.habit_repo import HabitRepository
+from src.utils.datetime_utils import get_zoneinfo, to_local
 
 logger = logging.getLogger(__name__)
 
+HEDGES = registry.counter("ai_hedged_requests_total", "Fallback requests started, by reason")
+HEDGE_WINS = registry.counter("ai_hedge_winner_total", "Backend whose reply was used, by role")
+BRIEF_READS = registry.counter("daily_brief_reads_total", "Today-plan reads, by whether the brief was current")
+
 PERSONALITY_PROMPTS = {
     "strict": (
         "You are a strict, no-nonsense programming mentor. "
@@ -51,16 +66,47 @@ PERSONALITY_PROMPTS = {
 }
 
 
+class _SlotStream:
+    # Holds a dispatch slot until the wrapped stream is exhausted or closed. A class
+    # rather than an async generator, so closing it before the first read still releases.
+    def __init__(self, stream: AsyncIterator[str], release, finish=None):
+        self.stream = stream
+        self.release = release
+        self.finish = finish
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        try:
+            return await anext(self.stream)
+        except StopAsyncIteration:
+            await self.aclose("ok")
+            raise
+        except BaseException:
+            await self.aclose()
+            raise
+
+    async def aclose(self, status: str = "cancelled"):
+        self.release()
+        if self.finish:
+            finish, self.finish = self.finish, None
+            finish(status)
+        await self.stream.aclose()
+
+
 class AIService:
     def __init__(self, session: AsyncSession):
         self.session = session
         self.memory_service = MemoryService(session)
         self.memory_repo = MemoryRepository(session)
         self.user_repo = UserRepository(session)
-        self.task_repo = TaskRepository(session)
-        self.habit_repo = HabitRepository(session)
+        self.brief_repo = DailyBriefRepository(session)
+        self.call_repo = AICallRepository(session)
         self.primary_backend = self._create_backend(settings.AI_BACKEND)
         self.fallback_backend = self._create_fallback()
+        self.last_response_time_ms = 0
+        self.last_usage: dict = {}
 
     def _create_backend(self, backend_name: str) -> BaseAIBackend:
         if backend_name == "groq":
@@ -83,28 +129,123 @@ class AIService:
         if self._looks_like_today_plan(message):
             response = await self.generate_today_plan(user_id, user=user)
         else:
-            settings_data = user.get_settings()
-            ai_perms = settings_data.get("ai_permissions", {})
-            include_context = (
-                ai_perms.get("read_tasks", True)
-                or ai_perms.get("read_habits", True)
-                or ai_perms.get("read_journal", True)
-            )
-            context = await self.memory_service.build_context(user_id) if include_context else ""
-            system_prompt = self._build_system_prompt(user)
-            response = await self._call_with_fallback(system_prompt, context, message)
+            try:
+                # Context is built inside the turn so a queued message sees the previous reply.
+                async with ai_dispatcher.user_turn(user.id):
+                    system_prompt, context, basis = await self._prepare_chat(user, message)
+                    key = self._cache_key("chat", system_prompt, basis, normalize_message(message))
+                    response = response_cache.get(key, kind="chat")
+                    if response is None:
+                        response = await self._call_with_fallback(system_prompt, context, message, user.id)
+                        response_cache.put(key, user.id, response, time.monotonic() - start)
+            except AIBackendError as e:
+                response = e.user_message
 
         elapsed_ms = int((time.monotonic() - start) * 1000)
+        await self._record_interaction(user, message, response, elapsed_ms)
+        return response, elapsed_ms
+
+    async def stream_response(self, user_id: int, message: str) -> AsyncIterator[str]:
+        start = time.monotonic()
+
+        user = await self.user_repo.get_by_id(user_id)
+        parts = []
+        if self._looks_like_today_plan(message):
+            response = await self.generate_today_plan(user_id, user=user)
+            parts.append(response)
+            yield response
+        else:
+            try:
+                async with ai_dispatcher.user_turn(user.id):
+                    system_prompt, context, basis = await self._prepare_chat(user, message)
+                    key = self._cache_key("chat", system_prompt, basis, normalize_message(message))
+                    cached = response_cache.get(key, kind="chat")
+                    if cached is not None:
+                        parts.append(cached)
+                        yield cached
+                    else:
+                        async for chunk in self._stream_with_fallback(system_prompt, context, message, user.id):
+                            parts.append(chunk)
+                            yield chunk
+                        response = "".join(parts).strip()
+                        if not response.endswith(INTERRUPTED_TEXT.strip()):
+                            response_cache.put(key, user.id, response, time.monotonic() - start)
+            except AIBackendError as e:
+                parts.append(e.user_message)
+                yield e.user_message
+
+        self.last_response_time_ms = int((time.monotonic() - start) * 1000)
+        await self._record_interaction(
+            user, message, "".join(parts).strip(), self.last_response_time_ms
+        )
+
+    async def _prepare_chat(self, user, message: str) -> tuple[str, str, str]:
+        # Returns (system prompt, context, cache basis); see MemoryService.context_basis.
+        settings_data = user.get_settings()
+        ai_perms = settings_data.get("ai_permissions", {})
+        include_context = (
+            ai_perms.get("read_tasks", True)
+            or ai_perms.get("read_habits", True)
+            or ai_perms.get("read_journal", True)
+        )
+        context = basis = ""
+        if include_context:
+            context = await self.memory_service.build_context(
+                user.id,
+                user=user,
+                query=message,
+                include_journal=ai_perms.get("read_journal", True),
+            )
+            basis = self.memory_service.context_basis
+        return self._build_system_prompt(user), context, basis
 
+    async def _record_interaction(self, user, message: str, response: str, elapsed_ms: int):
+        # Cache hits and canned replies leave last_usage empty: no tokens were spent.
         await self.memory_repo.create_interaction(
-            user_id=user_id,
+            user_id=user.id,
             user_message=message[:2000],
             ai_response=response[:2000],
             ai_mode=user.ai_mode,
             response_time_ms=elapsed_ms,
+            token_count_prompt=self.last_usage.get("prompt_tokens"),
+            token_count_response=self.last_usage.get("completion_tokens"),
         )
 
-        return response, elapsed_ms
+    def _cache_key(self, kind: str, system_prompt: str, context: str, message: str) -> str:
+        model = getattr(self.primary_backend, "model", "") or self.primary_backend.name
+        return response_cache.key(kind, model, system_prompt, context, message)
+
+    async def _cached_generate(
+        self,
+        kind: str,
+        user_id: int | None,
+        system_prompt: str,
+        message: str,
+        max_tokens: int,
+        priority: int,
+        shared: bool = False,
+    ) -> str:
+        key = self._cache_key(kind, system_prompt, "", message)
+        response = response_cache.get(key, kind=kind)
+        if response is not None:
+            return response
+        start = time.monotonic()
+        response = await self._hedged(
+            lambda backend, usage: backend.generate(
+                system_prompt=system_prompt,
+                context="",
+                user_message=message,
+                max_tokens=max_tokens,
+                usage=usage,
+            ),
+            mode="complete",
+            priority=priority,
+            kind=kind,
+            user_id=user_id,
+        )
+        # Shared entries have no owner, so one user's invalidation doesn't drop them.
+        response_cache.put(key, None if shared else user_id, response, time.monotonic() - start)
+        return response
 
     def _build_system_prompt(self, user) -> str:
         settings_data = user.get_settings()
@@ -120,63 +261,57 @@ class AIService:
         )
 
     def _looks_like_today_plan(self, message: str) -> bool:
-        text = (message or "").lower()
-        checks = (
-            "что на сегодня",
-            "план на сегодня",
-            "что делать сегодня",
-            "today",
-            "с чего начать",
-            "распланируй день",
-        )
-        return any(k in text for k in checks)
+        found = intent_matcher.match(message)
+        return found is not None and found.name == "today_plan"
 
     async def generate_today_plan(self, user_id: int, user=None) -> str:
         user = user or await self.user_repo.get_by_id(user_id)
-        now = datetime.now()
-        tasks = await self.task_repo.get_user_tasks(user_id, limit=100)
-        habits = await self.habit_repo.get_active_habits(user_id)
+        now = to_local(datetime.utcnow(), get_zoneinfo(user.timezone))
+        today = now.date()
+        # Normally built by the morning job and patched on every task/habit change;
+        # a missing or stale brief is built here instead.
+        brief = await self.brief_repo.get(user.id)
+        if brief is None or brief.brief_date != today:
+            BRIEF_READS.inc(result="built")
+            brief = (await self.brief_repo.build([(user.id, user.timezone)]))[user.id]
+        else:
+            BRIEF_READS.inc(result="hit")
+        plan = json.loads(brief.payload)
 
-        active_tasks = [t for t in tasks if t.status in ("todo", "in_progress")]
-        done_today = [
-            t for t in tasks
-            if t.status == "done" and t.completed_at and t.completed_at.date() == date.today()
-        ]
+        def deadline(task) -> date | None:
+            return date.fromisoformat(task["deadline"]) if task["deadline"] else None
 
         def score(task):
-            p = {"critical": 4, "high": 3, "medium": 2, "low": 1}.get(task.priority, 2)
-            overdue = 2 if task.deadline and task.deadline < date.today() else 0
-            today_deadline = 1 if task.deadline == date.today() else 0
+            p = {"critical": 4, "high": 3, "medium": 2, "low": 1}.get(task["priority"], 2)
+            overdue = 2 if deadline(task) and deadline(task) < today else 0
+            today_deadline = 1 if deadline(task) == today else 0
             return p + overdue + today_deadline
 
-        sorted_tasks = sorted(active_tasks, key=score, reverse=True)[:8]
+        sorted_tasks = sorted(plan["tasks"], key=score, reverse=True)[:8]
         est_map = {"critical": 90, "high": 60, "medium": 40, "low": 25}
 
         if sorted_tasks:
             task_lines = []
             for idx, t in enumerate(sorted_tasks, start=1):
                 dl = ""
-                if t.deadline:
-                    if t.deadline < date.today():
+                due = deadline(t)
+                if due:
+                    if due < today:
                         dl = " (просрочено)"
-                    elif t.deadline == date.today():
+                    elif due == today:
                         dl = " (сегодня)"
                     else:
-                        dl = f" (до {t.deadline})"
-                est = est_map.get(t.priority, 35)
-                task_lines.append(f"{idx}. {t.title}{dl} ~{est}м")
+                        dl = f" (до {due})"
+                est = est_map.get(t["priority"], 35)
+                task_lines.append(f"{idx}. {t['title']}{dl} ~{est}м")
             tasks_block = "\n".join(task_lines)
         else:
             tasks_block = "1. Закрытых задач нет, начни с самой важной учебной цели."
 
-        habits_due = []
-        weekday_bit = 1 << date.today().weekday()
-        for h in habits:
-            if h.schedule_mask & weekday_bit:
-                habits_due.append(f"• {h.emoji} {h.name} (🔥{h.current_streak})")
+        habits_due = [f"• {h['emoji']} {h['name']} (🔥{h['streak']})" for h in plan["habits"]]
         habits_block = "\n".join(habits_due[:8]) if habits_due else "• Сегодня по расписанию нет обязательных привычек."
 
-        done_block = "\n".join(f"• ✅ {t.title}" for t in done_today[:6]) if done_today else "• Пока ничего не отмечено."
+        done_block = "\n".join(f"• ✅ {t['title']}" for t in plan["done"][:6]) if plan["done"] else "• Пока ничего не отмечено."
         mentor_name = user.get_settings().get("mentor_name", "Ментор")
         return (
             f"🤖 {mentor_name}, план на сегодня ({now.strftime('%H:%M')})\n\n"
@@ -189,41 +324,214 @@ class AIService:
         )
 
     async def _call_with_fallback(
-        self, system_prompt: str, context: str, message: str
+        self, system_prompt: str, context: str, message: str, user_id: int | None = None
     ) -> str:
-        response = await self.primary_backend.generate(
-            system_prompt=system_prompt,
-            context=context,
-            user_message=message,
-            max_tokens=650,
-        )
+        async def call(backend: BaseAIBackend, usage: dict) -> str:
+            return await backend.generate(
+                system_prompt=system_prompt,
+                context=context,
+                user_message=message,
+                max_tokens=650,
+                usage=usage,
+            )
 
-        if response.startswith("⚠️") and self.fallback_backend:
-            logger.info("Primary AI failed, trying fallback")
-            response = await self.fallback_backend.generate(
+        return await self._hedged(call, mode="complete", kind="chat", user_id=user_id)
+
+    async def _stream_with_fallback(
+        self, system_prompt: str, context: str, message: str, user_id: int | None = None
+    ) -> AsyncIterator[str]:
+        async def call(backend: BaseAIBackend, usage: dict) -> tuple[str, AsyncIterator[str]]:
+            stream = backend.generate_stream(
                 system_prompt=system_prompt,
                 context=context,
                 user_message=message,
                 max_tokens=650,
+                usage=usage,
             )
+            try:
+                return await anext(stream, ""), stream
+            except asyncio.CancelledError:
+                await stream.aclose()
+                raise
 
-        return response
+        async def discard(result: tuple[str, AsyncIterator[str]]):
+            await result[1].aclose()
 
-    async def generate_summary(self, text: str) -> str:
-        return await self.primary_backend.generate_summary(text)
+        # Hedging for streams races on the first token only; the winner is then drained.
+        first, stream = await self._hedged(
+            call, mode="first_token", discard=discard, kind="chat_stream", user_id=user_id
+        )
+        try:
+            if first:
+                yield first
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+
+    def _hedge_delay(self, mode: str) -> float | None:
+        if not settings.AI_HEDGING or not self.fallback_backend:
+            return None
+        labels = {"backend": self.primary_backend.name, "mode": mode}
+        if BACKEND_LATENCY.recent_count(**labels) < settings.AI_HEDGE_MIN_SAMPLES:
+            return settings.AI_HEDGE_DEFAULT_DELAY
+        p95 = BACKEND_LATENCY.quantile(0.95, **labels)
+        return min(max(p95, settings.AI_HEDGE_MIN_DELAY), settings.AI_HEDGE_MAX_DELAY)
 
-    async def rewrite_journal_entry(self, text: str) -> str:
+    async def _guarded(
+        self, backend: BaseAIBackend, call, usage: dict, mode: str, priority: int, log
+    ):
+        breaker = get_breaker(backend.name)
+        try:
+            release = await ai_dispatcher.acquire(priority)
+        except BaseException:
+            breaker.release()
+            raise
+        # Latency is measured from slot acquisition so queueing doesn't count against a backend.
+        start = time.monotonic()
+        try:
+            result = await call(backend, usage)
+        except asyncio.CancelledError:
+            release()
+            breaker.release()
+            log(backend, usage, "cancelled", start)
+            raise
+        except Exception as e:
+            release()
+            error = AIBackendError.from_exception(backend.name, e)
+            breaker.record_failure(error)
+            if error.kind == "rate_limited":
+                ai_dispatcher.on_rate_limited(error.retry_after)
+            log(backend, usage, error.kind, start)
+            raise error from e
+        breaker.record_success()
+        ai_dispatcher.on_success()
+        if mode == "first_token":
+            # A stream keeps its dispatch slot until it is drained or closed.
+            first, stream = result
+            first_token = time.monotonic()
+            return first, _SlotStream(
+                stream,
+                release,
+                lambda status: log(backend, usage, usage.get("status", status), start, first_token),
+            )
+        release()
+        log(backend, usage, "ok", start)
+        return result
+
+    async def _hedged(
+        self,
+        call,
+        mode: str,
+        discard=None,
+        priority: int = INTERACTIVE,
+        kind: str = "chat",
+        user_id: int | None = None,
+    ):
+        # Backends whose circuit is open are skipped; the next one takes their place.
+        queue = [b for b in (self.primary_backend, self.fallback_backend) if b]
+        roles = {}
+        usages = {}
+        pending = set()
+        error = None
+        self.last_usage = {}
+
+        def log(backend, usage, status, started, first_token=None):
+            now = time.monotonic()
+            self.call_repo.log_call(
+                user_id=user_id,
+                kind=kind,
+                backend=backend.name,
+                model=usage.get("model") or getattr(backend, "model", "") or backend.name,
+                status=status,
+                fallback=backend is not self.primary_backend,
+                prompt_tokens=usage.get("prompt_tokens"),
+                completion_tokens=usage.get("completion_tokens"),
+                latency_ms=int((now - started) * 1000),
+                first_token_ms=int((first_token - started) * 1000) if first_token else None,
+            )
+
+        def start(reason: str | None = None) -> bool:
+            while queue:
+                backend = queue.pop(0)
+                if not get_breaker(backend.name).allow():
+                    logger.info("AI backend %s circuit is open, skipping", backend.name)
+                    continue
+                if reason:
+                    HEDGES.inc(reason=reason)
+                usage = {}
+                task = asyncio.create_task(self._guarded(backend, call, usage, mode, priority, log))
+                roles[task] = "primary" if backend is self.primary_backend else "fallback"
+                usages[task] = usage
+                pending.add(task)
+                return True
+            return False
+
+        start()
+        # Batch work never hedges: it would double the provider load for no user benefit.
+        delay = self._hedge_delay(mode) if priority == INTERACTIVE else None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=delay if queue else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    logger.info("Primary AI slower than %.2fs, hedging with fallback", delay)
+                    start("slow")
+                    continue
+
+                winner = None
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    if winner is None:
+                        winner = task.result()
+                        # For streams this dict is filled in once the stream is drained.
+                        self.last_usage = usages[task]
+                        HEDGE_WINS.inc(backend=roles[task])
+                    elif discard:
+                        await discard(task.result())
+                if winner is not None:
+                    return winner
+
+                if not pending and queue:
+                    logger.info("AI backend failed (%s), trying fallback", error)
+                    start("error")
+            raise error or AIBackendError("circuit_open", self.primary_backend.name)
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def generate_summary(self, text: str, user_id: int | None = None) -> str:
+        return await self._hedged(
+            lambda backend, usage: backend.generate_summary(text, usage=usage),
+            mode="complete",
+            priority=BATCH,
+            kind="summary",
+            user_id=user_id,
+        )
+
+    async def rewrite_journal_entry(self, text: str, user_id: int | None = None) -> str:
         prompt = (
             "Исправь орфографию и пунктуацию, сделай текст более читаемым, "
             "добавь аккуратные эмодзи по смыслу. "
             "Сохрани исходный смысл и краткость.\n\n"
             f"Текст:\n{text}"
         )
-        return await self.primary_backend.generate(
-            system_prompt="You are a Russian writing assistant. Keep markdown-safe formatting.",
-            context="",
-            user_message=prompt,
+        # Rewrites depend only on the text, so they are shared across users.
+        return await self._cached_generate(
+            "journal_rewrite",
+            user_id,
+            "You are a Russian writing assistant. Keep markdown-safe formatting.",
+            prompt,
             max_tokens=550,
+            priority=INTERACTIVE,
+            shared=True,
         )
 
     async def generate_weekly_review(self, user_id: int, metrics: dict) -> str:
@@ -241,9 +549,14 @@ class AIService:
             f"and one specific actionable recommendation for next week."
         )
 
-        return await self.primary_backend.generate(
-            system_prompt="You are a data-driven programming mentor analyzing weekly metrics. Respond in Russian.",
-            context="",
-            user_message=prompt,
-            max_tokens=320,
-        )
+        try:
+            return await self._cached_generate(
+                "weekly_review",
+                user_id,
+                "You are a data-driven programming mentor analyzing weekly metrics. Respond in Russian.",
+                prompt,
+                max_tokens=320,
+                priority=BATCH,
+            )
+        except AIBackendError as e:
+            return e.user_message
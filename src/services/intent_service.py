@@ -0,0 +1,187 @@
+import re
+from datetime import date
+from typing import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.metrics import registry
+from src.repositories.habit_repo import HabitRepository
+from src.repositories.task_repo import TaskRepository
+from src.services.gamification_service import GamificationService
+from src.services.habit_service import HabitService
+from src.services.task_service import TaskService
+from src.utils.intents import Intent, IntentMatch, IntentMatcher
+from src.utils.stemming import terms
+
+MATCHES = registry.counter("ai_intent_matches_total", "Chat messages answered without the LLM, by intent")
+
+TIME_SLOT = re.compile(r"\b(?P<time>(?:[01]\d|2[0-3]):[0-5]\d)\b")
+PRIORITY_ICONS = {"low": "🟢", "medium": "🟡", "high": "🟠", "critical": "🔴"}
+
+INTENTS = [
+    Intent(
+        "add_task",
+        ("добавь задачу", "добавить задачу", "создай задачу", "новая задача"),
+        anchored=True,
+        max_extra=None,
+        slot=TIME_SLOT,
+    ),
+    Intent(
+        "complete_task",
+        ("выполнил задачу", "сделал задачу", "закрой задачу", "отметь задачу"),
+        anchored=True,
+        max_extra=None,
+    ),
+    Intent(
+        "check_habit",
+        ("отметь привычку", "выполнил привычку", "сделал привычку"),
+        anchored=True,
+        max_extra=None,
+    ),
+    Intent("overdue_tasks", ("просроченные задачи", "какие задачи просрочены", "что просрочено", "есть просрочка")),
+    Intent("list_tasks", ("покажи задачи", "мои задачи", "список задач", "какие задачи", "какие у меня задачи")),
+    Intent(
+        "list_habits",
+        ("покажи привычки", "мои привычки", "список привычек", "какие привычки", "какие у меня привычки"),
+    ),
+    Intent(
+        "xp_status",
+        ("сколько xp", "сколько опыта", "сколько у меня xp", "мой уровень", "какой уровень", "мой прогресс"),
+    ),
+    # Left to AIService.get_response / stream_response, which render it with
+    # generate_today_plan and record the exchange.
+    Intent(
+        "today_plan",
+        ("что на сегодня", "план на сегодня", "что делать сегодня", "today", "с чего начать", "распланируй день"),
+        max_extra=None,
+    ),
+]
+
+intent_matcher = IntentMatcher(INTENTS)
+
+
+def _best_match(query: str, items: list, name: Callable) -> object | None:
+    # The item sharing the most stemmed words with the query; ties go to the first one.
+    wanted = set(terms(query))
+    if not wanted:
+        return None
+    score, item = max(
+        ((len(wanted & set(terms(name(item)))), item) for item in items),
+        key=lambda scored: scored[0],
+        default=(0, None),
+    )
+    return item if score else None
+
+
+def _deadline(task) -> str:
+    return f" (до {task.deadline.strftime('%d.%m')})" if task.deadline else ""
+
+
+class IntentService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.task_repo = TaskRepository(session)
+        self.habit_repo = HabitRepository(session)
+
+    async def respond(self, user, text: str) -> str | None:
+        # A deterministic reply for routine requests; None hands the message to the LLM.
+        found = intent_matcher.match(text)
+        reply = None
+        if found is not None and found.name != "today_plan":
+            perms = user.get_settings().get("ai_permissions", {})
+            reply = await getattr(self, f"_{found.name}")(user, found, perms)
+        MATCHES.inc(intent=found.name if reply is not None else "none")
+        return reply
+
+    async def _add_task(self, user, found: IntentMatch, perms: dict) -> str | None:
+        if not perms.get("create_tasks", True):
+            return None
+        remind_time = found.groups.get("time")
+        title = TIME_SLOT.sub("", found.rest).strip()
+        if not title:
+            return "Формат: `добавь задачу <название> [HH:MM]`"
+        task = await TaskService(self.session).create_task(
+            user_id=user.id,
+            title=title,
+            remind_enabled=bool(remind_time),
+            remind_time=remind_time,
+            remind_text=f"🔔 Пора выполнять: {title}",
+        )
+        reply = f"✅ Задача создана: *{task['title']}*"
+        return reply + (f"\n🔔 Напомню в {remind_time}" if remind_time else "")
+
+    async def _complete_task(self, user, found: IntentMatch, perms: dict) -> str | None:
+        if not perms.get("modify_tasks", True):
+            return None
+        if not found.rest:
+            return "Формат: `выполнил задачу <название>`"
+        tasks = await self.task_repo.get_active_tasks(user.id, limit=50)
+        task = _best_match(found.rest, tasks, lambda t: t.title)
+        if task is None:
+            return "Не нашёл такую активную задачу. Проверь название в разделе 📋 Задачи."
+        result = await TaskService(self.session).complete_task(user.id, task.id)
+        if "error" in result:
+            return f"⚠️ {result['error']}"
+        reply = f"✅ Выполнено: *{result['title']}* (+{result['xp_earned']} XP)"
+        if result["leveled_up"]:
+            reply += f"\n🎉 Новый уровень: {result['new_level']}!"
+        return reply
+
+    async def _check_habit(self, user, found: IntentMatch, perms: dict) -> str | None:
+        if not perms.get("read_habits", True):
+            return None
+        if not found.rest:
+            return "Формат: `отметь привычку <название>`"
+        habits = await self.habit_repo.get_active_habits(user.id)
+        habit = _best_match(found.rest, habits, lambda h: h.name)
+        if habit is None:
+            return "Не нашёл такую привычку. Проверь название в разделе 🔄 Привычки."
+        result = await HabitService(self.session).log_completion(user.id, habit.id)
+        if "error" in result:
+            return f"⚠️ {result['error']}"
+        if result.get("already_logged"):
+            return f"{habit.emoji} {habit.name} уже отмечена сегодня. 🔥 Серия: {result['streak']} дн."
+        reply = f"✅ {habit.emoji} {habit.name} отмечена! 🔥 Серия: {result['streak']} дн. (+{result['xp_earned']} XP)"
+        if result["streak_milestone"]:
+            reply += f"\n🏆 {result['streak_milestone']} дней подряд!"
+        return reply
+
+    async def _overdue_tasks(self, user, found: IntentMatch, perms: dict) -> str | None:
+        if not perms.get("read_tasks", True):
+            return None
+        tasks = await self.task_repo.get_overdue_tasks(user.id)
+        if not tasks:
+            return "👌 Просроченных задач нет."
+        lines = [f"• {PRIORITY_ICONS.get(t.priority, '🟡')} {t.title}{_deadline(t)}" for t in tasks]
+        return "🔴 *Просроченные задачи:*\n" + "\n".join(lines)
+
+    async def _list_tasks(self, user, found: IntentMatch, perms: dict) -> str | None:
+        if not perms.get("read_tasks", True):
+            return None
+        tasks = await self.task_repo.get_active_tasks(user.id, limit=10)
+        if not tasks:
+            return "Активных задач нет. Напиши `добавь задачу <название>`."
+        lines = [
+            f"{i}. {PRIORITY_ICONS.get(t.priority, '🟡')} {t.title}{_deadline(t)}"
+            for i, t in enumerate(tasks, start=1)
+        ]
+        return "📋 *Активные задачи:*\n" + "\n".join(lines)
+
+    async def _list_habits(self, user, found: IntentMatch, perms: dict) -> str | None:
+        if not perms.get("read_habits", True):
+            return None
+        habits = await self.habit_repo.get_active_habits(user.id)
+        if not habits:
+            return "Привычек пока нет. Добавь первую в разделе 🔄 Привычки."
+        done = await self.habit_repo.get_logged_habit_ids(user.id, date.today())
+        lines = [
+            f"{'✅' if h.id in done else '⬜'} {h.emoji} {h.name} — 🔥 {h.current_streak} дн."
+            for h in habits
+        ]
+        return "🔄 *Привычки на сегодня:*\n" + "\n".join(lines)
+
+    async def _xp_status(self, user, found: IntentMatch, perms: dict) -> str:
+        return (
+            f"{GamificationService.format_level_progress(user.total_xp_earned)}\n"
+            f"🎯 Дисциплина: {user.discipline_score:.0f}/100"
+        )
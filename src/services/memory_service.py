@@ -1,44 +1,206 @@
+import asyncio
 import json
 import logging
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config import settings
+from src.core.context_cache import context_cache
+from src.core.invalidation import Change, on_commit
+from src.core.retrieval_index import interaction_text, journal_text, retrieval_index
+from src.models.ai_memory import AIInteraction, AIMemorySummary
+from src.models.habit import Habit
+from src.models.task import Task
+from src.models.user import User
 from src.repositories.memory_repo import MemoryRepository
-from src.repositories.task_repo import TaskRepository
-from src.repositories.habit_repo import HabitRepository
 from src.repositories.user_repo import UserRepository
+from src.repositories.snapshot_repo import MentorSnapshot, SnapshotRepository
+from src.utils.tokens import count_tokens, truncate_tokens
+from src.services.ai_backends.errors import AIBackendError
 
 logger = logging.getLogger(__name__)
 
+CONTEXT_MAX_TOKENS = 900
+SESSION_TURNS = 3
+CONTEXT_BLOCKS = ("profile_summary", "tasks", "habits", "weekly_summary", "session")
+
+
+def _interaction_item(inter: AIInteraction) -> str:
+    return (
+        f"User: {truncate_tokens(inter.user_message, 60)}\n"
+        f"AI: {truncate_tokens(inter.ai_response, 90)}"
+    )
+
+
+@on_commit
+def _refresh_context_cache(changes: list[Change]):
+    for state, obj, user_id in changes:
+        if isinstance(obj, Task):
+            context_cache.drop(user_id, "tasks")
+        elif isinstance(obj, Habit):
+            context_cache.drop(user_id, "habits")
+        elif isinstance(obj, AIMemorySummary):
+            context_cache.drop(user_id, "profile_summary", "weekly_summary")
+        elif isinstance(obj, AIInteraction) and state == "new":
+            # A new exchange just slides the conversation window; no need to reload it.
+            context_cache.patch(
+                user_id,
+                "session",
+                lambda items, item=_interaction_item(obj): (items + [item])[-SESSION_TURNS:],
+            )
+        elif isinstance(obj, AIInteraction):
+            context_cache.drop(user_id, "session")
+        elif isinstance(obj, User) and state == "deleted":
+            context_cache.drop(user_id)
+
+
+class ContextBlock:
+    def __init__(self, title: str, items: list[str], priority: int, budget: int, keep: str = "head"):
+        self.title = title
+        self.items = items
+        self.priority = priority
+        self.budget = budget
+        self.keep = keep
+        self.picked: dict[int, str] = {}
+        self.used = 0
+
+    def fill(self, available: int, capped: bool = True) -> int:
+        # Items are taken in value order until the budget runs out; returns tokens spent.
+        limit = min(available, self.budget - self.used) if capped else available
+        spent = 0
+        if not self.picked:
+            header = count_tokens(f"=== {self.title} ===") + 2
+            if header >= limit:
+                return 0
+            spent = header
+        order = range(len(self.items))
+        for index in (reversed(order) if self.keep == "tail" else order):
+            if index in self.picked:
+                continue
+            text = self.items[index]
+            cost = count_tokens(text) + 1
+            if spent + cost > limit:
+                if self.picked:
+                    break
+                # Never leave a block empty because its single most valuable item is long.
+                text = truncate_tokens(text, limit - spent - 1)
+                if not text:
+                    return 0
+                cost = count_tokens(text) + 1
+            self.picked[index] = text
+            spent += cost
+        self.used += spent
+        return spent
+
+    def render(self) -> str:
+        lines = [self.picked[i] for i in sorted(self.picked)]
+        return f"=== {self.title} ===\n" + "\n".join(lines)
+
 
 class MemoryService:
     def __init__(self, session: AsyncSession):
         self.session = session
         self.memory_repo = MemoryRepository(session)
-        self.task_repo = TaskRepository(session)
-        self.habit_repo = HabitRepository(session)
         self.user_repo = UserRepository(session)
+        self.snapshot_repo = SnapshotRepository(session)
+        self.context_basis = ""
 
-    async def build_context(self, user_id: int) -> str:
-        profile_block = await self._build_profile_block(user_id)
-        weekly_block = await self._build_weekly_block(user_id)
-        session_block = await self._build_session_block(user_id)
+    async def build_context(
+        self,
+        user_id: int,
+        max_tokens: int = CONTEXT_MAX_TOKENS,
+        user=None,
+        query: str | None = None,
+        include_journal: bool = True,
+    ) -> str:
+        # Blocks come from the per-user cache; commits that touch their rows evict them.
+        # Misses are refilled together from a single snapshot query.
+        version = context_cache.version(user_id)
+        user = user or await self.user_repo.get_by_id(user_id)
+        cached = {name: context_cache.get(user_id, name) for name in CONTEXT_BLOCKS}
+        if any(items is None for items in cached.values()):
+            snapshot = await self.snapshot_repo.get_mentor_snapshot(
+                user_id, task_limit=0, active_limit=5, interaction_limit=SESSION_TURNS
+            )
+            for name, items in self._snapshot_items(snapshot).items():
+                if cached[name] is None:
+                    cached[name] = items
+                    context_cache.put(user_id, name, items, version)
 
-        context = (
-            f"=== USER PROFILE ===\n{profile_block}\n\n"
-            f"=== CURRENT WEEK ===\n{weekly_block}\n\n"
-            f"=== RECENT CONVERSATION ===\n{session_block}"
+        blocks = [
+            ContextBlock("USER PROFILE", cached["profile_summary"] or self._profile_items(user), priority=0, budget=180),
+            ContextBlock("ACTIVE TASKS", cached["tasks"] or ["No active tasks"], priority=2, budget=200),
+            ContextBlock("HABITS", cached["habits"] or ["No habits tracked"], priority=4, budget=140),
+            ContextBlock("LAST WEEK SUMMARY", cached["weekly_summary"] or ["No weekly summary yet"], priority=5, budget=180),
+            # The newest exchange is worth the most, so the block is filled from the tail.
+            ContextBlock(
+                "RECENT CONVERSATION",
+                cached["session"] or ["No previous messages in this session."],
+                priority=1,
+                budget=320,
+                keep="tail",
+            ),
+        ]
+        # Response cache keys use this instead of the packed context: the conversation and
+        # recall blocks change every turn, the XP line after every bot exchange. Keyed per
+        # user because a reply may quote that user's own conversation.
+        self.context_basis = f"{user_id}\n" + "\n".join(
+            "\x1f".join(items)
+            for items in (
+                cached["profile_summary"] or self._profile_items(user, progress=False),
+                cached["tasks"],
+                cached["habits"],
+                cached["weekly_summary"],
+            )
         )
+        if query and settings.AI_RETRIEVAL:
+            recalled = await self._recall(user_id, query, include_journal)
+            if recalled:
+                # Best match first, so the packer keeps the most relevant snippets.
+                blocks.append(ContextBlock("RELEVANT MEMORY", recalled, priority=3, budget=220))
+        return self._pack_context(blocks, max_tokens)
 
-        return self._truncate_context(context, max_tokens=900)
+    async def _recall(self, user_id: int, query: str, include_journal: bool) -> list[str]:
+        index = retrieval_index.get(user_id)
+        if index is None:
+            version = retrieval_index.version(user_id)
+            rows = await self.memory_repo.get_search_documents(user_id, settings.AI_RETRIEVAL_MAX_DOCUMENTS)
+            documents = [
+                ((kind, doc_id), journal_text(first, second) if kind == "journal" else interaction_text(first, second))
+                for kind, doc_id, first, second in rows
+            ]
+            index = retrieval_index.build(user_id, documents, version)
 
-    async def _build_profile_block(self, user_id: int) -> str:
-        user = await self.user_repo.get_by_id(user_id)
+        # The newest exchanges are already in RECENT CONVERSATION.
+        chats = sorted(doc_id for kind, doc_id in index.docs if kind == "chat")
+        exclude = {("chat", doc_id) for doc_id in chats[-SESSION_TURNS:]}
+        if not include_journal:
+            exclude |= {key for key in index.docs if key[0] == "journal"}
+        hits = index.search(query, k=settings.AI_RETRIEVAL_TOP_K, exclude=exclude)
+        return [
+            f"- {'Journal' if kind == 'journal' else 'Earlier chat'}: {truncate_tokens(text, 80)}"
+            for _, (kind, _), text in hits
+        ]
 
-        summary = await self.memory_repo.get_active_summary(user_id, "profile_summary")
-        if summary:
-            return summary.content
+    def _snapshot_items(self, snapshot: MentorSnapshot) -> dict[str, list[str]]:
+        profile_summary = snapshot.summaries.get("profile_summary")
+        weekly_summary = snapshot.summaries.get("weekly_summary")
+        return {
+            "profile_summary": [profile_summary.content] if profile_summary else [],
+            "tasks": [
+                f"- [{t.priority}] {t.title}"
+                + (f" (due: {t.deadline})" if t.deadline else "")
+                for t in snapshot.active_tasks
+            ],
+            "habits": [
+                f"- {h.emoji} {h.name}: streak {h.current_streak}d"
+                for h in snapshot.habits
+            ],
+            "weekly_summary": [weekly_summary.content] if weekly_summary else [],
+            "session": [_interaction_item(inter) for inter in snapshot.interactions],
+        }
 
+    def _profile_items(self, user, progress: bool = True) -> list[str]:
         tech_stack = []
         goals = []
         try:
@@ -52,95 +214,87 @@ class MemoryService:
         tech_str = ", ".join(tech_stack) if tech_stack else "Not set"
         goals_str = ", ".join(goals) if goals else "Not set"
 
-        return (
-            f"Name: {user.get_display_name()}\n"
-            f"Level: {user.level} (XP: {user.xp})\n"
-            f"Tech Stack: {tech_str}\n"
-            f"Goals: {goals_str}\n"
-            f"Discipline Score: {user.discipline_score:.0f}/100\n"
-            f"Growth Score: {user.growth_score:.0f}/100\n"
-            f"AI Mode: {user.ai_mode}"
-        )
-
-    async def _build_weekly_block(self, user_id: int) -> str:
-        tasks = await self.task_repo.get_active_tasks(user_id, limit=5)
-        if tasks:
-            tasks_text = "\n".join(
-                f"- [{t.priority}] {t.title}"
-                + (f" (due: {t.deadline})" if t.deadline else "")
-                for t in tasks
-            )
-        else:
-            tasks_text = "No active tasks"
-
-        habits = await self.habit_repo.get_active_habits(user_id)
-        if habits:
-            habits_text = "\n".join(
-                f"- {h.emoji} {h.name}: streak {h.current_streak}d"
-                for h in habits
-            )
-        else:
-            habits_text = "No habits tracked"
-
-        weekly_summary = await self.memory_repo.get_active_summary(user_id, "weekly_summary")
-        summary_text = weekly_summary.content if weekly_summary else "No weekly summary yet"
-
-        return (
-            f"Active Tasks:\n{tasks_text}\n\n"
-            f"Habits:\n{habits_text}\n\n"
-            f"Last Week Summary: {summary_text}"
-        )
-
-    async def _build_session_block(self, user_id: int) -> str:
-        interactions = await self.memory_repo.get_recent_interactions(user_id, limit=3)
-        if not interactions:
-            return "No previous messages in this session."
+        items = [f"Name: {user.get_display_name()}"]
+        if progress:
+            items += [
+                f"Level: {user.level} (XP: {user.xp})",
+                f"Discipline Score: {user.discipline_score:.0f}/100",
+                f"Growth Score: {user.growth_score:.0f}/100",
+            ]
+        return items + [
+            f"AI Mode: {user.ai_mode}",
+            f"Goals: {goals_str}",
+            f"Tech Stack: {tech_str}",
+        ]
 
-        lines = []
-        for inter in interactions:
-            user_msg = inter.user_message[:150]
-            ai_msg = inter.ai_response[:150]
-            lines.append(f"User: {user_msg}")
-            lines.append(f"AI: {ai_msg}")
-
-        return "\n".join(lines)
-
-    def _truncate_context(self, text: str, max_tokens: int) -> str:
-        max_chars = max_tokens * 4
-        if len(text) <= max_chars:
-            return text
-        return text[:max_chars] + "\n[...context truncated...]"
+    def _pack_context(self, blocks: list["ContextBlock"], max_tokens: int) -> str:
+        remaining = max_tokens
+        ranked = sorted(blocks, key=lambda b: b.priority)
+        # First pass honours each block's own budget; the second hands out what is left.
+        for capped in (True, False):
+            for block in ranked:
+                if remaining <= 0:
+                    break
+                remaining -= block.fill(remaining, capped)
+        return "\n\n".join(block.render() for block in blocks if block.picked)
 
     async def compress_memory(self, user_id: int):
-        week_ago = datetime.utcnow() - timedelta(days=7)
+        await self.compress_users([user_id])
 
-        interactions = await self.memory_repo.get_interactions_since(user_id, week_ago)
-        if not interactions:
-            return
-
-        interaction_text = "\n".join(
-            f"User: {i.user_message[:100]}\nAI: {i.ai_response[:100]}"
-            for i in interactions[-20:]
-        )
+    async def compress_users(self, user_ids: list[int], concurrency: int = 1) -> tuple[int, int]:
+        # Returns (compressed, failed). Failed users keep their raw interactions for the next run.
+        now = datetime.utcnow()
+        transcripts = await self.memory_repo.get_transcripts(user_ids, now - timedelta(days=7))
+        if not transcripts:
+            return 0, 0
+        previous = await self.memory_repo.get_latest_summaries(list(transcripts), "weekly_summary")
 
         from src.services.ai_service import AIService
         ai_svc = AIService(self.session)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
 
-        summary = await ai_svc.generate_summary(
-            f"Summarize these mentoring interactions in 3-5 bullet points:\n{interaction_text}"
-        )
-
-        await self.memory_repo.create_summary(
-            user_id=user_id,
-            summary_type="weekly_summary",
-            content=summary,
-            period_start=(datetime.utcnow() - timedelta(days=7)).date(),
-            period_end=datetime.utcnow().date(),
-        )
-
-        await self.memory_repo.deactivate_old_summaries(
-            user_id, "weekly_summary", keep_last=4
-        )
+        async def summarize(user_id: int, exchanges: list[tuple[int, str, str]]) -> str | None:
+            interaction_text = "\n".join(f"User: {q}\nAI: {a}" for _, q, a in exchanges)
+            summary = previous.get(user_id)
+            if summary:
+                # Rolling update: only the exchanges above the high-water mark are sent.
+                prompt = (
+                    "Update this running summary of a mentoring relationship with the new "
+                    "interactions below. Keep 3-5 bullet points and drop details that are no longer relevant.\n\n"
+                    f"Current summary:\n{summary.content}\n\nNew interactions:\n{interaction_text}"
+                )
+            else:
+                prompt = f"Summarize these mentoring interactions in 3-5 bullet points:\n{interaction_text}"
+            async with semaphore:
+                try:
+                    return await ai_svc.generate_summary(prompt, user_id=user_id)
+                except AIBackendError as e:
+                    logger.warning(f"Memory compression skipped for user {user_id}: {e}")
+                    return None
 
-        two_weeks_ago = datetime.utcnow() - timedelta(days=14)
-        await self.memory_repo.delete_interactions_before(user_id, two_weeks_ago)
+        results = await asyncio.gather(*(summarize(u, ex) for u, ex in transcripts.items()))
+        summaries = {u: s for u, s in zip(transcripts, results) if s}
+        if summaries:
+            compressed = list(summaries)
+            rows = []
+            for user_id, content in summaries.items():
+                summary = previous.get(user_id)
+                rows.append(
+                    {
+                        "user_id": user_id,
+                        "content": content,
+                        "version": summary.version + 1 if summary else 1,
+                        "period_start": (summary and summary.period_start) or (now - timedelta(days=7)).date(),
+                        "period_end": now.date(),
+                        "last_interaction_id": transcripts[user_id][-1][0],
+                    }
+                )
+            await self.memory_repo.create_summaries("weekly_summary", rows)
+            await self.memory_repo.deactivate_old_summaries(compressed, "weekly_summary", keep_last=4)
+            # Only exchanges older than the summarized week go, so cached session blocks stay valid.
+            await self.memory_repo.delete_interactions_before(compressed, now - timedelta(days=14))
+            # A bulk delete isn't reported to on_commit subscribers, so the deleted chats
+            # would stay searchable until the index TTL ran out.
+            for user_id in compressed:
+                retrieval_index.drop(user_id)
+        return len(summaries), len(transcripts) - len(summaries)
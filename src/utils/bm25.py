@@ -0,0 +1,62 @@
+import heapq
+import math
+from collections import Counter
+from typing import Hashable
+
+from src.utils.stemming import terms
+
+
+class BM25Index:
+    # Okapi BM25 over pre-stemmed terms; documents can be added and removed one at a time.
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.docs: dict[Hashable, tuple[str, int]] = {}
+        self.postings: dict[str, dict[Hashable, int]] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add(self, key: Hashable, text: str):
+        if key in self.docs:
+            self.remove(key)
+        counts = Counter(terms(text))
+        length = sum(counts.values())
+        if not length:
+            return
+        self.docs[key] = (text, length)
+        self.total_length += length
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[key] = tf
+
+    def remove(self, key: Hashable):
+        doc = self.docs.pop(key, None)
+        if doc is None:
+            return
+        self.total_length -= doc[1]
+        for term in set(terms(doc[0])):
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(key, None)
+                if not posting:
+                    del self.postings[term]
+
+    def search(self, query: str, k: int = 5, exclude: set = frozenset()) -> list[tuple[float, Hashable, str]]:
+        if not self.docs:
+            return []
+        n = len(self.docs)
+        avg_length = self.total_length / n
+        scores: dict[Hashable, float] = {}
+        for term in set(terms(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for key, tf in posting.items():
+                norm = self.k1 * (1 - self.b + self.b * self.docs[key][1] / avg_length)
+                scores[key] = scores.get(key, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        best = heapq.nlargest(
+            k, ((score, key) for key, score in scores.items() if key not in exclude), key=lambda item: item[0]
+        )
+        return [(score, key, self.docs[key][0]) for score, key in best]
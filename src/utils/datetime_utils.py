@@ -1,4 +1,5 @@
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, time, timedelta, timezone
+from zoneinfo import ZoneInfo
 
 
 def get_week_bounds(target_date: date | None = None) -> tuple[date, date]:
@@ -23,4 +24,51 @@ def is_today(d: date) -> bool:
 
 
 def is_overdue(deadline: date) -> bool:
-    return deadline < date.today()
\ No newline at end of file
+    return deadline < date.today()
+
+
+def get_zoneinfo(name: str | None, default: str = "Europe/Moscow") -> ZoneInfo:
+    try:
+        return ZoneInfo(name or default)
+    except Exception:
+        return ZoneInfo(default)
+
+
+def parse_hhmm(value: str | None) -> time | None:
+    try:
+        hours, minutes = (value or "").strip().split(":")
+        return time(int(hours), int(minutes))
+    except ValueError:
+        return None
+
+
+def to_local(utc_naive: datetime, tz: ZoneInfo) -> datetime:
+    return utc_naive.replace(tzinfo=timezone.utc).astimezone(tz)
+
+
+def next_occurrence_utc(
+    remind_time: str | None,
+    tz: ZoneInfo,
+    after: datetime,
+    weekday_mask: int = 127,
+    not_before: date | None = None,
+) -> datetime | None:
+    at = parse_hhmm(remind_time)
+    if at is None or not weekday_mask & 127:
+        return None
+
+    day = to_local(after, tz).date()
+    if not_before and not_before > day:
+        day = not_before
+
+    for _ in range(9):
+        if weekday_mask & (1 << day.weekday()):
+            candidate = (
+                datetime.combine(day, at, tzinfo=tz)
+                .astimezone(timezone.utc)
+                .replace(tzinfo=None)
+            )
+            if candidate > after:
+                return candidate
+        day += timedelta(days=1)
+    return None
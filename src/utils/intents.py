@@ -0,0 +1,79 @@
+import re
+
+from src.utils.stemming import STOPWORDS, stem
+
+_TOKEN = re.compile(r"[а-яёa-z0-9]+", re.I)
+_END = object()
+
+
+def _key(token: str) -> str:
+    # Function words are kept verbatim: "как" and "какие" stem to the same thing.
+    token = token.lower()
+    return token if token in STOPWORDS else stem(token)
+
+
+class Intent:
+    def __init__(
+        self,
+        name: str,
+        phrases: tuple[str, ...],
+        anchored: bool = False,
+        max_extra: int | None = 3,
+        slot: re.Pattern | None = None,
+    ):
+        # anchored: the phrase must open the message (commands with an argument after it).
+        # max_extra: how many other words a question may carry before it counts as open-ended.
+        self.name = name
+        self.phrases = phrases
+        self.anchored = anchored
+        self.max_extra = max_extra
+        self.slot = slot
+
+
+class IntentMatch:
+    def __init__(self, intent: Intent, rest: str, groups: dict[str, str]):
+        self.intent = intent
+        self.name = intent.name
+        self.rest = rest
+        self.groups = groups
+
+
+class IntentMatcher:
+    # Phrases are compiled into a trie over stemmed tokens, so inflected forms that
+    # stem alike ("привычки", "привычку") share a path; the longest phrase wins.
+    # Snowball keeps forms like the genitive plural "привычек" apart, so those
+    # need a phrase of their own.
+    def __init__(self, intents: list[Intent]):
+        self.trie: dict = {}
+        for intent in intents:
+            for phrase in intent.phrases:
+                node = self.trie
+                for token in _TOKEN.findall(phrase):
+                    node = node.setdefault(_key(token), {})
+                node.setdefault(_END, []).append(intent)
+
+    def match(self, text: str) -> IntentMatch | None:
+        text = text or ""
+        tokens = [(_key(m.group()), m.end()) for m in _TOKEN.finditer(text)]
+        best = None
+        for start in range(len(tokens)):
+            node = self.trie
+            end = start
+            while end < len(tokens) and tokens[end][0] in node:
+                node = node[tokens[end][0]]
+                end += 1
+                for intent in node.get(_END, ()):
+                    if intent.anchored and start != 0:
+                        continue
+                    extra = len(tokens) - (end - start)
+                    if intent.max_extra is not None and extra > intent.max_extra:
+                        continue
+                    if best is None or end - start > best[0]:
+                        best = (end - start, intent, end)
+        if best is None:
+            return None
+        _, intent, end = best
+        rest = text[tokens[end - 1][1]:].strip(" \t\n:.,!?-—")
+        found = intent.slot.search(rest) if intent.slot else None
+        groups = {k: v for k, v in found.groupdict().items() if v is not None} if found else {}
+        return IntentMatch(intent, rest, groups)
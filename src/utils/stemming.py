@@ -0,0 +1,133 @@
+import re
+from functools import lru_cache
+
+try:
+    import snowballstemmer
+
+    _russian = snowballstemmer.stemmer("russian")
+    _english = snowballstemmer.stemmer("english")
+except Exception:  # optional dependency; the built-in Russian stemmer below is used instead
+    _russian = _english = None
+
+_WORDS = re.compile(r"[а-яё]+|[a-z]+|\d+")
+
+STOPWORDS = frozenset(
+    """
+    и в во не что он на я с со как а то все она так его но да ты к у же вы за бы по только
+    ее мне было вот от меня еще нет о из ему теперь когда даже ну ли если уже или ни быть был
+    него до вас опять уж вам ведь там потом себя ничего ей может они тут где есть надо ней для
+    мы тебя их чем была сам чтоб без будто чего раз тоже себе под будет ж тогда кто этот того
+    потому этого какой какие совсем ним здесь этом один почти мой тем чтобы нее сейчас были куда
+    зачем всех можно при об другой хоть после над больше тот через эти нас про всего них какая
+    много эту моя свою этой перед им более всегда между это
+    the a an and or of to in on for is are was be it this that with as at by i you me my we
+    """.split()
+)
+
+_VOWELS = "аеиоуыэюя"
+
+_PERFECTIVE_GERUND_1 = ("вшись", "вши", "в")
+_PERFECTIVE_GERUND_2 = ("ившись", "ывшись", "ивши", "ывши", "ив", "ыв")
+_ADJECTIVE = (
+    "ими", "ыми", "его", "ого", "ему", "ому", "ее", "ие", "ые", "ое", "ей", "ий", "ый", "ой",
+    "ем", "им", "ым", "ом", "их", "ых", "ую", "юю", "ая", "яя", "ою", "ею",
+)
+_PARTICIPLE_1 = ("ем", "нн", "вш", "ющ", "щ")
+_PARTICIPLE_2 = ("ивш", "ывш", "ующ")
+_REFLEXIVE = ("ся", "сь")
+_VERB_1 = (
+    "ете", "йте", "ешь", "нно", "ла", "на", "ли", "ем", "ло", "но", "ет", "ют", "ны", "ть", "й", "л", "н",
+)
+_VERB_2 = (
+    "ейте", "уйте", "ила", "ыла", "ена", "ите", "или", "ыли", "ило", "ыло", "ено", "ует", "уют",
+    "ены", "ить", "ыть", "ишь", "ей", "уй", "ил", "ыл", "им", "ым", "ен", "ят", "ит", "ыт", "ую", "ю",
+)
+_NOUN = (
+    "иями", "ями", "ами", "ией", "иям", "ием", "иях", "ев", "ов", "ие", "ье", "еи", "ии", "ей", "ой",
+    "ий", "ям", "ем", "ам", "ом", "ах", "ях", "ию", "ью", "ия", "ья", "а", "е", "и", "й", "о", "у",
+    "ы", "ь", "ю", "я",
+)
+_DERIVATIONAL = ("ость", "ост")
+_SUPERLATIVE = ("ейше", "ейш")
+
+
+def _regions(word: str) -> tuple[int, int]:
+    # RV starts after the first vowel; R2 is R1 of R1 (Snowball definitions).
+    rv = next((i + 1 for i, ch in enumerate(word) if ch in _VOWELS), len(word))
+    r1 = len(word)
+    for i in range(1, len(word)):
+        if word[i] not in _VOWELS and word[i - 1] in _VOWELS:
+            r1 = i + 1
+            break
+    r2 = len(word)
+    for i in range(r1 + 1, len(word)):
+        if word[i] not in _VOWELS and word[i - 1] in _VOWELS:
+            r2 = i + 1
+            break
+    return rv, r2
+
+
+def _cut(word: str, start: int, after_a: tuple[str, ...], plain: tuple[str, ...]) -> str | None:
+    # Removes the longest matching ending inside word[start:]; endings in `after_a`
+    # only count when preceded by "а" or "я".
+    best = None
+    for group, suffixes in ((after_a, True), (plain, False)):
+        for suffix in group:
+            if word.endswith(suffix) and len(word) - len(suffix) >= start:
+                if best is None or len(suffix) > len(best[0]):
+                    best = (suffix, suffixes)
+    if best is None:
+        return None
+    suffix, needs_a = best
+    cut = len(word) - len(suffix)
+    if needs_a and (cut - 1 < start or word[cut - 1] not in "ая"):
+        return None
+    return word[:cut]
+
+
+def _stem_russian(word: str) -> str:
+    rv, r2 = _regions(word)
+    if rv >= len(word):
+        return word
+
+    stemmed = _cut(word, rv, _PERFECTIVE_GERUND_1, _PERFECTIVE_GERUND_2)
+    if stemmed is None:
+        word = _cut(word, rv, (), _REFLEXIVE) or word
+        stemmed = _cut(word, rv, (), _ADJECTIVE)
+        if stemmed is not None:
+            stemmed = _cut(stemmed, rv, _PARTICIPLE_1, _PARTICIPLE_2) or stemmed
+        else:
+            stemmed = _cut(word, rv, _VERB_1, _VERB_2)
+            if stemmed is None:
+                stemmed = _cut(word, rv, (), _NOUN)
+    word = stemmed if stemmed is not None else word
+
+    if word.endswith("и") and len(word) - 1 >= rv:
+        word = word[:-1]
+    derivational = _cut(word, max(r2, rv), (), _DERIVATIONAL)
+    if derivational is not None:
+        word = derivational
+
+    superlative = _cut(word, rv, (), _SUPERLATIVE)
+    if superlative is not None:
+        word = superlative
+    if word.endswith("нн") and len(word) - 1 >= rv:
+        word = word[:-1]
+    elif superlative is None and word.endswith("ь") and len(word) - 1 >= rv:
+        word = word[:-1]
+    return word
+
+
+@lru_cache(maxsize=50000)
+def stem(word: str) -> str:
+    word = word.lower().replace("ё", "е")
+    if not word.isalpha():
+        return word
+    if "a" <= word[0] <= "z":
+        return _english.stemWord(word) if _english else word
+    return _russian.stemWord(word) if _russian else _stem_russian(word)
+
+
+def terms(text: str) -> list[str]:
+    words = _WORDS.findall((text or "").lower())
+    return [stem(w) for w in words if len(w) > 1 and w not in STOPWORDS]
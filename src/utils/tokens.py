@@ -0,0 +1,54 @@
+import re
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # package missing or encoding files unavailable offline
+    _encoding = None
+
+# Offline approximation of a Llama-3/cl100k style BPE. Latin words average ~5 chars
+# per token, Cyrillic ~3 (the vocabulary has far fewer Russian merges), digits are
+# split in groups of three, and symbols/emoji cost roughly one token per two bytes.
+_PIECES = re.compile(r"[A-Za-z]+|[Ѐ-ӿ]+|\d{1,3}|\n+|[ \t]+|.", re.S)
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    total = 0
+    for match in _PIECES.finditer(text):
+        piece = match.group()
+        first = piece[0]
+        if first in " \t":
+            # A single space is merged into the following word.
+            total += 0 if len(piece) == 1 else 1
+        elif first == "\n":
+            total += 1
+        elif first.isascii() and first.isalpha():
+            total += 1 + (len(piece) - 1) // 5
+        elif "Ѐ" <= first <= "ӿ":
+            total += 1 + (len(piece) - 1) // 3
+        elif first.isdigit():
+            total += 1
+        else:
+            total += max(1, len(piece.encode()) // 2)
+    return total
+
+
+def truncate_tokens(text: str, max_tokens: int, suffix: str = "…") -> str:
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    budget = max_tokens - count_tokens(suffix)
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count_tokens(text[:mid]) <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo].rstrip() + suffix if lo else ""
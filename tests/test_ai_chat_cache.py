@@ -0,0 +1,64 @@
+import asyncio
+
+from src.core.context_cache import context_cache
+from src.core.response_cache import response_cache
+from src.core.retrieval_index import retrieval_index
+from src.models.ai_memory import AIInteraction
+from src.models.user import User
+from src.services.ai_service import AIService
+from src.services.memory_service import CONTEXT_BLOCKS, _refresh_context_cache
+
+USER_ID = 9001
+
+
+def _service(monkeypatch) -> tuple[AIService, list[str]]:
+    user = User(
+        id=USER_ID, first_name="Ann", ai_mode="adaptive", level=1, xp=0,
+        discipline_score=50.0, growth_score=50.0, timezone="UTC",
+    )
+    for block in CONTEXT_BLOCKS:
+        context_cache.put(USER_ID, block, [f"- {block}"], context_cache.version(USER_ID))
+    retrieval_index.build(USER_ID, [], retrieval_index.version(USER_ID))
+    monkeypatch.setattr(response_cache, "enabled", True)
+
+    svc = AIService(session=None)
+    contexts = []
+
+    async def get_by_id(user_id):
+        return user
+
+    async def call(system_prompt, context, message, user_id=None):
+        contexts.append(context)
+        return "Start with arrays."
+
+    async def create_interaction(**values):
+        # What the commit after a turn does: the exchange slides into the session block.
+        interaction = AIInteraction(id=len(contexts), **values)
+        _refresh_context_cache([("new", interaction, USER_ID)])
+
+    monkeypatch.setattr(svc.user_repo, "get_by_id", get_by_id)
+    monkeypatch.setattr(svc, "_call_with_fallback", call)
+    monkeypatch.setattr(svc.memory_repo, "create_interaction", create_interaction)
+    return svc, contexts
+
+
+def test_repeated_question_is_served_from_cache(monkeypatch):
+    svc, contexts = _service(monkeypatch)
+    hits = response_cache.hits
+
+    first, _ = asyncio.run(svc.get_response(USER_ID, "Как учить алгоритмы?"))
+    second, _ = asyncio.run(svc.get_response(USER_ID, "как учить  алгоритмы?"))
+
+    assert first == second == "Start with arrays."
+    assert len(contexts) == 1
+    assert response_cache.hits == hits + 1
+
+
+def test_task_change_misses_cache(monkeypatch):
+    svc, contexts = _service(monkeypatch)
+
+    asyncio.run(svc.get_response(USER_ID, "Что почитать про SQL?"))
+    context_cache.put(USER_ID, "tasks", ["- [high] Learn joins"], context_cache.version(USER_ID))
+    asyncio.run(svc.get_response(USER_ID, "Что почитать про SQL?"))
+
+    assert len(contexts) == 2
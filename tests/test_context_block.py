@@ -0,0 +1,62 @@
+from src.services.memory_service import ContextBlock
+from src.utils.tokens import count_tokens
+
+ITEMS = [f"- item number {i} with a few extra words" for i in range(10)]
+
+
+def _header(title: str) -> int:
+    return count_tokens(f"=== {title} ===") + 2
+
+
+def _cost(item: str) -> int:
+    return count_tokens(item) + 1
+
+
+def test_fill_stops_at_budget_in_value_order():
+    budget = _header("T") + _cost(ITEMS[0]) + _cost(ITEMS[1]) + _cost(ITEMS[2]) // 2
+    block = ContextBlock("T", ITEMS, priority=0, budget=budget)
+
+    spent = block.fill(1000)
+
+    assert list(block.picked) == [0, 1]
+    assert spent == block.used <= budget
+
+
+def test_tail_keep_takes_newest_items_but_renders_in_order():
+    budget = _header("T") + _cost(ITEMS[8]) + _cost(ITEMS[9])
+    block = ContextBlock("T", ITEMS, priority=0, budget=budget, keep="tail")
+
+    block.fill(1000)
+
+    assert sorted(block.picked) == [8, 9]
+    assert block.render() == "=== T ===\n" + ITEMS[8] + "\n" + ITEMS[9]
+
+
+def test_single_long_item_is_truncated_not_dropped():
+    long_item = "word " * 400
+    block = ContextBlock("T", [long_item, ITEMS[0]], priority=0, budget=60)
+
+    spent = block.fill(1000)
+
+    assert list(block.picked) == [0]
+    assert block.picked[0].endswith("…")
+    assert spent <= 60
+
+
+def test_no_room_for_header_leaves_block_empty():
+    block = ContextBlock("A LONG BLOCK TITLE", ITEMS, priority=0, budget=500)
+
+    assert block.fill(_header("A LONG BLOCK TITLE")) == 0
+    assert not block.picked
+
+
+def test_uncapped_pass_spends_leftover_beyond_budget():
+    budget = _header("T") + _cost(ITEMS[0])
+    block = ContextBlock("T", ITEMS, priority=0, budget=budget)
+
+    block.fill(1000)
+    extra = block.fill(_cost(ITEMS[1]), capped=False)
+
+    assert list(block.picked) == [0, 1]
+    assert extra == _cost(ITEMS[1])
+    assert block.used == budget + extra
@@ -0,0 +1,15 @@
+from src.core.context_cache import ContextCache
+
+
+def test_versions_stay_bounded_and_still_reject_stale_reads():
+    cache = ContextCache(max_users=2, ttl_seconds=60)
+    stale = cache.version(1)
+    cache.put(2, "tasks", ["- kept"], cache.version(2))
+
+    for user_id in range(100):
+        cache.drop(user_id, "habits")
+
+    assert len(cache.versions) <= 4
+    cache.put(1, "tasks", ["- stale"], stale)
+    assert cache.get(1, "tasks") is None
+    assert cache.get(2, "tasks") == ["- kept"]
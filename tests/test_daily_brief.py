@@ -0,0 +1,110 @@
+import asyncio
+import json
+from datetime import date, datetime, timedelta
+
+from src.models.ai_memory import DailyBrief
+from src.models.habit import Habit
+from src.models.task import Task
+from src.repositories.daily_brief_repo import DailyBriefRepository
+
+
+class _Result:
+    def __init__(self, row):
+        self.row = row
+
+    def first(self):
+        return self.row
+
+
+class _Session:
+    # Stands in for the locked SELECT of the brief joined with the user's timezone.
+    def __init__(self, brief: DailyBrief | None):
+        self.brief = brief
+
+    async def execute(self, stmt):
+        return _Result((self.brief, "UTC") if self.brief else None)
+
+    async def flush(self):
+        pass
+
+
+def _brief(brief_date: date | None = None, **payload) -> DailyBrief:
+    payload = {"tasks": [], "done": [], "habits": [], **payload}
+    return DailyBrief(
+        user_id=1,
+        brief_date=brief_date or datetime.utcnow().date(),
+        version=1,
+        payload=json.dumps(payload),
+    )
+
+
+def _task(id: int, status: str = "todo", **values) -> Task:
+    return Task(id=id, user_id=1, title=f"task {id}", priority="medium", status=status, **values)
+
+
+def _patch(brief: DailyBrief, method: str, *args, **kwargs) -> dict:
+    asyncio.run(getattr(DailyBriefRepository(_Session(brief)), method)(*args, **kwargs))
+    return json.loads(brief.payload)
+
+
+def test_new_task_is_added_newest_first():
+    brief = _brief(tasks=[{"id": 3, "title": "task 3", "priority": "low", "deadline": None}])
+
+    payload = _patch(brief, "patch_task", _task(5, deadline=date(2030, 1, 2)))
+
+    assert [t["id"] for t in payload["tasks"]] == [5, 3]
+    assert payload["tasks"][0]["deadline"] == "2030-01-02"
+    assert brief.version == 2
+
+
+def test_completed_task_moves_to_done():
+    brief = _brief(tasks=[{"id": 3, "title": "task 3", "priority": "low", "deadline": None}])
+
+    payload = _patch(brief, "patch_task", _task(3, status="done", completed_at=datetime.utcnow()))
+
+    assert payload["tasks"] == []
+    assert [t["id"] for t in payload["done"]] == [3]
+
+
+def test_task_completed_on_another_day_is_not_listed_as_done():
+    brief = _brief(tasks=[{"id": 3, "title": "task 3", "priority": "low", "deadline": None}])
+    yesterday = datetime.utcnow() - timedelta(days=1)
+
+    payload = _patch(brief, "patch_task", _task(3, status="done", completed_at=yesterday))
+
+    assert payload["tasks"] == [] and payload["done"] == []
+
+
+def test_removed_task_leaves_every_list():
+    brief = _brief(done=[{"id": 3, "title": "task 3", "priority": "low", "deadline": None}])
+
+    payload = _patch(brief, "patch_task", _task(3), removed=True)
+
+    assert payload["tasks"] == [] and payload["done"] == []
+
+
+def test_habit_is_listed_only_when_due_today():
+    today_bit = 1 << datetime.utcnow().weekday()
+    habit = Habit(id=7, user_id=1, name="Run", emoji="🏃", current_streak=2, schedule_mask=today_bit, is_active=True)
+    brief = _brief()
+
+    assert _patch(brief, "patch_habit", habit)["habits"] == [
+        {"id": 7, "emoji": "🏃", "name": "Run", "streak": 2}
+    ]
+
+    habit.schedule_mask = 127 & ~today_bit
+    assert _patch(brief, "patch_habit", habit)["habits"] == []
+    assert brief.version == 3
+
+
+def test_stale_brief_is_left_for_the_next_build():
+    brief = _brief(brief_date=datetime.utcnow().date() - timedelta(days=1))
+
+    payload = _patch(brief, "patch_task", _task(5))
+
+    assert payload["tasks"] == []
+    assert brief.version == 1
+
+
+def test_missing_brief_is_a_no_op():
+    asyncio.run(DailyBriefRepository(_Session(None)).patch_task(_task(5)))
@@ -0,0 +1,124 @@
+import asyncio
+import json
+
+import pytest
+
+from src.models.user import User
+from src.services import intent_service
+from src.services.intent_service import IntentService, _best_match, intent_matcher
+from src.utils.intents import Intent, IntentMatcher
+
+
+class Item:
+    def __init__(self, id: int, title: str):
+        self.id = id
+        self.title = title
+
+
+def test_longest_phrase_wins():
+    matcher = IntentMatcher([
+        Intent("short", ("покажи задачи",)),
+        Intent("long", ("покажи задачи на неделю",)),
+    ])
+
+    assert matcher.match("покажи задачи").name == "short"
+    assert matcher.match("Покажи задачи на неделю").name == "long"
+
+
+def test_anchored_phrase_must_open_the_message():
+    matcher = IntentMatcher([Intent("add", ("добавь задачу",), anchored=True, max_extra=None)])
+
+    assert matcher.match("добавь задачу купить хлеб").rest == "купить хлеб"
+    assert matcher.match("можешь добавь задачу купить хлеб") is None
+
+
+def test_max_extra_limits_words_around_a_question():
+    matcher = IntentMatcher([
+        Intent("habits", ("мои привычки",)),
+        Intent("open", ("с чего начать",), max_extra=None),
+    ])
+
+    assert matcher.match("ну покажи мои привычки сейчас").name == "habits"
+    assert matcher.match("ну покажи мне мои привычки сейчас") is None
+    assert matcher.match("подскажи с чего начать изучение баз данных в этом году").name == "open"
+
+
+def test_word_forms_share_a_path():
+    matcher = IntentMatcher([Intent("check", ("отметь привычку",))])
+
+    assert matcher.match("отметь привычки").name == "check"
+
+
+def test_add_task_extracts_time_slot():
+    found = intent_matcher.match("Добавь задачу: купить молоко 18:30")
+
+    assert found.name == "add_task"
+    assert found.rest == "купить молоко 18:30"
+    assert found.groups == {"time": "18:30"}
+    assert intent_matcher.match("добавь задачу купить молоко").groups == {}
+
+
+def test_open_question_falls_through():
+    assert intent_matcher.match("как задачи лучше планировать?") is None
+    assert intent_matcher.match("расскажи про мои задачи в проекте по машинному обучению") is None
+
+
+def test_best_match_prefers_overlap_and_breaks_ties_by_order():
+    items = [Item(1, "Купить молоко"), Item(2, "Купить хлеб и молоко"), Item(3, "Написать отчёт")]
+
+    assert _best_match("отчет", items, lambda i: i.title).id == 3
+    assert _best_match("хлеб молоко", items, lambda i: i.title).id == 2
+    assert _best_match("молока", items, lambda i: i.title).id == 1
+    assert _best_match("пиццу", items, lambda i: i.title) is None
+    assert _best_match("", items, lambda i: i.title) is None
+
+
+class _Untouchable:
+    def __getattr__(self, name):
+        raise AssertionError(f"{name} must not be called")
+
+
+def _user(**permissions) -> User:
+    return User(id=1, settings_json=json.dumps({"ai_permissions": permissions}))
+
+
+@pytest.mark.parametrize(
+    "text, permission",
+    [
+        ("добавь задачу купить молоко", "create_tasks"),
+        ("выполнил задачу купить молоко", "modify_tasks"),
+        ("покажи задачи", "read_tasks"),
+        ("просроченные задачи", "read_tasks"),
+        ("мои привычки", "read_habits"),
+        ("отметь привычку зарядка", "read_habits"),
+    ],
+)
+def test_disabled_permission_falls_through_to_llm(monkeypatch, text, permission):
+    monkeypatch.setattr(intent_service, "TaskService", lambda session: _Untouchable())
+    monkeypatch.setattr(intent_service, "HabitService", lambda session: _Untouchable())
+    svc = IntentService(session=None)
+    svc.task_repo = _Untouchable()
+    svc.habit_repo = _Untouchable()
+
+    assert asyncio.run(svc.respond(_user(**{permission: False}), text)) is None
+
+
+def test_add_task_creates_task_with_reminder(monkeypatch):
+    created = {}
+
+    class FakeTaskService:
+        def __init__(self, session):
+            pass
+
+        async def create_task(self, **values):
+            created.update(values)
+            return {"title": values["title"]}
+
+    monkeypatch.setattr(intent_service, "TaskService", FakeTaskService)
+
+    reply = asyncio.run(IntentService(session=None).respond(_user(), "добавь задачу купить молоко 18:30"))
+
+    assert created["title"] == "купить молоко"
+    assert created["remind_enabled"] is True
+    assert created["remind_time"] == "18:30"
+    assert "купить молоко" in reply and "18:30" in reply
@@ -266,6 +266,46 @@ function addChat(role, text) {
   node.textContent = text;
   log.appendChild(node);
   log.scrollTop = log.scrollHeight;
+  return node;
+}
+
+async function streamChat(body, node) {
+  const res = await fetch("/api/v1/mentor/chat", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ ...body, stream: true }),
+  });
+  if (!res.ok) {
+    const data = await res.json().catch(() => ({}));
+    throw new Error(data.detail || "Ошибка API");
+  }
+  if (!(res.headers.get("content-type") || "").includes("text/event-stream")) {
+    const data = await res.json().catch(() => ({}));
+    node.textContent = data.reply || "Пусто";
+    return;
+  }
+  const log = $("#chatLog");
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let text = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const events = buffer.split("\n\n");
+    buffer = events.pop();
+    for (const raw of events) {
+      if (!raw.startsWith("data:")) continue;
+      const data = JSON.parse(raw.slice(5));
+      if (data.delta) {
+        text += data.delta;
+        node.textContent = text;
+        log.scrollTop = log.scrollHeight;
+      }
+    }
+  }
+  if (!text.trim()) node.textContent = "Пусто";
 }
 
 async function loadBootstrap() {
@@ -437,11 +477,8 @@ function wireActions() {
     if (!text) return;
     addChat("user", text);
     e.target.reset();
-    const data = await api("/api/v1/mentor/chat", {
-      method: "POST",
-      body: { telegram_id: state.telegramUser.id, message: text },
-    });
-    addChat("bot", data.reply || "Пусто");
+    const node = addChat("bot", "…");
+    await streamChat({ telegram_id: state.telegramUser.id, message: text }, node);
   });
 
   $("#learningForm").addEventListener("submit", async (e) => {